@@ -1,29 +1,36 @@
-import firebase_admin
-from firebase_admin import credentials, firestore
+import argparse
+import os
+from datetime import datetime
+
 import statistics
 import json
 from typing import Dict
 
+from models.collection_scan import scan_collection
+from models.firebase_client import get_client
+from models.personality_stats import ROLES, TRAITS, StreamingPersonalityStats, user_role
+
+
+def get_db(cred_path=None):
+    return get_client(cred_path)
+
+
+def iter_personality_records(users):
+    """Yield (role, personalityResults) for each user document that has personality results"""
+    for user in users:
+        data = user.to_dict()
+        if 'personalityResults' not in data:
+            continue
+        yield user_role(data), data['personalityResults']
+
 
-def analyze_personality_distributions():
+def calculate_distributions(records):
     """
-    Analyze the distribution of personality trait scores across all users.
-    Outputs comprehensive statistics and saves results to a JSON file.
+    Exact statistics (min, max, mean, median, stdev, count and quartiles) per trait,
+    overall and by role, from (role, personalityResults) pairs
     """
-    # Initialize Firebase
-    cred = credentials.Certificate(r"C:\Users\Reece\PycharmProjects\FounderMatchaV2\firebase-credentials.json")
-    if not firebase_admin._apps:
-        firebase_admin.initialize_app(cred)
-    db = firestore.client()
-
     # Initialize data structures
-    trait_stats = {
-        'openness': {'values': []},
-        'conscientiousness': {'values': []},
-        'extraversion': {'values': []},
-        'agreeableness': {'values': []},
-        'neuroticism': {'values': []}
-    }
+    trait_stats = {trait: {'values': []} for trait in TRAITS}
 
     # Collect data by role
     role_stats = {
@@ -31,20 +38,11 @@ def analyze_personality_distributions():
         'developer': {trait: {'values': []} for trait in trait_stats}
     }
 
-    # Fetch and process data
-    users = db.collection('hackathonusers').get()
-    for user in users:
-        data = user.to_dict()
-        if 'personalityResults' not in data:
-            continue
-
-        # Get role
-        role = 'founder' if data.get('role') == 'founder / entrepreneur' else 'developer'
-
+    for role, personality in records:
         # Process each trait
         for trait in trait_stats:
-            if trait in data['personalityResults']:
-                value = data['personalityResults'][trait]
+            if trait in personality:
+                value = personality[trait]
                 trait_stats[trait]['values'].append(value)
                 role_stats[role][trait]['values'].append(value)
 
@@ -61,6 +59,7 @@ def analyze_personality_distributions():
     def calc_stats(values):
         if not values:
             return None
+        quartiles = statistics.quantiles(values, n=4)
         return {
             'min': min(values),
             'max': max(values),
@@ -69,9 +68,9 @@ def analyze_personality_distributions():
             'stdev': statistics.stdev(values) if len(values) > 1 else 0,
             'count': len(values),
             'quartiles': {
-                'q1': statistics.quantiles(values, n=4)[0],
-                'q2': statistics.quantiles(values, n=4)[1],
-                'q3': statistics.quantiles(values, n=4)[2]
+                'q1': quartiles[0],
+                'q2': quartiles[1],
+                'q3': quartiles[2]
             }
         }
 
@@ -83,23 +82,183 @@ def analyze_personality_distributions():
     for role in role_stats:
         for trait in trait_stats:
             results['by_role'][role][trait] = calc_stats(role_stats[role][trait]['values'])
+    return results
+
+
+def analyze_personality_distributions(db=None, output='personality_analysis.json'):
+    """
+    Analyze the distribution of personality trait scores across all users.
+    Outputs comprehensive statistics and saves results to a JSON file.
+    """
+    db = db or get_db()
+
+    # Fetch and process data
+    users = scan_collection(db, 'hackathonusers', select=['role', 'personalityResults'])
+    results = calculate_distributions(iter_personality_records(users))
+
+    print_summary(results)
+    save_results(results, output)
+    return results
+
+
+def load_state(path):
+    with open(path) as f:
+        return StreamingPersonalityStats.from_state(json.load(f))
+
+
+def save_state(stats, path):
+    with open(path, 'w') as f:
+        json.dump(stats.to_state(), f)
+
+
+def analyze_personality_streaming(users=None, k=200, state_out=None, merge_states=(),
+                                  output='personality_analysis.json'):
+    """
+    Streaming analysis: users are consumed one document at a time, and any saved
+    shard states in `merge_states` are merged in. With `users=None` and shard states
+    given, the summary is built from the shards alone without reading Firestore.
+    """
+    stats = StreamingPersonalityStats(k=k)
+    if users is None and not merge_states:
+        users = scan_collection(get_db(), 'hackathonusers', select=['role', 'personalityResults'])
+    if users is not None:
+        stats.consume(iter_personality_records(users))
+    for path in merge_states:
+        stats.merge(load_state(path))
+
+    if state_out:
+        save_state(stats, state_out)
+    results = stats.results()
+    print_summary(results)
+    save_results(results, output)
+    return results
+
+
+# Incremental refresh. The refresh state lives next to the results file and holds each
+# counted user's role and trait values, the highest watermark-field value seen so far and
+# the IDs of the users read at exactly that value. A changed profile replaces its old
+# values and the summary is recomputed exactly from the state, so only changed users are
+# read from Firestore. The state grows with the number of users (a role and five numbers
+# each) and the statistics are the same as a full run's.
+
+def refresh_state_path(output):
+    return os.path.splitext(output)[0] + '.state.json'
+
+
+def _encode_watermark(value):
+    if isinstance(value, datetime):
+        return {'datetime': value.isoformat()}
+    return value
+
+
+def _decode_watermark(value):
+    if isinstance(value, dict) and 'datetime' in value:
+        return datetime.fromisoformat(value['datetime'])
+    return value
+
+
+def load_refresh_state(path, watermark_field):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        state = json.load(f)
+    if state.get('watermark_field') != watermark_field or 'watermark_ids' not in state:
+        print(f"Saved state in '{path}' was built with different settings, rebuilding")
+        return None
+    state['watermark'] = _decode_watermark(state['watermark'])
+    return state
+
+
+def save_refresh_state(path, state):
+    with open(path, 'w') as f:
+        json.dump(dict(state, watermark=_encode_watermark(state['watermark']),
+                       watermark_ids=sorted(state['watermark_ids'])), f)
+
+
+def refresh_personality_analysis(db=None, output='personality_analysis.json', watermark_field='updatedAt',
+                                 full=False):
+    """
+    Update the summary with only the users whose `watermark_field` is at or after the
+    saved watermark, instead of re-reading the whole collection. Users without the
+    field are only picked up by a full rebuild, which also runs when there is no
+    saved state (or `full` is set).
+
+    The query includes the watermark itself, so a user written later with the same
+    value is not missed; users already read at exactly that value are skipped.
+    """
+    db = db or get_db()
+    path = refresh_state_path(output)
+    state = None if full else load_refresh_state(path, watermark_field)
+    if state is not None and state['watermark'] is None:
+        # Nothing carried the watermark field last time, so there is nothing to resume from
+        state = None
+
+    fields = ['role', 'personalityResults', watermark_field]
+    if state is None:
+        state = {'watermark_field': watermark_field, 'watermark': None, 'watermark_ids': [], 'users': {}}
+        docs = scan_collection(db, 'hackathonusers', select=fields)
+    else:
+        docs = db.collection('hackathonusers').where(watermark_field, '>=', state['watermark']) \
+            .order_by(watermark_field).select(fields).stream()
+
+    users = state['users']
+    start_watermark, start_ids = state['watermark'], set(state['watermark_ids'])
+    watermark, watermark_ids = start_watermark, set(start_ids)
+    added = changed = removed = 0
+    for doc in docs:
+        data = doc.to_dict()
+        marker = data.get(watermark_field)
+        if marker is not None and start_watermark is not None and marker == start_watermark \
+                and doc.id in start_ids:
+            # Counted by the previous refresh
+            continue
+        if marker is not None:
+            if watermark is None or marker > watermark:
+                watermark, watermark_ids = marker, {doc.id}
+            elif marker == watermark:
+                watermark_ids.add(doc.id)
+
+        if 'personalityResults' not in data:
+            if users.pop(doc.id, None) is not None:
+                removed += 1
+            continue
+        if doc.id in users:
+            changed += 1
+        else:
+            added += 1
+        personality = data['personalityResults']
+        users[doc.id] = {'role': user_role(data),
+                         'traits': {trait: personality[trait] for trait in TRAITS if trait in personality}}
+
+    state['watermark'], state['watermark_ids'] = watermark, watermark_ids
+    save_refresh_state(path, state)
+    print(f"Added {added} users, updated {changed} and removed {removed} since the last refresh")
+
+    results = calculate_distributions((user['role'], user['traits']) for user in users.values())
+    print_summary(results)
+    save_results(results, output)
+    return results
 
-    # Print summary
+
+def print_summary(results):
     print("\nPersonality Trait Analysis Summary:")
     print("==================================")
 
-    for trait in trait_stats:
+    for trait in TRAITS:
         print(f"\n{trait.upper()}")
         print("-" * len(trait))
 
         overall_stats = results['overall'][trait]
+        if not overall_stats:
+            print("No data")
+            continue
         print(f"Overall Range: {overall_stats['min']} to {overall_stats['max']}")
         print(f"Mean: {overall_stats['mean']:.2f}")
         print(f"Standard Deviation: {overall_stats['stdev']:.2f}")
         print(f"Sample Size: {overall_stats['count']}")
 
         print("\nBy Role:")
-        for role in ['founder', 'developer']:
+        for role in ROLES:
             role_stat = results['by_role'][role][trait]
             if role_stat:
                 print(f"{role.capitalize()}:")
@@ -107,13 +266,53 @@ def analyze_personality_distributions():
                 print(f"  Mean: {role_stat['mean']:.2f}")
                 print(f"  Sample Size: {role_stat['count']}")
 
+
+def save_results(results: Dict, path='personality_analysis.json'):
     # Save detailed results to JSON
-    with open('personality_analysis.json', 'w') as f:
+    with open(path, 'w') as f:
         json.dump(results, f, indent=2)
 
-    print("\nDetailed results have been saved to 'personality_analysis.json'")
-    return results
+    print(f"\nDetailed results have been saved to '{path}'")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Analyze personality trait distributions')
+    parser.add_argument('--cred-path', type=str,
+                        help='Path to Firebase credentials JSON file (default: $FOUNDERMATCHA_CREDENTIALS)')
+    parser.add_argument('--output', type=str, default='personality_analysis.json',
+                        help='Where to write the summary')
+    parser.add_argument('--streaming', action='store_true',
+                        help='One pass in constant memory (Welford moments and KLL quantile sketches)')
+    parser.add_argument('--sketch-k', type=int, default=200,
+                        help='KLL sketch size; larger is more accurate (streaming mode)')
+    parser.add_argument('--state-out', type=str,
+                        help='Save the sketch state to this file so it can be merged later (streaming mode)')
+    parser.add_argument('--merge', type=str, nargs='+', default=[], metavar='STATE',
+                        help='Merge saved shard states instead of reading users (streaming mode)')
+    parser.add_argument('--refresh', action='store_true',
+                        help='Only read users changed since the last refresh and update the saved state')
+    parser.add_argument('--watermark-field', type=str, default='updatedAt',
+                        help='User field holding the last-modified time (refresh mode)')
+    parser.add_argument('--full', action='store_true',
+                        help='Rebuild the refresh state from every user (refresh mode)')
+    args = parser.parse_args()
+
+    if args.merge:
+        analyze_personality_streaming(k=args.sketch_k, state_out=args.state_out, merge_states=args.merge,
+                                      output=args.output)
+        return
+
+    db = get_db(args.cred_path)
+    if args.refresh or args.full:
+        refresh_personality_analysis(db, output=args.output, watermark_field=args.watermark_field,
+                                     full=args.full)
+    elif args.streaming:
+        users = scan_collection(db, 'hackathonusers', select=['role', 'personalityResults'])
+        analyze_personality_streaming(users, k=args.sketch_k,
+                                      state_out=args.state_out, output=args.output)
+    else:
+        analyze_personality_distributions(db, output=args.output)
 
 
 if __name__ == "__main__":
-    analyze_personality_distributions()
\ No newline at end of file
+    main()
@@ -1,21 +1,42 @@
 # app.py
+"""
+FounderMatcha web app.
+
+Importing this module has no side effects: `create_app` builds the Flask app,
+and the Firestore client, matcher and background workers are created on first
+use through `get_db`, `get_matcher`, `get_snapshot_store` and
+`get_enrichment_queue`, once per process. Run it with `python app.py` or
+`gunicorn 'app:create_app()'`.
+"""
+import heapq
+import json
 import logging
 import os
+import threading
 import time
 from datetime import datetime
 from functools import wraps
 
-import firebase_admin
-from firebase_admin import credentials, firestore
-from flask import Flask, render_template, jsonify, request
+from flask import Blueprint, Flask, Response, current_app, render_template, jsonify, request, stream_with_context
+from google.api_core.exceptions import AlreadyExists, NotFound
 
 from models.calculate_matches import EnhancedMatcher
+from models.collection_scan import scan_collection
+from models.enrichment_queue import EnrichmentJob, EnrichmentQueue
+from models.firebase_client import get_client
+from models.match_ids import match_id_for
+from models.metrics import registry as metrics_registry, instrument_firestore, instrument_matcher
+from models.ranking_scheduler import RankingScheduler, get_precomputed_ranking
+from models.snapshot_store import SnapshotStore
+from models.status_events import delete_status_events, get_status_timeline, record_status_event
+from models.tracing import tracer
 
-# Set up logging
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
-app = Flask(__name__)
+bp = Blueprint('foundermatcha', __name__)
+
+# firestore.Query.DESCENDING, without importing the Firestore SDK before a client is needed
+DESCENDING = 'DESCENDING'
 
 
 def initialize_firebase():
@@ -25,10 +46,7 @@ def initialize_firebase():
 
     while attempt < max_attempts:
         try:
-            if not firebase_admin._apps:
-                cred = credentials.Certificate('firebase-credentials.json')
-                firebase_admin.initialize_app(cred)
-            return firestore.client()
+            return get_client()
         except Exception as e:
             attempt += 1
             if attempt == max_attempts:
@@ -72,14 +90,100 @@ def retry_on_firebase_error(f):
     return wrapper
 
 
-# Initialize Firebase with retry logic
-try:
-    db = initialize_firebase()
-    matcher = EnhancedMatcher('firebase-credentials.json')
-except Exception as e:
-    logger.error(f"Fatal error initializing Firebase: {e}")
-    db = None
-    matcher = None
+# Precomputed rankings: 'run' computes them in this process, 'read' only serves
+# rankings written by another process (python -m models.ranking_scheduler)
+RANKINGS_MODE = os.environ.get('FOUNDERMATCHA_RANKINGS', '').lower()
+RANKINGS_INTERVAL = int(os.environ.get('FOUNDERMATCHA_RANKINGS_INTERVAL', '900'))
+RANKINGS_MAX_AGE = RANKINGS_INTERVAL * 2
+
+# Full-collection reads (all users, insights) are split into key ranges read in parallel
+SCAN_PARTITIONS = int(os.environ.get('FOUNDERMATCHA_SCAN_PARTITIONS', '8'))
+SCAN_WORKERS = int(os.environ.get('FOUNDERMATCHA_SCAN_WORKERS', '4'))
+
+# Process-wide services, created on first use by the getters below
+_lock = threading.RLock()
+_db = None
+_matcher = None
+_snapshot_store = None
+_enrichment_queue = None
+_ranking_scheduler = None
+
+
+def get_db():
+    """The instrumented Firestore client, initialising Firebase on the first call"""
+    global _db
+    if _db is None:
+        with _lock:
+            if _db is None:
+                _db = instrument_firestore(initialize_firebase())
+    return _db
+
+
+def get_matcher():
+    global _matcher
+    if _matcher is None:
+        with _lock:
+            if _matcher is None:
+                _matcher = instrument_matcher(EnhancedMatcher())
+    return _matcher
+
+
+def get_snapshot_store():
+    global _snapshot_store
+    if _snapshot_store is None:
+        with _lock:
+            if _snapshot_store is None:
+                _snapshot_store = SnapshotStore(get_db())
+    return _snapshot_store
+
+
+def get_enrichment_queue():
+    """Queue computing ML features for stored matches off the request path; started on first use"""
+    global _enrichment_queue
+    if _enrichment_queue is None:
+        with _lock:
+            if _enrichment_queue is None:
+                queue = EnrichmentQueue(get_db())
+                queue.start()
+                _enrichment_queue = queue
+    return _enrichment_queue
+
+
+def start_ranking_scheduler():
+    """Start the in-process ranking worker pool once, when FOUNDERMATCHA_RANKINGS=run"""
+    global _ranking_scheduler
+    with _lock:
+        if _ranking_scheduler is None and RANKINGS_MODE == 'run':
+            _ranking_scheduler = RankingScheduler(get_db(), get_matcher(), interval=RANKINGS_INTERVAL,
+                                                  max_workers=int(os.environ.get('FOUNDERMATCHA_RANKING_WORKERS', '4')))
+            _ranking_scheduler.start()
+    return _ranking_scheduler
+
+
+def create_app(db=None, matcher=None):
+    """
+    Build the Flask app. `db` (e.g. the in-memory fake) and `matcher` replace the
+    lazily created ones for this process; the ranking scheduler, when enabled,
+    starts here rather than at import.
+    """
+    global _db, _matcher
+    with _lock:
+        if db is not None:
+            _db = instrument_firestore(db)
+        if matcher is not None:
+            _matcher = instrument_matcher(matcher)
+
+    app = Flask(__name__)
+    app.register_blueprint(bp)
+    metrics_registry.init_app(app)
+    tracer.init_app(app)
+
+    if RANKINGS_MODE == 'run':
+        try:
+            start_ranking_scheduler()
+        except Exception as e:
+            logger.error(f"Ranking scheduler not started: {e}")
+    return app
 
 
 def get_local_image_path(profileImageUrl):
@@ -91,7 +195,7 @@ def get_local_image_path(profileImageUrl):
 
     # Get the file system path by joining static folder with 'images' and the profileImageUrl
     fs_path = os.path.join(
-        app.static_folder,
+        current_app.static_folder,
         'images',
         profileImageUrl
     )
@@ -108,14 +212,21 @@ def get_local_image_path(profileImageUrl):
         logger.debug(f"Attempted to find file at: {fs_path}")
         return '/static/images/profiles/default-profile.png'
 
-@app.route('/')
+@bp.route('/')
 def index():
     try:
         # Get initial profiles from database without passing IDs
         initial_founder = get_founder_profile()
         logger.debug(f"Initial founder data: {initial_founder}")
 
-        initial_developer = get_developer_profile()
+        # Open on the founder's best precomputed match when one is available
+        top_developer_id = None
+        if RANKINGS_MODE and initial_founder:
+            ranking = get_precomputed_ranking(get_db(), initial_founder['id'], max_age=RANKINGS_MAX_AGE)
+            if ranking and ranking['developers']:
+                top_developer_id = ranking['developers'][0]['id']
+
+        initial_developer = get_developer_profile(top_developer_id)
         logger.debug(f"Initial developer data: {initial_developer}")
 
         if not initial_founder or not initial_developer:
@@ -141,7 +252,7 @@ def index():
 @retry_on_firebase_error
 def get_founder_profile(founder_id=None):
     try:
-        founders_ref = db.collection('hackathonusers')
+        founders_ref = get_db().collection('hackathonusers')
 
         if founder_id:
             # Convert ID to string if it's not already
@@ -189,7 +300,7 @@ def get_founder_profile(founder_id=None):
         logger.error(f"Error fetching founder profile: {e}")
         return None
 
-@app.route('/api/founders/<founder_id>', methods=['GET'])
+@bp.route('/api/founders/<founder_id>', methods=['GET'])
 @retry_on_firebase_error
 def get_founder(founder_id):
     try:
@@ -202,11 +313,11 @@ def get_founder(founder_id):
         return jsonify({'error': str(e)}), 500
 
 
-@app.route('/api/founders', methods=['GET'])
+@bp.route('/api/founders', methods=['GET'])
 @retry_on_firebase_error
 def get_founders():
     try:
-        founders_ref = db.collection('hackathonusers')
+        founders_ref = get_db().collection('hackathonusers')
         query = founders_ref.where('role', '==', 'founder / entrepreneur').limit(10)
 
         founders = []
@@ -230,7 +341,7 @@ def get_founders():
 @retry_on_firebase_error
 def get_developer_profile(developer_id=None):
     try:
-        devs_ref = db.collection('hackathonusers')
+        devs_ref = get_db().collection('hackathonusers')
 
         if developer_id:
             # Convert ID to string if it's not already
@@ -279,7 +390,7 @@ def get_developer_profile(developer_id=None):
         logger.error(f"Error fetching developer profile: {e}", exc_info=True)
         return None
 
-@app.route('/api/developers/<developer_id>', methods=['GET'])
+@bp.route('/api/developers/<developer_id>', methods=['GET'])
 @retry_on_firebase_error
 def get_developer(developer_id):
     try:
@@ -293,7 +404,52 @@ def get_developer(developer_id):
 
 
 
-@app.route('/api/match', methods=['POST'])
+def prepare_founder_for_matching(founder):
+    """Pick the fields EnhancedMatcher reads from a founder profile or raw user document"""
+    return {
+        'name': founder.get('name', ''),
+        'about': founder.get('about', ''),
+        'longDescription': founder.get('longDescription', ''),
+        'industries': founder.get('industries', []),
+        'role': 'founder / entrepreneur',
+        'personalityResults': founder.get('personalityResults', {}),
+        'degrees': founder.get('degrees', []),
+        'companies': founder.get('companies', []),
+        'admiringpersonalities': founder.get('admiringpersonalities', []),
+        'hobbies': founder.get('hobbies', [])
+    }
+
+
+def prepare_developer_for_matching(developer):
+    """Pick the fields EnhancedMatcher reads from a developer profile or raw user document"""
+    return {
+        'name': developer.get('name', ''),
+        'about': developer.get('about', ''),
+        'role': 'softwareEngineer',
+        'skills': developer.get('skills', []),
+        'personalityResults': developer.get('personalityResults', {}),
+        'degrees': developer.get('degrees', []),
+        'industries': developer.get('industries', []),
+        'companies': developer.get('companies', []),
+        'admiringpersonalities': developer.get('admiringpersonalities', []),
+        'hobbies': developer.get('hobbies', [])
+    }
+
+
+def format_match_scores(match_results):
+    """Shape EnhancedMatcher output for the frontend"""
+    return {
+        'total_score': match_results['total_score'],
+        'components': {
+            'skill_score': match_results['components']['skill_score'],
+            'personality_score': match_results['components']['personality_score'],
+            'background_score': match_results['components']['background_score'],
+            'cultural_score': match_results['components']['cultural_score']
+        }
+    }
+
+
+@bp.route('/api/match', methods=['POST'])
 def match():
     try:
         founder_id = request.json.get('founder_id')
@@ -313,50 +469,19 @@ def match():
             return jsonify({'error': 'Profile not found'}), 404
 
         # Add necessary fields for matching algorithm
-        founder_data = {
-            'name': founder.get('name', ''),
-            'about': founder.get('about', ''),
-            'longDescription': founder.get('longDescription', ''),
-            'industries': founder.get('industries', []),
-            'role': 'founder / entrepreneur',
-            'personalityResults': founder.get('personalityResults', {}),
-            'degrees': founder.get('degrees', []),
-            'companies': founder.get('companies', []),
-            'admiringpersonalities': founder.get('admiringpersonalities', []),
-            'hobbies': founder.get('hobbies', [])
-        }
-
-        developer_data = {
-            'name': developer.get('name', ''),
-            'about': developer.get('about', ''),
-            'role': 'softwareEngineer',
-            'skills': developer.get('skills', []),
-            'personalityResults': developer.get('personalityResults', {}),
-            'degrees': developer.get('degrees', []),
-            'industries': developer.get('industries', []),
-            'companies': developer.get('companies', []),
-            'admiringpersonalities': developer.get('admiringpersonalities', []),
-            'hobbies': developer.get('hobbies', [])
-        }
+        founder_data = prepare_founder_for_matching(founder)
+        developer_data = prepare_developer_for_matching(developer)
 
         logger.debug(f"Prepared founder data for matcher: {founder_data}")
         logger.debug(f"Prepared developer data for matcher: {developer_data}")
 
         # Calculate match using EnhancedMatcher
-        match_results = matcher.calculate_match_score(founder_data, developer_data)
+        match_results = get_matcher().calculate_match_score(founder_data, developer_data)
 
         logger.debug(f"Match results: {match_results}")
 
         # Format the response for frontend
-        response = {
-            'total_score': match_results['total_score'],
-            'components': {
-                'skill_score': match_results['components']['skill_score'],
-                'personality_score': match_results['components']['personality_score'],
-                'background_score': match_results['components']['background_score'],
-                'cultural_score': match_results['components']['cultural_score']
-            }
-        }
+        response = format_match_scores(match_results)
 
         logger.debug(f"Sending response: {response}")
         return jsonify(response)
@@ -364,12 +489,75 @@ def match():
         logger.error(f"Error in match calculation: {e}", exc_info=True)
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/developers', methods=['GET'])
+
+MAX_BATCH_PAIRS = 200
+
+
+@retry_on_firebase_error
+def get_profiles_by_id(user_ids):
+    """Fetch several user documents in one batched read, keyed by document ID"""
+    users_ref = get_db().collection('hackathonusers')
+    refs = [users_ref.document(str(user_id)) for user_id in user_ids]
+    return {doc.id: doc.to_dict() for doc in get_db().get_all(refs) if doc.exists}
+
+
+@bp.route('/api/match/batch', methods=['POST'])
+def match_batch():
+    """
+    Score many founder/developer pairs in one round trip.
+
+    Body: {"pairs": [{"founder_id": ..., "developer_id": ...}, ...]}
+    Add ?stream=1 to receive one NDJSON line per pair as it is scored.
+    """
+    try:
+        body = request.get_json(silent=True)
+        pairs = body.get('pairs') if isinstance(body, dict) else None
+        if not isinstance(pairs, list) or not pairs:
+            return jsonify({'error': 'Missing required parameter: pairs'}), 400
+        if len(pairs) > MAX_BATCH_PAIRS:
+            return jsonify({'error': f'At most {MAX_BATCH_PAIRS} pairs per request'}), 400
+        if not all(isinstance(pair, dict) and pair.get('founder_id') and pair.get('developer_id') for pair in pairs):
+            return jsonify({'error': 'Each pair must be an object with founder_id and developer_id'}), 400
+
+        pairs = [(str(pair.get('founder_id')), str(pair.get('developer_id'))) for pair in pairs]
+        user_ids = {user_id for pair in pairs for user_id in pair}
+        profiles = get_profiles_by_id(sorted(user_ids))
+        if profiles is None:
+            return jsonify({'error': 'Could not fetch profiles'}), 500
+
+        # Each distinct profile is prepared for the matcher once, however many pairs it is in
+        founders = {uid: prepare_founder_for_matching(data) for uid, data in profiles.items()
+                    if data.get('role') == 'founder / entrepreneur'}
+        developers = {uid: prepare_developer_for_matching(data) for uid, data in profiles.items()
+                      if data.get('role') == 'softwareEngineer'}
+
+        def score_pairs():
+            for founder_id, developer_id in pairs:
+                result = {'founder_id': founder_id, 'developer_id': developer_id}
+                if founder_id not in founders or developer_id not in developers:
+                    result['error'] = 'Profile not found'
+                else:
+                    match_results = get_matcher().calculate_match_score(founders[founder_id], developers[developer_id])
+                    result.update(format_match_scores(match_results))
+                yield result
+
+        if request.args.get('stream'):
+            def generate():
+                for result in score_pairs():
+                    yield json.dumps(result) + '\n'
+            return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+        return jsonify({'results': list(score_pairs())})
+    except Exception as e:
+        logger.error(f"Error in batch match calculation: {e}", exc_info=True)
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/api/developers', methods=['GET'])
 @retry_on_firebase_error
 def get_developers():
     try:
         current_id = request.args.get('current_id')
-        devs_ref = db.collection('hackathonusers')
+        devs_ref = get_db().collection('hackathonusers')
         query = devs_ref.where('role', '==', 'softwareEngineer').limit(10)
 
         if current_id:
@@ -401,14 +589,14 @@ def get_developers():
         return jsonify({'error': str(e)}), 500
 
 
-@app.route('/api/profiles/next', methods=['GET'])
+@bp.route('/api/profiles/next', methods=['GET'])
 @retry_on_firebase_error
 def next_profile():
     try:
         current_id = request.args.get('current_id')
         logger.debug(f"Fetching next profile after ID: {current_id}")
 
-        devs_ref = db.collection('hackathonusers')
+        devs_ref = get_db().collection('hackathonusers')
         query = devs_ref.where('role', '==', 'softwareEngineer').limit(1)
 
         if current_id:
@@ -452,27 +640,26 @@ def next_profile():
         logger.error(f"Error fetching next profile: {e}", exc_info=True)
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/profiles/previous', methods=['GET'])
+@bp.route('/api/profiles/previous', methods=['GET'])
 @retry_on_firebase_error
 def previous_profile():
     try:
         current_id = request.args.get('current_id')
-        devs_ref = db.collection('hackathonusers')
+        devs_ref = get_db().collection('hackathonusers')
         query = devs_ref.where('role', '==', 'softwareEngineer').limit(1)
 
         if current_id:
             current_dev_ref = devs_ref.document(current_id)
             current_dev = current_dev_ref.get()
             if current_dev.exists:
-                query = query.order_by('__name__', direction=firestore.Query.DESCENDING).start_after(current_dev)
+                query = query.order_by('__name__', direction=DESCENDING).start_after(current_dev)
 
         developers = list(query.stream())
 
         if not developers:
             # If no previous developer, wrap around to the last one
             query = devs_ref.where('role', '==', 'softwareEngineer').order_by('__name__',
-                                                                              direction=firestore.Query.DESCENDING).limit(
-                1)
+                                                                              direction=DESCENDING).limit(1)
             developers = list(query.stream())
 
         if developers:
@@ -495,7 +682,7 @@ def previous_profile():
         return jsonify({'error': str(e)}), 500
 
 
-@app.route('/api/matches/check', methods=['GET'])
+@bp.route('/api/matches/check', methods=['GET'])
 @retry_on_firebase_error
 def check_existing_match():
     try:
@@ -505,32 +692,35 @@ def check_existing_match():
         if not founder_id or not developer_id:
             return jsonify({'error': 'Missing required parameters'}), 400
 
-        # Query for existing match
-        matches = db.collection('matches').where('founder_id', '==', founder_id).where('developer_id', '==',
-                                                                                       developer_id).limit(1).get()
-
-        exists = len(list(matches)) > 0
+        # Matches are keyed by the pair (older ones are moved by `foundermatcha.py
+        # backfill-matches`), so this is a single document read
+        match_id = match_id_for(founder_id, developer_id)
+        exists = get_db().collection('matches').document(match_id).get().exists
 
-        return jsonify({'exists': exists})
+        return jsonify({'exists': exists, 'match_id': match_id if exists else None})
 
     except Exception as e:
         logger.error(f"Error checking existing match: {e}")
         return jsonify({'error': str(e)}), 500
 
 
-@app.route('/api/matches/<match_id>', methods=['DELETE'])
+@bp.route('/api/matches/<match_id>', methods=['DELETE'])
 @retry_on_firebase_error
 def delete_match(match_id):
     try:
         # Get match reference
-        match_ref = db.collection('matches').document(match_id)
+        match_ref = get_db().collection('matches').document(match_id)
         match = match_ref.get()
 
         if not match.exists:
             return jsonify({'error': 'Match not found'}), 404
 
-        # Delete the match
-        match_ref.delete()
+        # Delete the match with its status events (in one commit unless it has hundreds);
+        # the pair keeps the same match ID if it is matched again
+        batch = get_db().batch()
+        batch.delete(match_ref)
+        delete_status_events(get_db(), batch, match_id)
+        batch.commit()
 
         return jsonify({
             'success': True,
@@ -545,7 +735,33 @@ def delete_match(match_id):
         }), 500
 
 
-@app.route('/api/profiles/all', methods=['GET'])
+def developer_card(dev_id, dev_data):
+    """Developer card as returned by the ranking endpoints"""
+    return {
+        'id': dev_id,
+        'name': dev_data.get('name', 'Unknown Developer'),
+        'role': dev_data.get('role', 'Developer'),
+        'skills': dev_data.get('skills', []),
+        'workStyles': dev_data.get('workStyles', []),
+        'city': dev_data.get('city', ''),
+        'profileImageUrl': get_local_image_path(dev_data.get('profileImageUrl')),
+        'personalityResults': dev_data.get('personalityResults', {}),
+        'degrees': dev_data.get('degrees', []),
+        'industries': dev_data.get('industries', []),
+        'companies': dev_data.get('companies', []),
+        'admiringpersonalities': dev_data.get('admiringpersonalities', []),
+        'hobbies': dev_data.get('hobbies', [])
+    }
+
+
+def build_ranked_developer(dev_id, dev_data, founder_data):
+    """Developer card with its match score against the founder"""
+    developer = developer_card(dev_id, dev_data)
+    developer['match_score'] = get_matcher().calculate_match_score(founder_data, dev_data)
+    return developer
+
+
+@bp.route('/api/profiles/all', methods=['GET'])
 @retry_on_firebase_error
 def get_all_sorted_profiles():
     try:
@@ -557,22 +773,22 @@ def get_all_sorted_profiles():
         if not founder:
             return jsonify({'error': 'Founder profile not found'}), 404
 
+        # Serve the background-computed ranking when there is a fresh one
+        if RANKINGS_MODE and not request.args.get('fresh'):
+            ranking = get_precomputed_ranking(get_db(), founder['id'], max_age=RANKINGS_MAX_AGE)
+            if ranking:
+                ranked_developers = [dict(developer_card(entry['id'], entry['data']), match_score=entry['match_score'])
+                                     for entry in ranking['developers']]
+                response = jsonify(ranked_developers)
+                response.headers['X-Rankings-Source'] = 'precomputed'
+                response.headers['X-Rankings-Computed-At'] = ranking['computed_at']
+                return response
+
         # Prepare founder data for matching
-        founder_data = {
-            'name': founder.get('name', ''),
-            'about': founder.get('about', ''),
-            'longDescription': founder.get('longDescription', ''),
-            'industries': founder.get('industries', []),
-            'role': 'founder / entrepreneur',
-            'personalityResults': founder.get('personalityResults', {}),
-            'degrees': founder.get('degrees', []),
-            'companies': founder.get('companies', []),
-            'admiringpersonalities': founder.get('admiringpersonalities', []),
-            'hobbies': founder.get('hobbies', [])
-        }
+        founder_data = prepare_founder_for_matching(founder)
 
         # Get all developers
-        devs_ref = db.collection('hackathonusers')
+        devs_ref = get_db().collection('hackathonusers')
         query = devs_ref.where('role', '==', 'softwareEngineer').limit(100)  # Adjust limit as needed
         developers = list(query.stream())
 
@@ -580,47 +796,102 @@ def get_all_sorted_profiles():
         matched_developers = []
 
         for dev_doc in developers:
-            dev_data = dev_doc.to_dict()
-            developer = {
-                'id': dev_doc.id,
-                'name': dev_data.get('name', 'Unknown Developer'),
-                'role': dev_data.get('role', 'Developer'),
-                'skills': dev_data.get('skills', []),
-                'workStyles': dev_data.get('workStyles', []),
-                'city': dev_data.get('city', ''),
-                'profileImageUrl': get_local_image_path(dev_data.get('profileImageUrl')),
-                'personalityResults': dev_data.get('personalityResults', {}),
-                'degrees': dev_data.get('degrees', []),
-                'industries': dev_data.get('industries', []),
-                'companies': dev_data.get('companies', []),
-                'admiringpersonalities': dev_data.get('admiringpersonalities', []),
-                'hobbies': dev_data.get('hobbies', [])
-            }
-
-            # Calculate match score
-            match_results = matcher.calculate_match_score(founder_data, dev_data)
-            developer['match_score'] = match_results
-            matched_developers.append(developer)
+            matched_developers.append(build_ranked_developer(dev_doc.id, dev_doc.to_dict(), founder_data))
 
         # Sort developers by total match score in descending order
         matched_developers.sort(key=lambda x: x['match_score']['total_score'], reverse=True)
 
         logger.debug(f"Returning {len(matched_developers)} sorted matches for founder {founder.get('name')}")
-        return jsonify(matched_developers)
+        response = jsonify(matched_developers)
+        response.headers['X-Rankings-Source'] = 'live'
+        response.headers['X-Rankings-Computed-At'] = datetime.utcnow().isoformat()
+        return response
 
     except Exception as e:
         logger.error(f"Error getting sorted profiles: {e}", exc_info=True)
         return jsonify({'error': str(e)}), 500
 
 
-@app.route('/api/search/developers', methods=['GET'])
+@bp.route('/api/profiles/stream', methods=['GET'])
+def stream_sorted_profiles():
+    """
+    Stream ranked developers while the pool is being scored.
+
+    Developers are read and scored in chunks of `chunk_size`. After each chunk the
+    response carries the newly scored developers ("developers" event) and the
+    refined top `top_n` so far ("ranking" event); a final "done" event holds the
+    complete top-N. Server-Sent Events by default, NDJSON with ?format=ndjson.
+    """
+    founder_id = request.args.get('founder_id')
+    top_n = max(request.args.get('top_n', 10, type=int), 1)
+    chunk_size = min(max(request.args.get('chunk_size', 25, type=int), 1), 500)
+    as_ndjson = request.args.get('format') == 'ndjson'
+
+    founder = get_founder_profile(founder_id)
+    if not founder:
+        return jsonify({'error': 'Founder profile not found'}), 404
+    founder_data = prepare_founder_for_matching(founder)
+
+    def event(name, payload):
+        if as_ndjson:
+            return json.dumps({'event': name, **payload}) + '\n'
+        return f"event: {name}\ndata: {json.dumps(payload)}\n\n"
+
+    def ranking(top):
+        return [developer for _, _, developer in sorted(top, reverse=True)]
+
+    def generate():
+        top = []  # min-heap of (score, sequence, developer) holding the best top_n so far
+        scored = 0
+        cursor = None
+        try:
+            while True:
+                query = (get_db().collection('hackathonusers')
+                         .where('role', '==', 'softwareEngineer')
+                         .order_by('__name__')
+                         .limit(chunk_size))
+                if cursor is not None:
+                    query = query.start_after(cursor)
+                docs = list(query.stream())
+                if not docs:
+                    break
+
+                chunk = []
+                for dev_doc in docs:
+                    developer = build_ranked_developer(dev_doc.id, dev_doc.to_dict(), founder_data)
+                    chunk.append(developer)
+                    entry = (developer['match_score']['total_score'], scored, developer)
+                    scored += 1
+                    if len(top) < top_n:
+                        heapq.heappush(top, entry)
+                    elif entry[0] > top[0][0]:
+                        heapq.heapreplace(top, entry)
+
+                yield event('developers', {'developers': chunk})
+                yield event('ranking', {'developers': ranking(top), 'scored': scored, 'final': False})
+
+                if len(docs) < chunk_size:
+                    break
+                cursor = docs[-1]
+
+            yield event('done', {'developers': ranking(top), 'scored': scored, 'final': True})
+        except Exception as e:
+            logger.error(f"Error streaming sorted profiles: {e}", exc_info=True)
+            yield event('error', {'error': str(e)})
+
+    mimetype = 'application/x-ndjson' if as_ndjson else 'text/event-stream'
+    return Response(stream_with_context(generate()), mimetype=mimetype,
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+@bp.route('/api/search/developers', methods=['GET'])
 @retry_on_firebase_error
 def search_developers():
     try:
         query = request.args.get('q', '').lower()
         logger.debug(f"Searching developers with query: {query}")
 
-        devs_ref = db.collection('hackathonusers')
+        devs_ref = get_db().collection('hackathonusers')
         all_devs = devs_ref.where('role', '==', 'softwareEngineer').stream()
 
         results = []
@@ -645,14 +916,14 @@ def search_developers():
         return jsonify({'error': str(e)}), 500
 
 
-@app.route('/api/search/founders', methods=['GET'])
+@bp.route('/api/search/founders', methods=['GET'])
 @retry_on_firebase_error
 def search_founders():
     try:
         query = request.args.get('q', '').lower()
         logger.debug(f"Searching founders with query: {query}")
 
-        founders_ref = db.collection('hackathonusers')
+        founders_ref = get_db().collection('hackathonusers')
         all_founders = founders_ref.where('role', '==', 'founder / entrepreneur').stream()
 
         results = []
@@ -678,63 +949,137 @@ def search_founders():
 '''MATCHES DATABASE SECTION'''
 
 
-@app.route('/matches_dashboard')
+@bp.route('/matches_dashboard')
 def matches_dashboard():
     return render_template('matches_dashboard.html')
 
 
-@app.route('/api/matches', methods=['GET'])
+MATCH_STATUSES = ['successful', 'pending', 'failed']
+MATCHES_PAGE_SIZE = 50
+MAX_MATCHES_PAGE_SIZE = 200
+
+# Only the fields the matches dashboard renders; snapshots are resolved from their hashes and trimmed
+SNAPSHOT_LIST_FIELDS = ['name', 'city', 'skills', 'work_styles', 'industries', 'companies']
+MATCH_LIST_FIELDS = ['founder_id', 'developer_id', 'created_at', 'status', 'match_scores', 'ml_features',
+                     'ml_features_status', 'snapshot_refs'] + [
+    # Matches stored before the snapshot store embed their snapshots
+    f'profile_snapshots.{role}.{field}'
+    for role in ('founder', 'developer')
+    for field in SNAPSHOT_LIST_FIELDS
+]
+
+
+def filtered_matches_query(args, include_status=True):
+    """
+    Build the matches query for the dashboard filters. Equality filters narrow the
+    composite index and the score/date ranges are applied as inequality filters;
+    the indexes these combinations need are listed in firestore.indexes.json.
+    """
+    query = get_db().collection('matches')
+    for field in ('founder_id', 'developer_id'):
+        if args.get(field):
+            query = query.where(field, '==', args[field])
+    if include_status and args.get('status') and args['status'] != 'all':
+        query = query.where('status', '==', args['status'])
+
+    min_score = args.get('min_score', type=float)
+    max_score = args.get('max_score', type=float)
+    if min_score is not None:
+        query = query.where('match_scores.total_score', '>=', min_score)
+    if max_score is not None:
+        query = query.where('match_scores.total_score', '<', max_score)
+    if args.get('created_after'):
+        query = query.where('created_at', '>=', args['created_after'])
+    if args.get('created_before'):
+        query = query.where('created_at', '<', args['created_before'])
+    return query
+
+
+def count_matches(query):
+    """Server-side count aggregation; no documents are transferred"""
+    return query.count().get()[0][0].value
+
+
+@bp.route('/api/matches', methods=['GET'])
 @retry_on_firebase_error
 def get_matches():
+    """
+    One page of matches, newest first (highest score first when a score range is set).
+    Pass `next_cursor` back as `cursor` for the next page. Stats are only computed
+    for the first page.
+    """
     try:
-        matches_ref = db.collection('matches').order_by('created_at', direction=firestore.Query.DESCENDING).limit(50)
-        matches = list(matches_ref.stream())
+        page_size = min(request.args.get('page_size', MATCHES_PAGE_SIZE, type=int), MAX_MATCHES_PAGE_SIZE)
+        cursor = request.args.get('cursor')
 
-        # Convert to list of dictionaries
-        matches_data = []
-        stats = {'total': 0, 'successful': 0, 'pending': 0, 'failed': 0}
+        query = filtered_matches_query(request.args)
+        if 'min_score' in request.args or 'max_score' in request.args:
+            # Firestore requires the first ordering to be on the range-filtered field
+            query = query.order_by('match_scores.total_score', direction=DESCENDING)
+        query = query.order_by('created_at', direction=DESCENDING)
 
-        for match in matches:
+        if cursor:
+            cursor_doc = get_db().collection('matches').document(cursor).get()
+            if not cursor_doc.exists:
+                return jsonify({'error': 'Invalid cursor'}), 400
+            query = query.start_after(cursor_doc)
+
+        # One extra document tells us whether there is an older page
+        docs = list(query.select(MATCH_LIST_FIELDS).limit(page_size + 1).stream())
+        has_more = len(docs) > page_size
+
+        matches_data = []
+        for match in docs[:page_size]:
             match_dict = match.to_dict()
             match_dict['id'] = match.id
             matches_data.append(match_dict)
 
-            # Update stats
-            stats['total'] += 1
-            stats[match_dict['status']] += 1
+        # One batched read for every snapshot on the page; the dashboard reads profile_snapshots
+        get_snapshot_store().resolve_matches(matches_data, fields=SNAPSHOT_LIST_FIELDS)
+        for match_dict in matches_data:
+            match_dict.pop('snapshot_refs', None)
 
-        return jsonify({
+        response = {
             'matches': matches_data,
-            'stats': stats
-        })
+            'next_cursor': matches_data[-1]['id'] if has_more else None
+        }
+
+        if not cursor:
+            # Stats cover every match matching the other filters, not just this page
+            stats_query = filtered_matches_query(request.args, include_status=False)
+            stats = {'total': count_matches(stats_query)}
+            for status in MATCH_STATUSES:
+                stats[status] = count_matches(stats_query.where('status', '==', status))
+            response['stats'] = stats
+
+        return jsonify(response)
 
     except Exception as e:
         logger.error(f"Error fetching matches: {e}")
         return jsonify({'error': str(e)}), 500
 
 
-@app.route('/api/matches/store', methods=['POST'])
+@bp.route('/api/matches/store', methods=['POST'])
 @retry_on_firebase_error
 def store_match():
     try:
         data = request.json
-        match_ref = db.collection('matches').document()
+        match_ref = get_db().collection('matches').document(match_id_for(data['founder_id'], data['developer_id']))
 
         # Get full profiles for snapshot
         founder = get_founder_profile(data['founder_id'])
         developer = get_developer_profile(data['developer_id'])
 
+        timestamp = datetime.utcnow()
         match_data = {
+            # match_id and timestamp are the fields MatchCollector's history queries order by
+            'match_id': match_ref.id,
+            'timestamp': timestamp,
             'founder_id': data['founder_id'],
             'developer_id': data['developer_id'],
-            'created_at': datetime.utcnow().isoformat(),
-            'updated_at': datetime.utcnow().isoformat(),
+            'created_at': timestamp.isoformat(),
+            'updated_at': timestamp.isoformat(),
             'status': 'pending',
-            'status_history': [{
-                'status': 'pending',
-                'timestamp': datetime.utcnow().isoformat(),
-                'updated_by': data['founder_id']
-            }],
 
             'match_scores': {
                 'total_score': data['match_scores']['total_score'],
@@ -746,56 +1091,59 @@ def store_match():
                 }
             },
 
-            'ml_features': {
-                'location_match': get_location_match(data['founder_id'], data['developer_id']),
-                'industry_overlap': get_industry_overlap(data['founder_id'], data['developer_id']),
-                'skill_coverage': calculate_skill_coverage(founder, developer),
-                'personality_compatibility': calculate_personality_compatibility(founder, developer),
-                'experience_level_match': calculate_experience_match(founder, developer),
-                'prior_matches': {
-                    'founder': get_user_match_count(data['founder_id']),
-                    'developer': get_user_match_count(data['developer_id']),
-                    'success_rate_founder': get_success_rate(data['founder_id']),
-                    'success_rate_developer': get_success_rate(data['developer_id'])
-                }
-            },
+            # Filled in by the enrichment queue after the response is sent
+            'ml_features': None,
+            'ml_features_status': 'pending'
+        }
 
-            # Profile snapshots
-            'profile_snapshots': {
-                'founder': {
-                    'name': founder.get('name'),
-                    'skills': founder.get('skills'),
-                    'industries': founder.get('industries', []),
-                    'about': founder.get('about', ''),
-                    'personality_results': founder.get('personalityResults', {}),
-                    'degrees': founder.get('degrees', []),
-                    'companies': founder.get('companies', []),
-                    'city': founder.get('city', ''),
-                    'work_styles': founder.get('workStyles', [])
-                },
-                'developer': {
-                    'name': developer.get('name'),
-                    'skills': developer.get('skills', []),
-                    'industries': developer.get('industries', []),
-                    'about': developer.get('about', []),
-                    'personality_results': developer.get('personalityResults', {}),
-                    'degrees': developer.get('degrees', []),
-                    'companies': developer.get('companies', []),
-                    'city': developer.get('city', ''),
-                    'work_styles': developer.get('workStyles', []),
-                }
-            }
+        founder_snapshot = {
+            'name': founder.get('name'),
+            'skills': founder.get('skills'),
+            'industries': founder.get('industries', []),
+            'about': founder.get('about', ''),
+            'personality_results': founder.get('personalityResults', {}),
+            'degrees': founder.get('degrees', []),
+            'companies': founder.get('companies', []),
+            'city': founder.get('city', ''),
+            'work_styles': founder.get('workStyles', [])
+        }
+        developer_snapshot = {
+            'name': developer.get('name'),
+            'skills': developer.get('skills', []),
+            'industries': developer.get('industries', []),
+            'about': developer.get('about', []),
+            'personality_results': developer.get('personalityResults', {}),
+            'degrees': developer.get('degrees', []),
+            'companies': developer.get('companies', []),
+            'city': developer.get('city', ''),
+            'work_styles': developer.get('workStyles', []),
+        }
+
+        # The match embeds only content hashes; snapshots live in profile_snapshots/ and
+        # commit with it. create() is an atomic create-if-absent, so concurrent requests
+        # cannot duplicate a pair
+        batch = get_db().batch()
+        match_data['snapshot_refs'] = {
+            'founder': get_snapshot_store().put(founder_snapshot, batch),
+            'developer': get_snapshot_store().put(developer_snapshot, batch)
         }
+        batch.create(match_ref, match_data)
+        record_status_event(get_db(), batch, match_ref.id, 'pending', timestamp, data['founder_id'])
+        batch.commit()
+        get_snapshot_store().committed(founder_snapshot, developer_snapshot)
 
-        match_ref.set(match_data)
+        get_enrichment_queue().submit(EnrichmentJob(match_ref.id, data['founder_id'], data['developer_id'],
+                                              founder, developer, match_data['created_at']))
         return jsonify({'success': True, 'match_id': match_ref.id})
 
+    except AlreadyExists:
+        return jsonify({'success': False, 'error': 'Match already exists', 'match_id': match_ref.id}), 409
     except Exception as e:
         logger.error(f"Error storing match: {e}")
         return jsonify({'error': str(e)}), 500
 
 
-@app.route('/api/matches/<match_id>/status', methods=['PUT'])
+@bp.route('/api/matches/<match_id>/status', methods=['PUT'])
 @retry_on_firebase_error
 def update_match_status(match_id):
     try:
@@ -803,134 +1151,54 @@ def update_match_status(match_id):
         new_status = data['status']
         updater_id = data.get('updater_id')
 
-        match_ref = db.collection('matches').document(match_id)
-        match = match_ref.get()
-
-        if not match.exists:
-            return jsonify({'error': 'Match not found'}), 404
-
-        match_data = match.to_dict()
-
-        # Add new status to history
-        status_update = {
-            'status': new_status,
-            'timestamp': datetime.utcnow().isoformat(),
-            'updated_by': updater_id
-        }
+        timestamp = datetime.utcnow()
 
-        match_ref.update({
+        # The match only keeps its current status; the transition goes to the event log.
+        # The update fails with NotFound for a missing match, so no read is needed first
+        batch = get_db().batch()
+        batch.update(get_db().collection('matches').document(match_id), {
             'status': new_status,
-            'updated_at': datetime.utcnow().isoformat(),
-            'status_history': firestore.ArrayUnion([status_update])
+            'updated_at': timestamp.isoformat()
         })
+        record_status_event(get_db(), batch, match_id, new_status, timestamp, updater_id)
+        batch.commit()
 
         return jsonify({'success': True})
 
+    except NotFound:
+        return jsonify({'error': 'Match not found'}), 404
     except Exception as e:
         logger.error(f"Error updating match status: {e}")
         return jsonify({'error': str(e)}), 500
 
 
-def calculate_skill_coverage(founder, developer):
-    founder_industries = set(founder.get('industries', []))
-    developer_skills = set(developer.get('skills', []))
-    return len(developer_skills) / max(len(founder_industries), 1)
-
-
-def calculate_personality_compatibility(founder, developer):
-    f_personality = founder.get('personalityResults', {})
-    d_personality = developer.get('personalityResults', {})
-
-    if not f_personality or not d_personality:
-        return 0
-
-    traits = ['openness', 'conscientiousness', 'extraversion', 'agreeableness', 'neuroticism']
-    differences = []
-
-    for trait in traits:
-        f_score = f_personality.get(trait, 0)
-        d_score = d_personality.get(trait, 0)
-        differences.append(abs(f_score - d_score))
-
-    return 1 - (sum(differences) / (len(traits) * 100)) if differences else 0
-
-
-def calculate_experience_match(founder, developer):
-    f_companies = len(founder.get('companies', []))
-    d_companies = len(developer.get('companies', []))
-    return 1 - abs(f_companies - d_companies) / max(f_companies + d_companies, 1)
-
-
-def get_success_rate(user_id):
-    matches = db.collection('matches').where('founder_id', '==', user_id).get()
-    successful = 0
-    total = 0
-
-    for match in matches:
-        total += 1
-        if match.get('status') == 'successful':
-            successful += 1
-
-    return successful / total if total > 0 else 0
-
-
-# Location matching
-def get_location_match(founder_id, developer_id):
-    """Returns 1 if locations match, 0 otherwise"""
-    try:
-        founder = get_founder_profile(founder_id)
-        developer = get_developer_profile(developer_id)
-        return 1 if founder.get('city') == developer.get('city') else 0
-    except Exception as e:
-        logger.error(f"Error in location matching: {e}")
-        return 0
-
-
-# Industry overlap calculation
-def get_industry_overlap(founder_id, developer_id):
-    """Calculate percentage of overlapping industries"""
+@bp.route('/api/matches/<match_id>/timeline', methods=['GET'])
+@retry_on_firebase_error
+def get_match_timeline(match_id):
     try:
-        founder = get_founder_profile(founder_id)
-        developer = get_developer_profile(developer_id)
-
-        founder_industries = set(founder.get('industries', []))
-        developer_industries = set(developer.get('industries', []))
-
-        if not founder_industries or not developer_industries:
-            return 0
-
-        overlap = founder_industries.intersection(developer_industries)
-        total = founder_industries.union(developer_industries)
-
-        return len(overlap) / len(total)
+        events = get_status_timeline(get_db(), match_id)
+        for event in events:
+            # Stored as datetimes; the API keeps returning ISO strings
+            event['timestamp'] = event['timestamp'].isoformat()
+        return jsonify({'match_id': match_id, 'events': events})
     except Exception as e:
-        logger.error(f"Error in industry overlap: {e}")
-        return 0
+        logger.error(f"Error fetching match timeline: {e}")
+        return jsonify({'error': str(e)}), 500
 
 
-# Match history tracking
-def get_user_match_count(user_id):
-    """Get total number of matches for a user"""
-    try:
-        matches = db.collection('matches').where('founder_id', '==', user_id).get()
-        dev_matches = db.collection('matches').where('developer_id', '==', user_id).get()
-        return len(list(matches)) + len(list(dev_matches))
-    except Exception as e:
-        logger.error(f"Error getting match count: {e}")
-        return 0
-
 """INSIGHTS SECTION"""
 
 
-@app.route('/insights')
+@bp.route('/insights')
 def insights():
     return render_template('insights.html')
 
-@app.route('/api/insights/metrics')
+@bp.route('/api/insights/metrics')
 def get_insights_metrics():
     try:
         # Get all matches
-        matches_ref = db.collection('matches').stream()
+        matches_ref = scan_collection(get_db(), 'matches', select=['status', 'match_scores.total_score'],
+                                      partitions=SCAN_PARTITIONS, max_workers=SCAN_WORKERS)
         matches = [match.to_dict() for match in matches_ref]
 
         # Calculate metrics
@@ -950,11 +1218,14 @@ def get_insights_metrics():
         return jsonify({'error': str(e)}), 500
 
 
-@app.route('/api/insights/trends')
+@bp.route('/api/insights/trends')
 def get_insights_trends():
     try:
-        matches_ref = db.collection('matches').order_by('created_at').stream()
-        matches = [match.to_dict() for match in matches_ref]
+        matches_ref = scan_collection(get_db(), 'matches', select=['created_at', 'status', 'match_scores.total_score'],
+                                      partitions=SCAN_PARTITIONS, max_workers=SCAN_WORKERS)
+        # Ranges arrive in name order, so sort here (matches without created_at are skipped, as order_by did)
+        matches = sorted((match for match in (doc.to_dict() for doc in matches_ref) if match.get('created_at')),
+                         key=lambda match: match['created_at'])
 
         # Process daily data
         daily_data = {}
@@ -992,21 +1263,46 @@ def get_insights_trends():
         print(f"Error getting insights trends: {e}")
         return jsonify({'error': str(e)}), 500
 
+'''METRICS'''
+
+
+@bp.route('/metrics')
+def metrics():
+    """Per-route latency and Firestore operation metrics in Prometheus text format"""
+    return Response(metrics_registry.render(), mimetype='text/plain; version=0.0.4')
+
+
+@bp.route('/readyz')
+def readyz():
+    """Readiness probe: 200 once the Firestore client and matcher are initialised, 503 until then"""
+    try:
+        get_db()
+        get_matcher()
+    except Exception as e:
+        logger.error(f"Not ready: {e}")
+        return jsonify({'status': 'unavailable', 'error': str(e)}), 503
+    return jsonify({'status': 'ready'})
+
+
 '''ALL USERS DATABASE NO MATCHES'''
 
 
-@app.route('/user_database')
+@bp.route('/user_database')
 def user_database():
     return render_template('user_database.html')
 
 
-@app.route('/api/all_users')
+ALL_USERS_FIELDS = ['name', 'role', 'skills', 'industries', 'city', 'about', 'companies', 'degrees', 'workStyles',
+                    'profileImageUrl']
+
+
+@bp.route('/api/all_users')
 @retry_on_firebase_error
 def get_all_users():
     try:
         # Get all users from the database
-        users_ref = db.collection('hackathonusers')
-        all_users = list(users_ref.stream())
+        all_users = list(scan_collection(get_db(), 'hackathonusers', select=ALL_USERS_FIELDS,
+                                         partitions=SCAN_PARTITIONS, max_workers=SCAN_WORKERS, ordered=True))
 
         users_list = []
         for user in all_users:
@@ -1035,4 +1331,5 @@ def get_all_users():
 
 
 if __name__ == '__main__':
-    app.run(debug=True)
\ No newline at end of file
+    logging.basicConfig(level=logging.DEBUG)
+    create_app().run(debug=True)
\ No newline at end of file
@@ -0,0 +1,256 @@
+import argparse
+import bisect
+import datetime
+import json
+import logging
+import os
+from collections import Counter, defaultdict
+
+from models.batch_writer import BatchWriter, WriteOp
+from models.collection_scan import scan_collection
+from models.firebase_client import get_client
+from models.ml_features import PROFILE_FEATURE_COLUMNS, prepare_profile
+from models.snapshot_store import SnapshotStore, snapshot_hash
+
+# Set up logging
+logging.basicConfig(level=logging.INFO,
+                    format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+ALL_FEATURES = list(PROFILE_FEATURE_COLUMNS) + ['prior_matches']
+
+# Only what the features need; full match documents are never downloaded. app.py stores
+# created_at and profile_snapshots (or snapshot_refs); MatchCollector stores timestamp and
+# snapshot_refs, or founder_snapshot/developer_snapshot in older matches
+MATCH_FIELDS = ['founder_id', 'developer_id', 'created_at', 'timestamp', 'status', 'ml_features_status',
+                'snapshot_refs', 'profile_snapshots', 'founder_snapshot', 'developer_snapshot']
+
+
+def match_created_at(match):
+    """When a match was created, as a datetime, from either writer's field; None if unknown"""
+    created_at = match.get('created_at') or match.get('timestamp')
+    if isinstance(created_at, str):
+        try:
+            created_at = datetime.datetime.fromisoformat(created_at)
+        except ValueError:
+            return None
+    return created_at if isinstance(created_at, datetime.datetime) else None
+
+
+def match_status(match):
+    """Current status; MatchCollector keeps it under status.current"""
+    status = match.get('status')
+    return status.get('current') if isinstance(status, dict) else status
+
+
+def snapshot_profile(snapshot):
+    """Map a stored snapshot (snake_case keys) onto the profile keys the features read"""
+    return {
+        'city': snapshot.get('city'),
+        'industries': snapshot.get('industries'),
+        'skills': snapshot.get('skills'),
+        'companies': snapshot.get('companies'),
+        'personalityResults': snapshot.get('personality_results'),
+    }
+
+
+class PriorMatchIndex:
+    """
+    Group-by over every loaded match: sorted creation times per user and role, so the
+    prior-match features for any match are two binary searches instead of queries.
+    Mirrors models.ml_features.get_prior_match_stats.
+    """
+
+    def __init__(self, matches):
+        self.as_founder = defaultdict(list)
+        self.as_developer = defaultdict(list)
+        self.successful_as_founder = defaultdict(list)
+        for match in matches:
+            created_at = match.get('created_at')
+            if created_at is None:
+                continue
+            self.as_founder[match.get('founder_id')].append(created_at)
+            self.as_developer[match.get('developer_id')].append(created_at)
+            if match_status(match) == 'successful':
+                self.successful_as_founder[match.get('founder_id')].append(created_at)
+        for groups in (self.as_founder, self.as_developer, self.successful_as_founder):
+            for times in groups.values():
+                times.sort()
+
+    @staticmethod
+    def _before(groups, user_id, created_at):
+        return bisect.bisect_left(groups.get(user_id, []), created_at)
+
+    def stats(self, user_id, created_at):
+        as_founder = self._before(self.as_founder, user_id, created_at)
+        as_developer = self._before(self.as_developer, user_id, created_at)
+        successful = self._before(self.successful_as_founder, user_id, created_at)
+        return as_founder + as_developer, successful / as_founder if as_founder > 0 else 0
+
+
+class FeatureBackfill:
+    def __init__(self, db, features=None, batch_size=500, max_concurrency=4, checkpoint_path=None):
+        self.db = db
+        self.features = features or ALL_FEATURES
+        self.batch_size = batch_size
+        self.checkpoint_path = checkpoint_path
+        self.snapshots = SnapshotStore(db)
+        self.writer = BatchWriter(db, batch_size=batch_size, max_concurrency=max_concurrency)
+
+    def load_matches(self):
+        """
+        Every match, projected to the fields the features need, in document ID order,
+        with `created_at` as a datetime whichever writer stored it
+        """
+        docs = scan_collection(self.db, 'matches', select=MATCH_FIELDS, ordered=True)
+        matches = [dict(doc.to_dict(), id=doc.id) for doc in docs]
+        for match in matches:
+            match['created_at'] = match_created_at(match)
+        logger.info(f"Loaded {len(matches)} matches")
+        return matches
+
+    def load_checkpoint(self):
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return None
+        with open(self.checkpoint_path) as f:
+            checkpoint = json.load(f)
+        if set(checkpoint.get('features') or []) != set(self.features):
+            logger.warning("Checkpoint was written for a different feature set, starting over")
+            return None
+        return checkpoint
+
+    def save_checkpoint(self, last_match_id, stats):
+        if not self.checkpoint_path:
+            return
+        with open(self.checkpoint_path, 'w') as f:
+            json.dump({'last_match_id': last_match_id, 'features': self.features, 'stats': stats}, f, indent=2)
+
+    def resolve_profiles(self, chunk):
+        """
+        Prepared founder/developer profiles for a chunk, prepared once per distinct
+        snapshot, and a Counter of why the other matches were skipped
+        """
+        self.snapshots.resolve_matches([m for m in chunk if m.get('snapshot_refs')])
+        prepared = {}
+
+        def prepare(digest, snapshot):
+            # Content-addressed snapshots are shared across matches, so prepare each one once
+            key = digest or snapshot_hash(snapshot)
+            if key not in prepared:
+                prepared[key] = prepare_profile(snapshot_profile(snapshot))
+            return prepared[key]
+
+        founders, developers, usable, skipped = [], [], [], Counter()
+        for match in chunk:
+            refs = match.get('snapshot_refs') or {}
+            snapshots = match.get('profile_snapshots') or {'founder': match.get('founder_snapshot'),
+                                                            'developer': match.get('developer_snapshot')}
+            if match.get('created_at') is None:
+                skipped['no creation time'] += 1
+                continue
+            if not snapshots.get('founder') or not snapshots.get('developer'):
+                skipped['no profile snapshots'] += 1
+                continue
+            founders.append(prepare(refs.get('founder'), snapshots['founder']))
+            developers.append(prepare(refs.get('developer'), snapshots['developer']))
+            usable.append(match)
+        return usable, founders, developers, skipped
+
+    def compute(self, matches, founders, developers, prior_index):
+        """Feature columns for the chunk; returns one update dict per match"""
+        columns = {name: PROFILE_FEATURE_COLUMNS[name](founders, developers)
+                   for name in self.features if name in PROFILE_FEATURE_COLUMNS}
+        if 'prior_matches' in self.features:
+            founder_stats = [prior_index.stats(m['founder_id'], m['created_at']) for m in matches]
+            developer_stats = [prior_index.stats(m['developer_id'], m['created_at']) for m in matches]
+            columns['prior_matches'] = [
+                {'founder': f_count, 'developer': d_count,
+                 'success_rate_founder': f_rate, 'success_rate_developer': d_rate}
+                for (f_count, f_rate), (d_count, d_rate) in zip(founder_stats, developer_stats)
+            ]
+
+        updates = []
+        full = set(columns) == set(ALL_FEATURES)
+        for i, match in enumerate(matches):
+            values = {name: column[i] for name, column in columns.items()}
+            if full:
+                updates.append({'ml_features': values, 'ml_features_status': 'complete'})
+            elif match.get('ml_features_status', 'complete') == 'complete':
+                # Only the requested features change; the rest of the map is left as it is
+                updates.append({f'ml_features.{name}': value for name, value in values.items()})
+            else:
+                # A subset cannot fill in a match whose features were never computed
+                updates.append(None)
+        return updates
+
+    def run(self, dry_run=False):
+        matches = self.load_matches()
+        prior_index = PriorMatchIndex(matches) if 'prior_matches' in self.features else None
+
+        checkpoint = self.load_checkpoint()
+        stats = checkpoint['stats'] if checkpoint else {'updated': 0, 'skipped': 0, 'failed': 0}
+        skipped_by_reason = Counter(stats.setdefault('skipped_by_reason', {}))
+        if checkpoint:
+            ids = [match['id'] for match in matches]
+            matches = matches[bisect.bisect_right(ids, checkpoint['last_match_id']):]
+            logger.info(f"Resuming after {checkpoint['last_match_id']}, {len(matches)} matches left")
+
+        for start in range(0, len(matches), self.batch_size):
+            chunk = matches[start:start + self.batch_size]
+            usable, founders, developers, skipped = self.resolve_profiles(chunk)
+            updates = self.compute(usable, founders, developers, prior_index)
+
+            matches_ref = self.db.collection('matches')
+            operations = [WriteOp(match['id'], 'update', matches_ref.document(match['id']), update)
+                          for match, update in zip(usable, updates) if update is not None]
+            skipped['features never computed'] += len(usable) - len(operations)
+            skipped_by_reason.update(skipped)
+            stats['skipped_by_reason'] = {reason: count for reason, count in skipped_by_reason.items() if count}
+            stats['skipped'] += len(chunk) - len(operations)
+
+            if dry_run:
+                stats['updated'] += len(operations)
+            else:
+                for result in self.writer.write(operations):
+                    if result['success']:
+                        stats['updated'] += 1
+                    else:
+                        stats['failed'] += 1
+                        logger.error(f"Failed to update {result['key']}: {result['error']}")
+                self.save_checkpoint(chunk[-1]['id'], stats)
+            logger.info(f"Processed {start + len(chunk)}/{len(matches)} matches")
+
+        if not dry_run and self.checkpoint_path and os.path.exists(self.checkpoint_path):
+            # Finished, so the next run starts from the beginning
+            os.remove(self.checkpoint_path)
+        logger.info(f"Backfill complete: {stats['updated']} updated, {stats['skipped']} skipped, "
+                    f"{stats['failed']} failed")
+        for reason, count in stats['skipped_by_reason'].items():
+            logger.info(f"Skipped ({reason}): {count}")
+        return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Recompute ml_features for stored matches')
+    parser.add_argument('--cred-path', type=str,
+                        help='Path to Firebase credentials JSON file (default: $FOUNDERMATCHA_CREDENTIALS)')
+    parser.add_argument('--features', type=str, default=','.join(ALL_FEATURES),
+                        help=f'Comma-separated features to recompute (default: all of {", ".join(ALL_FEATURES)})')
+    parser.add_argument('--batch-size', type=int, default=500, help='Matches per write batch')
+    parser.add_argument('--workers', type=int, default=4, help='Concurrent batch commits')
+    parser.add_argument('--checkpoint', type=str, default='ml_features_backfill.checkpoint.json',
+                        help='Checkpoint file used to resume an interrupted run')
+    parser.add_argument('--dry-run', action='store_true', help='Compute features without writing them')
+    args = parser.parse_args()
+
+    features = [name.strip() for name in args.features.split(',') if name.strip()]
+    unknown = set(features) - set(ALL_FEATURES)
+    if unknown:
+        parser.error(f"Unknown features: {', '.join(sorted(unknown))}")
+
+    FeatureBackfill(get_client(args.cred_path), features=features, batch_size=args.batch_size, max_concurrency=args.workers,
+                    checkpoint_path=args.checkpoint).run(dry_run=args.dry_run)
+
+
+if __name__ == "__main__":
+    main()
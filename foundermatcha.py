@@ -0,0 +1,202 @@
+# foundermatcha.py
+"""
+Admin command line for FounderMatcha.
+
+Bundles the standalone admin scripts (ranking, pair scoring, personality,
+industry, skill and work-style reports, and the match backfills) as subcommands
+of one entry point. Commands that only read users accept `--snapshot` to serve
+`hackathonusers` from an on-disk copy instead of Firestore; see
+models/user_snapshot.py.
+
+    python foundermatcha.py --snapshot users.snapshot.json rank --founder-id <id>
+"""
+
+import argparse
+import logging
+import sys
+
+from models.collection_scan import scan_collection
+from models.firebase_client import get_client
+from models.user_snapshot import DEFAULT_MAX_AGE, snapshot_client
+
+logger = logging.getLogger(__name__)
+
+
+def read_client(args):
+    """
+    Client for commands that only read users: with --snapshot, hackathonusers is
+    served from the on-disk snapshot (rebuilt when older than --max-age)
+    """
+    if args.snapshot:
+        return snapshot_client(lambda: get_client(args.cred_path), args.snapshot, max_age=args.max_age,
+                               refresh=args.refresh_snapshot)
+    return get_client(args.cred_path)
+
+
+def cmd_rank(args):
+    from models.calculate_matches import EnhancedMatcher, ProfileStore, print_match
+
+    matcher = EnhancedMatcher()
+    founders, developers = ProfileStore(db=read_client(args)).load_users()
+    if args.founder_id:
+        founders = [founder for founder in founders if founder['id'] == args.founder_id]
+    if not founders or not developers:
+        print("No matching founder or no developers found")
+        return 1
+
+    founder = founders[0]
+    print(f"\nFinding matches for founder: {founder['name']}")
+    matches = matcher.find_matches(founder, developers, min_score=args.min_score)
+    print("\nTop Matches:")
+    for dev, match_results in matches[:args.top]:
+        print_match(dev, match_results)
+    return 0
+
+
+def cmd_pair(args):
+    from models.calculate_matches import EnhancedMatcher, ProfileStore, print_match
+
+    profiles = ProfileStore(db=read_client(args))
+    founder = profiles.get_profile(args.founder_id)
+    developer = profiles.get_profile(args.developer_id)
+    if founder is None or developer is None:
+        print("Founder or developer not found")
+        return 1
+
+    match_results = EnhancedMatcher().calculate_match_score(founder, developer)
+    print(f"\nFounder: {founder.get('name', args.founder_id)}")
+    print_match(developer, match_results)
+    return 0
+
+
+def cmd_analyze_personality(args):
+    import analyzepersonalitytraits as personality
+
+    db = read_client(args)
+    if args.refresh or args.full:
+        personality.refresh_personality_analysis(db, output=args.output, watermark_field=args.watermark_field,
+                                                 full=args.full)
+    elif args.streaming:
+        users = scan_collection(db, 'hackathonusers', select=['role', 'personalityResults'])
+        personality.analyze_personality_streaming(users, k=args.sketch_k, output=args.output)
+    else:
+        personality.analyze_personality_distributions(db, output=args.output)
+    return 0
+
+
+def report_command(name):
+    def run(args):
+        from pull_industries import run_analytics
+
+        return 0 if run_analytics([name], db=read_client(args), output_dir=args.output_dir) else 1
+    return run
+
+
+def cmd_workstyles(args):
+    from updateWorkStyle import FirebaseUpdater
+
+    if not args.update:
+        FirebaseUpdater(db=read_client(args)).display_current_status()
+        return 0
+
+    # Writes always go to Firestore, never to the snapshot
+    updater = FirebaseUpdater(db=get_client(args.cred_path))
+    result = updater.update_work_preferences(demo_mode=args.demo, batch_size=args.batch_size,
+                                             max_concurrency=args.workers, checkpoint_path=args.checkpoint)
+    updater.display_current_status()
+    return 0 if not result['failed'] else 1
+
+
+def cmd_backfill_matches(args):
+    from models.matches_collector import MatchCollector
+    from models.status_events import backfill_event_timestamps, backfill_status_history
+
+    db = get_client(args.cred_path)
+    collector = MatchCollector(db)
+    rekeyed = collector.rekey_legacy_matches(batch_size=args.batch_size, max_concurrency=args.workers)
+    print(f"Moved {rekeyed['moved']} matches stored under random IDs to their pair IDs")
+    if rekeyed['conflicts']:
+        print(f"{rekeyed['conflicts']} matches duplicate a pair that already has a match and were left in place")
+    matches = collector.backfill_history_fields(
+        batch_size=args.batch_size, max_concurrency=args.workers, checkpoint_path=args.checkpoint)
+    if matches['skipped']:
+        print(f"{matches['skipped']} matches have no usable created_at and were left unchanged")
+    history = backfill_status_history(db, batch_size=args.batch_size, max_concurrency=args.workers,
+                                      checkpoint_path=args.history_checkpoint)
+    print(f"Copied {history['events']} status history entries to match_status_events")
+    if history['skipped']:
+        print(f"{history['skipped']} status histories have an unparseable timestamp and were left unchanged")
+    events = backfill_event_timestamps(db, batch_size=args.batch_size, max_concurrency=args.workers,
+                                       checkpoint_path=args.events_checkpoint)
+    if events['skipped']:
+        print(f"{events['skipped']} status events have an unparseable timestamp and were left unchanged")
+    failed = rekeyed['failed'] + matches['failed'] + history['failed'] + events['failed']
+    return 0 if not failed else 1
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='foundermatcha', description='FounderMatcha admin tools')
+    parser.add_argument('--cred-path', type=str,
+                        help='Path to Firebase credentials JSON file (default: $FOUNDERMATCHA_CREDENTIALS)')
+    parser.add_argument('--snapshot', type=str, metavar='PATH',
+                        help='Serve reads of hackathonusers from this on-disk snapshot, creating it if needed')
+    parser.add_argument('--max-age', type=int, default=DEFAULT_MAX_AGE,
+                        help='Seconds before the snapshot is re-read from Firestore')
+    parser.add_argument('--refresh-snapshot', action='store_true', help='Re-read the snapshot now')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    rank = subparsers.add_parser('rank', help="Rank developers for a founder")
+    rank.add_argument('--founder-id', type=str, help='Founder to rank for (default: the first founder)')
+    rank.add_argument('--min-score', type=float, default=30.0, help='Lowest total score listed')
+    rank.add_argument('--top', type=int, default=10, help='Developers listed')
+    rank.set_defaults(func=cmd_rank)
+
+    pair = subparsers.add_parser('pair', help='Score one founder/developer pair')
+    pair.add_argument('founder_id')
+    pair.add_argument('developer_id')
+    pair.set_defaults(func=cmd_pair)
+
+    personality = subparsers.add_parser('analyze-personality', help='Personality trait distributions')
+    personality.add_argument('--output', type=str, default='personality_analysis.json')
+    personality.add_argument('--streaming', action='store_true', help='One pass with mergeable sketches')
+    personality.add_argument('--refresh', action='store_true', help='Only read users changed since the last run')
+    personality.add_argument('--full', action='store_true', help='Rebuild the refresh state')
+    personality.add_argument('--watermark-field', type=str, default='updatedAt')
+    personality.add_argument('--sketch-k', type=int, default=200)
+    personality.set_defaults(func=cmd_analyze_personality)
+
+    for name, help_text in (('industries', 'Industry frequency and role overlap report'),
+                            ('skills', 'Software engineer skill inventory report')):
+        report = subparsers.add_parser(name, help=help_text)
+        report.add_argument('--output-dir', type=str, default='.')
+        report.set_defaults(func=report_command(name))
+
+    workstyles = subparsers.add_parser('workstyles', help='Work-style distribution, or bulk-set work styles')
+    workstyles.add_argument('--update', action='store_true', help='Give users without work styles random ones')
+    workstyles.add_argument('--demo', action='store_true', help='With --update, overwrite every user')
+    workstyles.add_argument('--batch-size', type=int, default=500)
+    workstyles.add_argument('--workers', type=int, default=4)
+    workstyles.add_argument('--checkpoint', type=str, default='work_styles_update.checkpoint')
+    workstyles.set_defaults(func=cmd_workstyles)
+
+    backfill = subparsers.add_parser('backfill-matches',
+                                     help='Move matches to pair IDs, add the fields match history orders by, '
+                                          'copy status history arrays to events and make their timestamps '
+                                          'datetimes')
+    backfill.add_argument('--batch-size', type=int, default=500)
+    backfill.add_argument('--workers', type=int, default=4)
+    backfill.add_argument('--checkpoint', type=str, default='match_history_backfill.checkpoint')
+    backfill.add_argument('--history-checkpoint', type=str, default='status_history_backfill.checkpoint')
+    backfill.add_argument('--events-checkpoint', type=str, default='status_events_backfill.checkpoint')
+    backfill.set_defaults(func=cmd_backfill_matches)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
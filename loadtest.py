@@ -0,0 +1,303 @@
+# loadtest.py
+"""
+Load-test harness that drives app.py against an in-memory Firestore fake.
+
+Each simulated founder runs in its own thread with its own Flask test client and
+picks actions from a weighted traffic mix. At the end the harness prints per-route
+latency percentiles, throughput and the Firestore reads/writes each route caused.
+
+    python loadtest.py --founders 50 --duration 30 --mix default
+"""
+
+import argparse
+import json
+import logging
+import math
+import random
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from models.fake_firestore import FakeFirestore
+from models.read_budget import check_route_budgets
+
+logging.basicConfig(level=logging.INFO,
+                    format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+FOUNDER_ROLE = 'founder / entrepreneur'
+DEVELOPER_ROLE = 'softwareEngineer'
+
+CITIES = ['London', 'Manchester', 'Bristol', 'Edinburgh', 'Leeds', 'Cambridge']
+DEGREES = ['Computer Science', 'Software Engineering', 'Data Science', 'Mathematics',
+           'Business Management', 'Economics', 'MBA', 'Mechanical Engineering']
+COMPANIES = ['Google', 'Amazon', 'Monzo', 'Revolut', 'Deliveroo', 'ARM', 'DeepMind', 'Ocado']
+HOBBIES = ['Climbing', 'Hiking', 'Chess', 'Surfing', 'Reading', 'Gaming', 'Biking', 'Cooking']
+PERSONALITIES = ['Elon Musk', 'Steve Jobs', 'Ada Lovelace', 'Marie Curie', 'Alan Turing']
+WORK_STYLES = ['Remote', 'Hybrid', 'On-site']
+
+# Relative weights of each action in a traffic mix
+TRAFFIC_MIXES = {
+    'default': {'swipe': 40, 'match': 20, 'store': 10, 'search': 15, 'insights': 5, 'ranked': 10},
+    'browse': {'swipe': 60, 'match': 15, 'store': 2, 'search': 15, 'insights': 3, 'ranked': 5},
+    'write': {'swipe': 20, 'match': 10, 'store': 50, 'search': 5, 'insights': 10, 'ranked': 5},
+}
+
+
+def load_industry_mappings():
+    json_path = Path(__file__).parent / 'models' / 'industries.json'
+    with open(json_path, 'r') as f:
+        return json.load(f)['industries.json']['mappings']
+
+
+def generate_users(founders: int, developers: int, seed: int = 42):
+    """Generate synthetic hackathonusers documents shaped like production data"""
+    rng = random.Random(seed)
+    mappings = load_industry_mappings()
+    industries = sorted(mappings)
+    all_skills = sorted({skill for m in mappings.values() for skill in m['primary'] + m['secondary']})
+
+    def personality():
+        return {
+            'openness': rng.randint(-2, 25),
+            'conscientiousness': rng.randint(-2, 25),
+            'extraversion': rng.randint(-3, 25),
+            'agreeableness': rng.randint(-2, 25),
+            'neuroticism': rng.randint(5, 83),
+        }
+
+    def common(index):
+        return {
+            'city': rng.choice(CITIES),
+            'degrees': rng.sample(DEGREES, rng.randint(1, 2)),
+            'companies': rng.sample(COMPANIES, rng.randint(0, 3)),
+            'hobbies': rng.sample(HOBBIES, rng.randint(1, 3)),
+            'admiringpersonalities': rng.sample(PERSONALITIES, rng.randint(0, 2)),
+            'workStyles': sorted(rng.sample(WORK_STYLES, rng.randint(1, 3))),
+            'personalityResults': personality(),
+            'profileImageUrl': f'profiles/_{index}.jpg',
+        }
+
+    users = {}
+    for i in range(founders):
+        industry = rng.choice(industries)
+        users[f'founder{i:05d}'] = dict(
+            common(i),
+            name=f'Founder {i}',
+            role=FOUNDER_ROLE,
+            about=f'Building the next {industry} platform.',
+            longDescription=f'We are an early-stage {industry} startup looking for a technical co-founder.',
+            industries=rng.sample(industries, rng.randint(1, 3)),
+            skills=[],
+        )
+    for i in range(developers):
+        users[f'dev{i:05d}'] = dict(
+            common(i),
+            name=f'Developer {i}',
+            role=DEVELOPER_ROLE,
+            about='Engineer who enjoys shipping products.',
+            industries=rng.sample(industries, rng.randint(1, 3)),
+            skills=rng.sample(all_skills, rng.randint(2, 6)),
+        )
+    return users
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(pct / 100.0 * len(sorted_values)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+class LoadTest:
+    def __init__(self, flask_app, db, founder_ids, developer_ids, mix, seed=0):
+        self.app = flask_app
+        self.db = db
+        self.founder_ids = founder_ids
+        self.developer_ids = developer_ids
+        self.actions, self.weights = zip(*TRAFFIC_MIXES[mix].items())
+        self.seed = seed
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def _call(self, client, route, method, url, **kwargs):
+        with self.db.stats.track(route):
+            start = time.perf_counter()
+            try:
+                response = client.open(url, method=method, **kwargs)
+                failed = response.status_code >= 500
+            except Exception as e:
+                logger.error(f"{route} raised: {e}")
+                response, failed = None, True
+            elapsed = time.perf_counter() - start
+        with self._lock:
+            self.latencies[route].append(elapsed)
+            if failed:
+                self.errors[route] += 1
+        return response
+
+    def _run_action(self, client, rng, action, state):
+        founder_id = state['founder_id']
+        if action == 'swipe':
+            direction = rng.choice(['next', 'next', 'previous'])
+            response = self._call(client, f'GET /api/profiles/{direction}', 'GET',
+                                  f"/api/profiles/{direction}?current_id={state['developer_id']}")
+            if response is not None and response.status_code == 200:
+                state['developer_id'] = response.get_json().get('id', state['developer_id'])
+            self._call(client, 'GET /api/developers/<id>', 'GET', f"/api/developers/{state['developer_id']}")
+        elif action == 'match':
+            self._call(client, 'POST /api/match', 'POST', '/api/match',
+                       json={'founder_id': founder_id, 'developer_id': rng.choice(self.developer_ids)})
+        elif action == 'store':
+            developer_id = rng.choice(self.developer_ids)
+            response = self._call(client, 'GET /api/matches/check', 'GET',
+                                  f'/api/matches/check?founder_id={founder_id}&developer_id={developer_id}')
+            if response is not None and response.status_code == 200 and response.get_json().get('exists'):
+                return
+            scores = {'total_score': round(rng.uniform(30, 95), 2),
+                      'components': {'skill_score': 50.0, 'personality_score': 50.0,
+                                     'background_score': 50.0, 'cultural_score': 50.0}}
+            self._call(client, 'POST /api/matches/store', 'POST', '/api/matches/store',
+                       json={'founder_id': founder_id, 'developer_id': developer_id, 'match_scores': scores})
+        elif action == 'search':
+            term = rng.choice(['dev', 'back', 'front', 'cloud', 'data', '1', 'founder'])
+            if rng.random() < 0.5:
+                self._call(client, 'GET /api/search/developers', 'GET', f'/api/search/developers?q={term}')
+            else:
+                self._call(client, 'GET /api/search/founders', 'GET', f'/api/search/founders?q={term}')
+        elif action == 'insights':
+            self._call(client, 'GET /api/insights/metrics', 'GET', '/api/insights/metrics')
+            self._call(client, 'GET /api/insights/trends', 'GET', '/api/insights/trends')
+            self._call(client, 'GET /api/matches', 'GET', '/api/matches')
+        elif action == 'ranked':
+            self._call(client, 'GET /api/profiles/all', 'GET', f'/api/profiles/all?founder_id={founder_id}')
+
+    def _worker(self, index, deadline, iterations):
+        rng = random.Random(self.seed + index)
+        client = self.app.test_client()
+        state = {
+            'founder_id': self.founder_ids[index % len(self.founder_ids)],
+            'developer_id': rng.choice(self.developer_ids),
+        }
+        done = 0
+        while time.perf_counter() < deadline and (iterations is None or done < iterations):
+            action = rng.choices(self.actions, weights=self.weights)[0]
+            self._run_action(client, rng, action, state)
+            done += 1
+
+    def run(self, concurrency, duration, iterations=None):
+        self.db.stats.reset()
+        deadline = time.perf_counter() + duration
+        threads = [threading.Thread(target=self._worker, args=(i, deadline, iterations), daemon=True)
+                   for i in range(concurrency)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return self.report(time.perf_counter() - start)
+
+    def report(self, elapsed):
+        rows = []
+        for route in sorted(self.latencies):
+            values = sorted(self.latencies[route])
+            counts = self.db.stats.by_scope[route]
+            requests = len(values)
+            rows.append({
+                'route': route,
+                'requests': requests,
+                'errors': self.errors[route],
+                'throughput_rps': requests / elapsed if elapsed else 0.0,
+                'p50_ms': percentile(values, 50) * 1000,
+                'p95_ms': percentile(values, 95) * 1000,
+                'p99_ms': percentile(values, 99) * 1000,
+                'reads_per_request': counts['reads'] / requests,
+                'documents_per_request': counts['documents'] / requests,
+                'writes_per_request': counts['writes'] / requests,
+            })
+        return {'elapsed_s': elapsed, 'routes': rows, 'firestore_totals': self.db.stats.totals()}
+
+
+def print_report(report):
+    header = (f"{'Route':<34}{'Reqs':>7}{'Errs':>6}{'RPS':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+              f"{'Reads/req':>11}{'Docs/req':>10}{'Writes/req':>12}")
+    print(f"\n=== Load Test Report ({report['elapsed_s']:.1f}s) ===")
+    print(header)
+    print('-' * len(header))
+    for row in report['routes']:
+        print(f"{row['route']:<34}{row['requests']:>7}{row['errors']:>6}{row['throughput_rps']:>8.1f}"
+              f"{row['p50_ms']:>9.1f}{row['p95_ms']:>9.1f}{row['p99_ms']:>9.1f}"
+              f"{row['reads_per_request']:>11.1f}{row['documents_per_request']:>10.1f}"
+              f"{row['writes_per_request']:>12.1f}")
+    totals = report['firestore_totals']
+    print(f"\nFirestore totals: {totals['reads']} reads ({totals['documents']} documents), "
+          f"{totals['writes']} writes")
+
+
+def build_app(db):
+    """Build app.py's Flask app against the fake database"""
+    import app as app_module
+
+    # app.py logs every profile at DEBUG, which would dominate the measurements
+    logging.getLogger().setLevel(logging.WARNING)
+    logger.setLevel(logging.INFO)
+
+    return app_module.create_app(db=db)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test app.py against an in-memory Firestore fake')
+    parser.add_argument('--founders', type=int, default=50,
+                        help='Number of concurrent simulated founders')
+    parser.add_argument('--duration', type=float, default=30.0,
+                        help='Test duration in seconds')
+    parser.add_argument('--iterations', type=int,
+                        help='Stop each founder after this many actions')
+    parser.add_argument('--mix', choices=sorted(TRAFFIC_MIXES), default='default',
+                        help='Traffic mix to replay')
+    parser.add_argument('--users', type=int, default=400,
+                        help='Number of synthetic users to seed (half founders, half developers)')
+    parser.add_argument('--latency-ms', type=float, default=5.0,
+                        help='Simulated Firestore round-trip latency in milliseconds')
+    parser.add_argument('--seed', type=int, default=42,
+                        help='Random seed for data generation and traffic')
+    parser.add_argument('--json', type=str,
+                        help='Also write the report to this JSON file')
+    parser.add_argument('--check-budgets', action='store_true',
+                        help='Replay each route once and fail if it exceeds its Firestore read/write budget')
+    args = parser.parse_args()
+
+    db = FakeFirestore(latency=args.latency_ms / 1000.0)
+    users = generate_users(args.users // 2, args.users - args.users // 2, seed=args.seed)
+    db.load('hackathonusers', users)
+    founder_ids = [uid for uid, data in users.items() if data['role'] == FOUNDER_ROLE]
+    developer_ids = [uid for uid, data in users.items() if data['role'] == DEVELOPER_ROLE]
+
+    flask_app = build_app(db)
+
+    if args.check_budgets:
+        violations = check_route_budgets(flask_app, db, founder_ids[0], developer_ids[0])
+        for violation in violations:
+            logger.error(violation)
+        if violations:
+            raise SystemExit(1)
+        logger.info("All routes are within their Firestore budgets")
+        return
+
+    logger.info(f"Running {args.mix} mix with {args.founders} founders for {args.duration}s "
+                f"against {len(users)} users")
+    test = LoadTest(flask_app, db, founder_ids, developer_ids, args.mix, seed=args.seed)
+    report = test.run(args.founders, args.duration, args.iterations)
+    print_report(report)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        logger.info(f"Report saved to {args.json}")
+
+
+if __name__ == '__main__':
+    main()
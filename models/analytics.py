@@ -0,0 +1,313 @@
+# analytics.py
+"""
+Single-scan analytics over `hackathonusers`.
+
+An AnalyticsPipeline streams the collection once, projected to the union of the
+fields its aggregators need, and hands every document to each aggregator. Each
+aggregator builds its own report and writes it to its own file, so any mix of
+reports costs one collection read.
+
+To add a report, subclass Aggregator: declare `fields`, accumulate in `add`, and
+return the report from `report`.
+"""
+
+import json
+import logging
+import os
+from collections import Counter
+from datetime import datetime
+
+from models.collection_scan import scan_collection
+from models.personality_stats import TRAITS, StreamingPersonalityStats, user_role
+
+logger = logging.getLogger(__name__)
+
+# Role values are matched exactly, as Firestore equality queries match them
+DEVELOPER_ROLE = 'softwareEngineer'
+FOUNDER_ROLE = 'founder / entrepreneur'
+
+WORK_STYLES = {'Remote', 'Hybrid', 'On-site'}
+
+WORK_STYLE_COMBINATIONS = {
+    frozenset(['Remote']): 'Remote only',
+    frozenset(['Hybrid']): 'Hybrid only',
+    frozenset(['On-site']): 'On-site only',
+    frozenset(['Remote', 'Hybrid']): 'Remote & Hybrid',
+    frozenset(['Hybrid', 'On-site']): 'Hybrid & On-site',
+    frozenset(['Remote', 'On-site']): 'Remote & On-site',
+    frozenset(WORK_STYLES): 'All styles',
+}
+
+# workStyles as a 3-bit mask, so a combination is an index into an 8-slot count list
+WORK_STYLE_BITS = {'Remote': 1, 'Hybrid': 2, 'On-site': 4}
+WORK_STYLE_MASKS = {label: sum(WORK_STYLE_BITS[style] for style in styles)
+                    for styles, label in WORK_STYLE_COMBINATIONS.items()}
+WORK_STYLE_MASKS['Not Set'] = 0
+
+
+def work_style_mask(styles):
+    """
+    Bit mask of a workStyles array (0 when it is missing or empty); None if it holds
+    anything but the three known styles, each at most once, since such arrays cannot
+    be matched by the count queries in updateWorkStyle.py either
+    """
+    mask = 0
+    for style in styles or []:
+        bit = WORK_STYLE_BITS.get(style)
+        if bit is None or mask & bit:
+            return None
+        mask |= bit
+    return mask
+
+
+def work_style_distribution(mask_counts):
+    """{label: count} in report order from an 8-slot list of counts per mask"""
+    return {label: mask_counts[mask] for label, mask in WORK_STYLE_MASKS.items()}
+
+
+class Aggregator:
+    name = None
+    fields = []
+    filename = None
+
+    def add(self, user_id, data):
+        raise NotImplementedError
+
+    def report(self):
+        raise NotImplementedError
+
+    def print_report(self, report):
+        pass
+
+    def write(self, report, output_dir='.', timestamp=None):
+        """Write the report as JSON; `filename` may use {timestamp}"""
+        timestamp = timestamp or datetime.now().strftime("%Y%m%d_%H%M%S")
+        path = os.path.join(output_dir, self.filename.format(timestamp=timestamp))
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=2)
+        return path
+
+
+class IndustryAggregator(Aggregator):
+    """Industry frequency across all users, plus which industries each role lists and their overlap"""
+    name = 'industries'
+    fields = ['name', 'role', 'industries']
+    filename = 'industry_analysis_{timestamp}.json'
+
+    def __init__(self):
+        self.industry_frequency = Counter()
+        self.industries_by_role = {'founder': set(), 'developer': set()}
+        self.user_industry_mapping = []
+
+    def add(self, user_id, data):
+        user_industries = data.get('industries', [])
+        role = user_role(data)
+        self.industry_frequency.update(user_industries)
+        self.industries_by_role[role].update(user_industries)
+        if user_industries:
+            self.user_industry_mapping.append({
+                'user_id': user_id,
+                'name': data.get('name', 'Unknown'),
+                'role': role,
+                'industries': user_industries
+            })
+
+    def report(self):
+        all_industries = set(self.industry_frequency)
+        founder, developer = self.industries_by_role['founder'], self.industries_by_role['developer']
+        return {
+            'metadata': {
+                'total_unique_industries': len(all_industries),
+                'extraction_date': datetime.now().isoformat(),
+                'total_users_analyzed': len(self.user_industry_mapping)
+            },
+            'industry_stats': {
+                'all_industries_sorted': sorted(all_industries),
+                'industry_frequency': dict(self.industry_frequency),
+                'industries_by_role': {
+                    'founder': sorted(founder),
+                    'developer': sorted(developer),
+                    'overlap': sorted(founder & developer)
+                },
+                'frequency_analysis': {
+                    'most_common': self.industry_frequency.most_common(5),
+                    'least_common': self.industry_frequency.most_common()[:-6:-1]
+                }
+            },
+            'user_industry_mapping': self.user_industry_mapping
+        }
+
+    def print_report(self, report):
+        stats = report['industry_stats']
+        print("\n=== Industry Analysis Report ===")
+        print(f"\nTotal Unique Industries: {report['metadata']['total_unique_industries']}")
+        print(f"Total Users Analyzed: {report['metadata']['total_users_analyzed']}")
+
+        print("\nAll Industries (Sorted):")
+        for industry in stats['all_industries_sorted']:
+            print(f"- {industry} ({stats['industry_frequency'][industry]} users)")
+
+        print("\nMost Common Industries:")
+        for industry, count in stats['frequency_analysis']['most_common']:
+            print(f"- {industry}: {count} users")
+
+        print("\nLeast Common Industries:")
+        for industry, count in stats['frequency_analysis']['least_common']:
+            print(f"- {industry}: {count} users")
+
+        founder = set(stats['industries_by_role']['founder'])
+        developer = set(stats['industries_by_role']['developer'])
+        print("\nFounder-Specific Industries:")
+        for industry in sorted(founder - developer):
+            print(f"- {industry}")
+
+        print("\nDeveloper-Specific Industries:")
+        for industry in sorted(developer - founder):
+            print(f"- {industry}")
+
+
+class SkillInventoryAggregator(Aggregator):
+    """Distinct skills listed by software engineers"""
+    name = 'skills'
+    fields = ['role', 'skills']
+    filename = 'engineer_skills_analysis_{timestamp}.json'
+
+    def __init__(self):
+        self.unique_skills = set()
+
+    def add(self, user_id, data):
+        if data.get('role') == DEVELOPER_ROLE:
+            self.unique_skills.update(data.get('skills', []))
+
+    def report(self):
+        return {
+            'metadata': {
+                'total_unique_skills': len(self.unique_skills),
+                'extraction_date': datetime.now().isoformat()
+            },
+            'skills': sorted(self.unique_skills)
+        }
+
+    def print_report(self, report):
+        print("\n=== Software Engineer Skills Analysis ===")
+        print(f"\nTotal Unique Skills: {report['metadata']['total_unique_skills']}")
+        print("\nAll Skills (Sorted):")
+        for skill in report['skills']:
+            print(f"- {skill}")
+
+
+class WorkStyleAggregator(Aggregator):
+    """Mix of work-style combinations, as in updateWorkStyle.py --status"""
+    name = 'workstyles'
+    fields = ['role', 'workStyles']
+    filename = 'work_style_analysis_{timestamp}.json'
+
+    def __init__(self):
+        self.mask_counts = [0] * 8
+        self.total = 0
+        self.developer_count = 0
+        self.founder_count = 0
+
+    def add(self, user_id, data):
+        self.total += 1
+        role = data.get('role')
+        if role == DEVELOPER_ROLE:
+            self.developer_count += 1
+        elif role == FOUNDER_ROLE:
+            self.founder_count += 1
+
+        mask = work_style_mask(data.get('workStyles'))
+        if mask is not None:
+            self.mask_counts[mask] += 1
+
+    def report(self):
+        return {
+            'metadata': {
+                'total_users': self.total,
+                'developers': self.developer_count,
+                'founders': self.founder_count,
+                'extraction_date': datetime.now().isoformat()
+            },
+            'combinations': {
+                label: {'count': count, 'percentage': count / self.total * 100 if self.total else 0}
+                for label, count in work_style_distribution(self.mask_counts).items()
+            }
+        }
+
+    def print_report(self, report):
+        metadata = report['metadata']
+        print("\n=== Work Style Distribution ===")
+        print(f"Total Users: {metadata['total_users']} (Developers: {metadata['developers']}, "
+              f"Founders: {metadata['founders']})")
+        for label, entry in report['combinations'].items():
+            print(f"{label}: {entry['count']} users ({entry['percentage']:.1f}%)")
+
+
+class PersonalityAggregator(Aggregator):
+    """Trait distributions, in the personality_analysis.json format"""
+    name = 'personality'
+    fields = ['role', 'personalityResults']
+    filename = 'personality_analysis.json'
+
+    def __init__(self, k=200):
+        self.stats = StreamingPersonalityStats(k=k)
+
+    def add(self, user_id, data):
+        if 'personalityResults' in data:
+            self.stats.add(user_role(data), data['personalityResults'])
+
+    def report(self):
+        return self.stats.results()
+
+    def print_report(self, report):
+        print("\n=== Personality Trait Analysis ===")
+        for trait in TRAITS:
+            stats = report['overall'][trait]
+            if stats:
+                print(f"{trait}: mean {stats['mean']:.2f}, stdev {stats['stdev']:.2f}, "
+                      f"quartiles {stats['quartiles']['q1']}/{stats['quartiles']['q2']}/{stats['quartiles']['q3']} "
+                      f"(n={stats['count']})")
+
+
+AGGREGATORS = {
+    aggregator.name: aggregator
+    for aggregator in (IndustryAggregator, SkillInventoryAggregator, WorkStyleAggregator, PersonalityAggregator)
+}
+
+
+class AnalyticsPipeline:
+    def __init__(self, db, aggregators, collection='hackathonusers'):
+        self.db = db
+        self.aggregators = list(aggregators)
+        self.collection = collection
+
+    @property
+    def fields(self):
+        return sorted({field for aggregator in self.aggregators for field in aggregator.fields})
+
+    def scan(self):
+        """Stream the collection once, projected to the fields the aggregators need"""
+        count = 0
+        for doc in scan_collection(self.db, self.collection, select=self.fields):
+            data = doc.to_dict()
+            for aggregator in self.aggregators:
+                aggregator.add(doc.id, data)
+            count += 1
+        logger.info(f"Scanned {count} documents for {len(self.aggregators)} reports")
+        return count
+
+    def run(self, output_dir='.', write=True, verbose=True):
+        """Scan, then build (and optionally print and write) every report; returns {name: report}"""
+        self.scan()
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        reports = {}
+        for aggregator in self.aggregators:
+            report = aggregator.report()
+            if verbose:
+                aggregator.print_report(report)
+            if write:
+                path = aggregator.write(report, output_dir, timestamp)
+                if verbose:
+                    print(f"\n{aggregator.name} report saved to {path}")
+            reports[aggregator.name] = report
+        return reports
@@ -0,0 +1,100 @@
+# batch_writer.py
+"""
+Batched, concurrent Firestore writes with per-item results.
+
+BatchWriter groups write operations into WriteBatch commits (Firestore allows up
+to 500 writes per commit) and commits several batches at once on a bounded
+thread pool. A batch commits atomically, so when one fails its operations are
+retried one by one to find out which items were at fault; every operation gets
+its own success/error entry in the result list.
+"""
+
+import logging
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from google.api_core.exceptions import AlreadyExists, NotFound
+
+logger = logging.getLogger(__name__)
+
+MAX_BATCH_SIZE = 500
+
+# kind is one of 'set', 'create', 'update', 'delete'; key identifies the item in results
+WriteOp = namedtuple('WriteOp', ['key', 'kind', 'ref', 'data'])
+
+
+def describe_error(error):
+    if isinstance(error, AlreadyExists):
+        return 'Document already exists'
+    if isinstance(error, NotFound):
+        return 'Document not found'
+    return str(error)
+
+
+class BatchWriter:
+    def __init__(self, db, batch_size=MAX_BATCH_SIZE, max_concurrency=4, max_retries=3):
+        self.db = db
+        self.batch_size = min(batch_size, MAX_BATCH_SIZE)
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+
+    def _stage(self, batch, op):
+        if op.kind == 'delete':
+            batch.delete(op.ref)
+        elif op.kind == 'create':
+            batch.create(op.ref, op.data)
+        elif op.kind == 'update':
+            batch.update(op.ref, op.data)
+        else:
+            batch.set(op.ref, op.data)
+
+    def _commit_with_retry(self, ops):
+        """Commit ops as one batch, retrying transient failures with backoff"""
+        for attempt in range(self.max_retries):
+            batch = self.db.batch()
+            for op in ops:
+                self._stage(batch, op)
+            try:
+                batch.commit()
+                return None
+            except (AlreadyExists, NotFound) as e:
+                # Precondition failures will not succeed on retry
+                return e
+            except Exception as e:
+                if attempt == self.max_retries - 1:
+                    return e
+                logger.warning(f"Batch commit attempt {attempt + 1} failed: {e}")
+                time.sleep(2 ** attempt * 0.5)
+
+    def _write_chunk(self, ops):
+        error = self._commit_with_retry(ops)
+        if error is None:
+            return [{'key': op.key, 'success': True} for op in ops]
+        if len(ops) == 1:
+            return [{'key': ops[0].key, 'success': False, 'error': describe_error(error)}]
+
+        # The batch was rejected as a whole; isolate the failing items
+        results = []
+        for op in ops:
+            item_error = self._commit_with_retry([op])
+            if item_error is None:
+                results.append({'key': op.key, 'success': True})
+            else:
+                results.append({'key': op.key, 'success': False, 'error': describe_error(item_error)})
+        return results
+
+    def write(self, operations):
+        """Apply all operations and return one result dict per operation, in input order"""
+        operations = list(operations)
+        chunks = [operations[i:i + self.batch_size] for i in range(0, len(operations), self.batch_size)]
+        start = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            chunk_results = list(executor.map(self._write_chunk, chunks))
+
+        results = [result for chunk in chunk_results for result in chunk]
+        failed = sum(1 for result in results if not result['success'])
+        logger.info(f"Wrote {len(results) - failed}/{len(results)} documents in {len(chunks)} batches "
+                    f"({time.perf_counter() - start:.2f}s)")
+        return results
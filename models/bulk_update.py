@@ -0,0 +1,93 @@
+# bulk_update.py
+"""
+Resumable bulk writes for maintenance scripts and backfills.
+
+BulkUpdater feeds WriteOps (keyed by document ID) through BatchWriter in rounds
+of `batch_size * max_concurrency` operations. After each round the IDs that were
+written are appended to a checkpoint file, so a rerun after a crash skips them.
+The checkpoint is removed once a run finishes without failures. Instead of a log
+line per document, the run ends with one summary of throughput and failures.
+"""
+
+import logging
+import os
+import time
+from itertools import islice
+
+from models.batch_writer import MAX_BATCH_SIZE, BatchWriter
+
+logger = logging.getLogger(__name__)
+
+# Failures listed individually in the summary log; the rest are only counted
+MAX_LOGGED_FAILURES = 20
+
+
+class BulkUpdater:
+    def __init__(self, db, batch_size=MAX_BATCH_SIZE, max_concurrency=4, checkpoint_path=None):
+        self.writer = BatchWriter(db, batch_size=batch_size, max_concurrency=max_concurrency)
+        self.round_size = self.writer.batch_size * max_concurrency
+        self.checkpoint_path = checkpoint_path
+
+    def load_checkpoint(self):
+        """IDs completed by earlier, interrupted runs"""
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return set()
+        with open(self.checkpoint_path) as f:
+            return {line.strip() for line in f if line.strip()}
+
+    def _record(self, keys):
+        if self.checkpoint_path and keys:
+            with open(self.checkpoint_path, 'a') as f:
+                f.write(''.join(f'{key}\n' for key in keys))
+
+    def run(self, operations):
+        """
+        Apply `operations` (an iterable of WriteOps whose keys are document IDs) and
+        return {'total', 'written', 'resumed', 'failed', 'failures', 'seconds', 'per_second'}
+        """
+        completed = self.load_checkpoint()
+        if completed:
+            logger.info(f"Resuming: {len(completed)} documents were written by an earlier run")
+        summary = {'total': 0, 'written': 0, 'resumed': 0, 'failed': 0, 'failures': []}
+        start = time.perf_counter()
+
+        operations = iter(operations)
+        while True:
+            chunk = list(islice(operations, self.round_size))
+            if not chunk:
+                break
+            round_ops = [op for op in chunk if op.key not in completed]
+            summary['total'] += len(chunk)
+            summary['resumed'] += len(chunk) - len(round_ops)
+            if not round_ops:
+                continue
+
+            written = []
+            for result in self.writer.write(round_ops):
+                if result['success']:
+                    written.append(result['key'])
+                else:
+                    summary['failures'].append((result['key'], result['error']))
+            self._record(written)
+            summary['written'] += len(written)
+            summary['failed'] = len(summary['failures'])
+            logger.info(f"Bulk update progress: {summary['written']} written, {summary['failed']} failed")
+
+        summary['seconds'] = time.perf_counter() - start
+        summary['per_second'] = summary['written'] / summary['seconds'] if summary['seconds'] > 0 else 0
+        self._log_summary(summary)
+
+        if not summary['failed'] and self.checkpoint_path and os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+        return summary
+
+    def _log_summary(self, summary):
+        logger.info(f"Bulk update complete: {summary['written']} written, {summary['resumed']} already done, "
+                    f"{summary['failed']} failed of {summary['total']} in {summary['seconds']:.2f}s "
+                    f"({summary['per_second']:.0f} docs/s)")
+        for key, error in summary['failures'][:MAX_LOGGED_FAILURES]:
+            logger.error(f"Failed to update {key}: {error}")
+        if summary['failed'] > MAX_LOGGED_FAILURES:
+            logger.error(f"... and {summary['failed'] - MAX_LOGGED_FAILURES} more failures")
+        if summary['failed'] and self.checkpoint_path:
+            logger.info(f"Rerun to retry the failures; completed IDs are in {self.checkpoint_path}")
@@ -1,21 +1,62 @@
 # calculate_matches.py
-import firebase_admin
-from firebase_admin import credentials, firestore
+"""
+Founder/developer match scoring.
+
+EnhancedMatcher is pure computation: it is built from an industry taxonomy and
+optional weight overrides, never touches Firestore, and pickles to a few
+kilobytes, so scoring workers in a process pool start without credentials or a
+network round trip. Loading profiles is ProfileStore's job.
+"""
 from typing import List, Dict, Tuple, Set
 from pathlib import Path
+from functools import lru_cache
 import json
 
+from models.collection_scan import scan_collection
+from models.firebase_client import get_client
+from models.skill_taxonomy import SkillTaxonomy, score_skill_mask
+
+INDUSTRIES_PATH = Path(__file__).parent / 'industries.json'
+
+DEFAULT_ALIASES = {
+    'GreenTech': 'CleanTech',
+    'Green Tech': 'CleanTech',
+    'Green Technology': 'CleanTech'
+}
+
+
+@lru_cache(maxsize=None)
+def load_taxonomy(path: str = None) -> Dict:
+    """
+    {'mappings': {industry: {'primary': [...], 'secondary': [...]}}, 'aliases': {alias: industry}}
+    from industries.json, read once per process. Treat the result as read-only. A
+    taxonomy may also carry 'skills', further known skills (see ProfileStore.load_taxonomy).
+    """
+    try:
+        with open(path or INDUSTRIES_PATH, 'r') as f:
+            industry_data = json.load(f)['industries.json']
+        return {'mappings': industry_data['mappings'], 'aliases': industry_data['aliases']}
+    except Exception as e:
+        print(f"Error loading industry mappings: {e}")
+        # Fallback to default empty mappings
+        return {'mappings': {}, 'aliases': dict(DEFAULT_ALIASES)}
+
+
 class EnhancedMatcher:
+    # Weight groups that can be overridden through the `weights` argument
+    WEIGHT_GROUPS = ('component_weights', 'core_weights', 'skill_weights', 'background_weights',
+                     'cultural_weights', 'personality_trait_weights', 'red_flag_weights',
+                     'positive_signal_weights', 'context_boost_weights', 'personality_weights')
+
     def __init__(
             self,
-            cred_path: str,
+            taxonomy: Dict = None,
             weights: Dict = None
     ):
-        if not firebase_admin._apps:
-            cred = credentials.Certificate(cred_path)
-            firebase_admin.initialize_app(cred)
-        self.db = firestore.client()
-
+        """
+        `taxonomy` defaults to models/industries.json (see load_taxonomy). `weights`
+        overrides individual entries by group, e.g. {'core_weights': {'skills': 0.5}}.
+        """
         self.component_weights = {
             'core_match': 0.90, # Skills and personality
             'background_match': 0.05, # Education and industry
@@ -80,29 +121,34 @@ class EnhancedMatcher:
             'neuroticism': 0.15
         }
 
-        # Load industry mappings from JSON
-        try:
-            json_path = Path(__file__).parent / 'industries.json'
-            with open(json_path, 'r') as f:
-                industry_data = json.load(f)
-                self.industry_skills_map = industry_data['industries.json']['mappings']
-                self.industry_aliases = industry_data['industries.json']['aliases']
-        except Exception as e:
-            print(f"Error loading industry mappings: {e}")
-            # Fallback to default empty mappings
-            self.industry_skills_map = {}
-            self.industry_aliases = {}
+        taxonomy = taxonomy if taxonomy is not None else load_taxonomy()
+        self.industry_skills_map = taxonomy['mappings']
+        self.industry_aliases = taxonomy.get('aliases') or DEFAULT_ALIASES
 
         self.default_skills = {
             'primary': {'Full-Stack', 'Back-End', 'Front-End'},
             'secondary': {'Cloud', 'DevOps', 'UI/UX'}
         }
 
-        self.industry_aliases = {
-            'GreenTech': 'CleanTech',
-            'Green Tech': 'CleanTech',
-            'Green Technology': 'CleanTech'
-        }
+        # Skills interned as bits, so skill matching is bitmask arithmetic
+        self.skills = SkillTaxonomy(self.industry_skills_map, self.default_skills, taxonomy.get('skills', ()))
+
+        if weights:
+            invalid = [name for name, group in weights.items()
+                       if name not in self.WEIGHT_GROUPS or not isinstance(group, dict)]
+            if invalid:
+                raise ValueError(f"Unknown or malformed weight groups: {', '.join(sorted(invalid))}")
+            self._update_nested_dict(self.weights, weights)
+
+    @property
+    def weights(self) -> Dict:
+        """Every weight group by name; the dicts are the matcher's own, so updates apply in place"""
+        return {name: getattr(self, name) for name in self.WEIGHT_GROUPS}
+
+    @property
+    def taxonomy(self) -> Dict:
+        return {'mappings': self.industry_skills_map, 'aliases': self.industry_aliases,
+                'skills': list(self.skills.names)}
 
     def _update_nested_dict(self, d: Dict, u: Dict) -> Dict:
         for k, v in u.items():
@@ -131,61 +177,31 @@ class EnhancedMatcher:
         Calculate skill match between founder and developer with stricter criteria.
         Returns a float between 0 and 1.
         """
-        # Constants for scoring
-        MIN_PRIMARY_COVERAGE = 0.70  # Must have 70% of primary skills
-        MAX_TECH_BONUS = 0.15  # Cap the bonus for extra skills
-        TECH_BONUS_PER_SKILL = 0.01  # Reduced bonus per additional skill
-        MIN_SCORE = 0.30  # Minimum score if any relevant skills present
+        industry = self.industry_masks(founder)
+        if industry is None:
+            return 0.0
+        return score_skill_mask(self.skills.mask(developer.get('skills', [])), industry, self.skill_weights)
 
+    def calculate_skill_matches(self, founder: Dict, developers: List[Dict]) -> List[float]:
+        """
+        calculate_skill_match for each developer in a plain loop; only the founder's
+        industry lookup is shared across developers
+        """
+        industry = self.industry_masks(founder)
+        if industry is None:
+            return [0.0] * len(developers)
+        return [score_skill_mask(self.skills.mask(developer.get('skills', [])), industry, self.skill_weights)
+                for developer in developers]
+
+    def industry_masks(self, founder: Dict):
+        """IndustryMasks of the skills the founder's working field needs, or None if it has none"""
         working_field = self.extract_working_field(
             founder.get('about', ''),
             founder.get('longDescription', '')
         )
-
         if not working_field:
-            return 0.0
-
-        dev_skills = set(developer.get('skills', []))
-        if not dev_skills:
-            return 0.0
-
-        # Get required skills from industry mappings
-        if working_field in self.industry_skills_map:
-            primary_skills = set(self.industry_skills_map[working_field]['primary'])
-            secondary_skills = set(self.industry_skills_map[working_field]['secondary'])
-        else:
-            primary_skills = set(self.default_skills['primary'])
-            secondary_skills = set(self.default_skills['secondary'])
-
-        # Calculate coverage percentages
-        primary_matches = primary_skills.intersection(dev_skills)
-        secondary_matches = secondary_skills.intersection(dev_skills)
-
-        primary_coverage = len(primary_matches) / len(primary_skills) if primary_skills else 0
-        secondary_coverage = len(secondary_matches) / len(secondary_skills) if secondary_skills else 0
-
-        # Calculate base score with weighted coverage
-        base_score = (
-                primary_coverage * self.skill_weights['primary'] +
-                secondary_coverage * self.skill_weights['secondary']
-        )
-
-        # Apply minimum threshold penalty for primary skills
-        if primary_coverage < MIN_PRIMARY_COVERAGE:
-            base_score *= 0.5
-
-        # Calculate tech bonus with diminishing returns
-        tech_skills = dev_skills - (primary_skills.union(secondary_skills))
-        tech_bonus = min(len(tech_skills) * TECH_BONUS_PER_SKILL, MAX_TECH_BONUS)
-
-        # Calculate final score
-        final_score = base_score + tech_bonus
-
-        # Apply minimum score if there's any relevant skill match
-        if primary_matches or secondary_matches:
-            final_score = max(MIN_SCORE, final_score)
-
-        return min(0.95, final_score)  # Cap at 95% to make perfect scores rare
+            return None
+        return self.skills.industry_masks(working_field)
 
     def calculate_personality_match(self, founder: Dict, developer: Dict) -> float:
         founder_personality = founder.get('personalityResults', {})
@@ -314,8 +330,9 @@ class EnhancedMatcher:
         return (values_score * self.cultural_weights['values'] +
                 interests_score * self.cultural_weights['interests'])
 
-    def calculate_match_score(self, founder: Dict, developer: Dict) -> Dict:
-        skill_score = self.calculate_skill_match(founder, developer)
+    def calculate_match_score(self, founder: Dict, developer: Dict, skill_score: float = None) -> Dict:
+        if skill_score is None:
+            skill_score = self.calculate_skill_match(founder, developer)
         personality_score = self.calculate_personality_match(founder, developer)
         core_score = (skill_score * self.core_weights['skills'] +
                       personality_score * self.core_weights['personality'])
@@ -340,6 +357,12 @@ class EnhancedMatcher:
             }
         }
 
+    def calculate_match_scores(self, founder: Dict, developers: List[Dict]) -> List[Dict]:
+        """calculate_match_score for each developer, using calculate_skill_matches for the skill scores"""
+        skill_scores = self.calculate_skill_matches(founder, developers)
+        return [self.calculate_match_score(founder, developer, skill_score)
+                for developer, skill_score in zip(developers, skill_scores)]
+
     def find_matches(self, founder: Dict, developers: List[Dict], min_score: float = 30.0) -> List[Tuple[Dict, Dict]]:
         matches = []
 
@@ -359,28 +382,65 @@ class EnhancedMatcher:
         print(f"Primary ({self.skill_weights['primary'] * 100}% weight): {', '.join(primary_skills)}")
         print(f"Secondary ({self.skill_weights['secondary'] * 100}% weight): {', '.join(secondary_skills)}")
 
-        for developer in developers:
-            match_results = self.calculate_match_score(founder, developer)
+        for developer, match_results in zip(developers, self.calculate_match_scores(founder, developers)):
             if match_results['total_score'] >= min_score:
                 matches.append((developer, match_results))
 
         matches.sort(key=lambda x: x[1]['total_score'], reverse=True)
         return matches
 
-def main():
-    cred_path = "../firebase-credentials.json"
-    matcher = EnhancedMatcher(cred_path)
+class ProfileStore:
+    """Reads the profiles that EnhancedMatcher scores from hackathonusers"""
+
+    def __init__(self, cred_path: str = None, db=None):
+        # An explicit client (e.g. the in-memory fake or a snapshot) skips Firebase initialisation
+        self.db = db if db is not None else get_client(cred_path)
+
+    def load_users(self) -> Tuple[List[Dict], List[Dict]]:
+        return load_users(self.db)
+
+    def load_taxonomy(self) -> Dict:
+        """The industries.json taxonomy plus every skill listed on a profile, for EnhancedMatcher"""
+        skills = set()
+        for user in scan_collection(self.db, 'hackathonusers', select=['skills']):
+            skills.update(user.to_dict().get('skills') or [])
+        return dict(load_taxonomy(), skills=sorted(skills))
+
+    def get_profile(self, user_id: str) -> Dict:
+        """The user's profile dict with its 'id', or None if there is no such user"""
+        doc = self.db.collection('hackathonusers').document(user_id).get()
+        return dict(doc.to_dict(), id=doc.id) if doc.exists else None
+
 
-    users = matcher.db.collection('hackathonusers').get()
+def load_users(db):
+    """(founders, developers) from hackathonusers, each a list of profile dicts with their 'id'"""
     founders = []
     developers = []
 
-    for user in users:
-        data = user.to_dict()
-        if data['role'] == 'founder / entrepreneur':
+    for user in scan_collection(db, 'hackathonusers', ordered=True):
+        data = dict(user.to_dict(), id=user.id)
+        if data.get('role') == 'founder / entrepreneur':
             founders.append(data)
-        elif data['role'] == 'softwareEngineer':
+        elif data.get('role') == 'softwareEngineer':
             developers.append(data)
+    return founders, developers
+
+
+def print_match(dev: Dict, match_results: Dict):
+    print(f"\nDeveloper: {dev['name']}")
+    print(f"Skills: {', '.join(dev.get('skills', []))}")
+    print(f"Total Score: {match_results['total_score']}%")
+    print("Component Scores:")
+    print(f"- Core Score: {match_results['components']['core_score']}%")
+    print(f"  • Skill Match: {match_results['components']['skill_score']}%")
+    print(f"  • Personality Match: {match_results['components']['personality_score']}%")
+    print(f"- Background Score: {match_results['components']['background_score']}%")
+    print(f"- Cultural Score: {match_results['components']['cultural_score']}%")
+
+
+def main():
+    matcher = EnhancedMatcher()
+    founders, developers = ProfileStore().load_users()
 
     if founders and developers:
         founder = founders[0]
@@ -389,16 +449,8 @@ def main():
         matches = matcher.find_matches(founder, developers)
         print("\nTop Matches:")
         for dev, match_results in matches:
-            print(f"\nDeveloper: {dev['name']}")
-            print(f"Skills: {', '.join(dev.get('skills', []))}")
-            print(f"Total Score: {match_results['total_score']}%")
-            print("Component Scores:")
-            print(f"- Core Score: {match_results['components']['core_score']}%")
-            print(f"  • Skill Match: {match_results['components']['skill_score']}%")
-            print(f"  • Personality Match: {match_results['components']['personality_score']}%")
-            print(f"- Background Score: {match_results['components']['background_score']}%")
-            print(f"- Cultural Score: {match_results['components']['cultural_score']}%")
+            print_match(dev, match_results)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,107 @@
+# collection_scan.py
+"""
+Parallel full-collection scans.
+
+`scan_collection` splits a collection into document-name ranges and reads the
+ranges concurrently, yielding snapshots as each range completes. Ranges come from
+Firestore partition queries (`CollectionGroup.get_partitions`) when the client
+supports them; otherwise the document names are listed once with
+`list_documents` and cut into equal `__name__` ranges. That fallback still reads
+every name, but only names, before the bodies are fetched in parallel.
+
+Partition queries run against the collection group, so a subcollection with the
+same ID anywhere in the database would be included; none of ours share a name.
+
+Worker threads run in a copy of the caller's context, so anything tracked in
+context variables (the in-memory fake's operation scopes, request metrics and
+trace spans) is attributed to the caller.
+"""
+
+import contextvars
+import logging
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PARTITIONS = 8
+DEFAULT_WORKERS = 4
+
+
+def _name_range_queries(collection_ref, partitions):
+    ids = sorted(ref.id for ref in collection_ref.list_documents())
+    step = len(ids) // partitions
+    if step == 0:
+        return [collection_ref]
+    boundaries = ids[step::step][:partitions - 1]
+
+    queries, lower = [], None
+    ordered = collection_ref.order_by('__name__')
+    for upper in boundaries + [None]:
+        query = ordered
+        if lower is not None:
+            query = query.start_at({'__name__': lower})
+        if upper is not None:
+            query = query.end_before({'__name__': upper})
+        queries.append(query)
+        lower = upper
+    return queries
+
+
+def partition_queries(db, collection, partitions=DEFAULT_PARTITIONS, select=None):
+    """Queries over disjoint, ascending document-name ranges that together cover the collection"""
+    collection_ref = db.collection(collection)
+    queries = None
+    if partitions > 1 and hasattr(db, 'collection_group'):
+        try:
+            queries = [partition.query() for partition in db.collection_group(collection).get_partitions(partitions)]
+        except Exception as e:
+            logger.warning(f"Partition queries unavailable for {collection}, splitting by document name: {e}")
+    if queries is None:
+        queries = _name_range_queries(collection_ref, partitions) if partitions > 1 else [collection_ref]
+    if select is not None:
+        queries = [query.select(select) for query in queries]
+    return queries
+
+
+def _read(query):
+    return list(query.stream())
+
+
+def scan_collection(db, collection, select=None, partitions=DEFAULT_PARTITIONS, max_workers=DEFAULT_WORKERS,
+                    ordered=False):
+    """
+    Yield every document snapshot in `collection`, optionally projected to `select`.
+
+    At most `max_workers` ranges are read at once. With `ordered` the documents come
+    out in document-name order (a finished range waits for the ones before it);
+    otherwise each range is yielded as soon as it completes.
+    """
+    queries = partition_queries(db, collection, partitions, select)
+    if len(queries) == 1 or max_workers <= 1:
+        for query in queries:
+            yield from query.stream()
+        return
+
+    remaining = iter(queries)
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f'scan-{collection}') as executor:
+        pending = deque()
+
+        def submit_next():
+            query = next(remaining, None)
+            if query is not None:
+                pending.append(executor.submit(contextvars.copy_context().run, _read, query))
+
+        for _ in range(max_workers):
+            submit_next()
+
+        while pending:
+            if ordered:
+                future = pending.popleft()
+            else:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                future = next(iter(done))
+                pending.remove(future)
+            docs = future.result()
+            submit_next()
+            yield from docs
@@ -0,0 +1,159 @@
+# enrichment_queue.py
+"""
+Background ML-feature enrichment for stored matches.
+
+`store_match` writes the match with `ml_features: None` and `ml_features_status:
+'pending'`, then submits an EnrichmentJob here. A worker thread drains the queue in
+batches, computes the features and writes them back with one batched commit per
+batch. Failed jobs are retried with exponential backoff and marked
+`ml_features_status: 'failed'` once they run out of attempts. The number of
+queued jobs is exported as the `enrichment_backlog` gauge.
+"""
+
+import logging
+import queue
+import threading
+import time
+from collections import namedtuple
+
+from models.batch_writer import BatchWriter, WriteOp
+from models.metrics import registry as metrics_registry
+from models.ml_features import compute_ml_features
+
+logger = logging.getLogger(__name__)
+
+EnrichmentJob = namedtuple('EnrichmentJob', ['match_id', 'founder_id', 'developer_id', 'founder', 'developer',
+                                             'created_at'])
+
+
+class EnrichmentQueue:
+    def __init__(self, db, batch_size=20, max_wait=1.0, max_attempts=3, retry_delay=2.0, maxsize=10000,
+                 metrics=None):
+        self.db = db
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.metrics = metrics or metrics_registry
+        self.writer = BatchWriter(db, batch_size=batch_size, max_concurrency=1)
+
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._retries = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.metrics.register_gauge('enrichment_backlog', 'ML-feature enrichment jobs waiting to run',
+                                    lambda: self.backlog)
+
+    @property
+    def backlog(self):
+        with self._lock:
+            return self._queue.qsize() + len(self._retries)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='enrichment-worker', daemon=True)
+        self._thread.start()
+
+    def stop(self, drain=True):
+        """Stop the worker; with `drain` the jobs already queued are processed first"""
+        if drain:
+            while self.backlog and self._thread is not None and self._thread.is_alive():
+                time.sleep(0.05)
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def submit(self, job):
+        """Queue a job; returns False when the queue is full (the match stays pending)"""
+        try:
+            self._queue.put_nowait((job, 1))
+            return True
+        except queue.Full:
+            logger.warning(f"Enrichment queue full, leaving {job.match_id} pending")
+            self.metrics.increment('enrichment_jobs_total', outcome='dropped')
+            return False
+
+    # Worker
+
+    def _next_batch(self):
+        """Collect up to batch_size jobs, waiting at most max_wait after the first one"""
+        batch = self._due_retries()
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.batch_size and not self._stop.is_set():
+            timeout = deadline - time.monotonic() if batch else 0.5
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                if not batch:
+                    batch = self._due_retries()
+                    deadline = time.monotonic() + self.max_wait
+        return batch
+
+    def _due_retries(self):
+        now = time.monotonic()
+        with self._lock:
+            due = [entry for entry in self._retries if entry[0] <= now][:self.batch_size]
+            for entry in due:
+                self._retries.remove(entry)
+        return [(job, attempt) for _, job, attempt in due]
+
+    def _schedule_retry(self, job, attempt, delay):
+        with self._lock:
+            self._retries.append((time.monotonic() + delay, job, attempt))
+
+    def _run(self):
+        while not self._stop.is_set():
+            batch = self._next_batch()
+            if batch:
+                try:
+                    self.process(batch)
+                except Exception as e:
+                    logger.error(f"Enrichment batch failed: {e}", exc_info=True)
+                    self._retry_or_fail(batch)
+
+    def process(self, batch):
+        """Compute features for (job, attempt) pairs and write them back in one batched commit"""
+        operations, failed = [], []
+        for job, attempt in batch:
+            try:
+                features = compute_ml_features(self.db, job.founder_id, job.developer_id,
+                                               job.founder, job.developer, job.created_at)
+            except Exception as e:
+                logger.warning(f"Computing features for {job.match_id} failed (attempt {attempt}): {e}")
+                failed.append((job, attempt))
+                continue
+            match_ref = self.db.collection('matches').document(job.match_id)
+            operations.append(WriteOp((job, attempt), 'update', match_ref,
+                                      {'ml_features': features, 'ml_features_status': 'complete'}))
+
+        for result in self.writer.write(operations):
+            job, attempt = result['key']
+            if result['success']:
+                self.metrics.increment('enrichment_jobs_total', outcome='complete')
+            elif result['error'] == 'Document not found':
+                # The match was deleted before it was enriched
+                self.metrics.increment('enrichment_jobs_total', outcome='discarded')
+            else:
+                failed.append((job, attempt))
+
+        self._retry_or_fail(failed)
+
+    def _retry_or_fail(self, entries):
+        exhausted = []
+        for job, attempt in entries:
+            if attempt < self.max_attempts:
+                self.metrics.increment('enrichment_jobs_total', outcome='retried')
+                self._schedule_retry(job, attempt + 1, self.retry_delay * 2 ** (attempt - 1))
+            else:
+                exhausted.append(job)
+        if not exhausted:
+            return
+        logger.error(f"Giving up on ML features for {len(exhausted)} matches")
+        self.metrics.increment('enrichment_jobs_total', value=len(exhausted), outcome='failed')
+        self.writer.write(
+            WriteOp(job.match_id, 'update', self.db.collection('matches').document(job.match_id),
+                    {'ml_features_status': 'failed'})
+            for job in exhausted
+        )
@@ -0,0 +1,561 @@
+# fake_firestore.py
+"""
+In-memory stand-in for the subset of the Firestore client that FounderMatcha uses.
+
+It is meant for load tests and local runs where no credentials or network are
+available. Documents are plain dicts, queries are evaluated in Python, and every
+read and write is counted so callers can see what a request would cost.
+"""
+
+import contextvars
+import copy
+import math
+import threading
+import time
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+from functools import cmp_to_key
+from typing import Dict, List
+
+ASCENDING = 'ASCENDING'
+DESCENDING = 'DESCENDING'
+
+_MISSING = object()
+
+# Firestore rejects commits with more writes than this
+MAX_BATCH_WRITES = 500
+
+
+class OperationStats:
+    """
+    Thread-safe read/write counters, optionally grouped by a scope label. The scope
+    is a context variable, so work handed to another thread with
+    `contextvars.copy_context().run` still counts towards the caller's scope.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._scope = contextvars.ContextVar(f'operation_scope_{id(self)}', default=None)
+        self.by_scope = defaultdict(lambda: {'reads': 0, 'documents': 0, 'writes': 0})
+
+    @property
+    def scope(self):
+        return self._scope.get()
+
+    @contextmanager
+    def track(self, scope):
+        """Attribute every operation made in this context to `scope`"""
+        token = self._scope.set(scope)
+        try:
+            yield self.by_scope[scope]
+        finally:
+            self._scope.reset(token)
+
+    def record(self, reads=0, documents=0, writes=0):
+        with self._lock:
+            counts = self.by_scope[self.scope]
+            counts['reads'] += reads
+            counts['documents'] += documents
+            counts['writes'] += writes
+
+    def totals(self):
+        with self._lock:
+            total = {'reads': 0, 'documents': 0, 'writes': 0}
+            for counts in self.by_scope.values():
+                for key in total:
+                    total[key] += counts[key]
+            return total
+
+    def reset(self):
+        with self._lock:
+            self.by_scope.clear()
+
+
+def _get_field(data, field_path):
+    """Resolve a dotted field path against a document dict"""
+    value = data
+    for part in field_path.split('.'):
+        if not isinstance(value, dict) or part not in value:
+            return _MISSING
+        value = value[part]
+    return value
+
+
+def _set_field(data, field_path, value):
+    parts = field_path.split('.')
+    target = data
+    for part in parts[:-1]:
+        if not isinstance(target.get(part), dict):
+            target[part] = {}
+        target = target[part]
+    target[parts[-1]] = value
+
+
+def _delete_field(data, field_path):
+    parts = field_path.split('.')
+    target = data
+    for part in parts[:-1]:
+        target = target.get(part)
+        if not isinstance(target, dict):
+            return
+    target.pop(parts[-1], None)
+
+
+def _apply_transform(current, value):
+    """Apply Firestore write sentinels (ArrayUnion, Increment, ...) by duck typing"""
+    kind = type(value).__name__
+    if kind == 'ArrayUnion':
+        existing = list(current) if isinstance(current, list) else []
+        for item in value.values:
+            if item not in existing:
+                existing.append(item)
+        return existing
+    if kind == 'ArrayRemove':
+        existing = list(current) if isinstance(current, list) else []
+        return [item for item in existing if item not in value.values]
+    if kind == 'Increment':
+        base = current if isinstance(current, (int, float)) else 0
+        return base + value.value
+    if kind == 'Sentinel' and 'timestamp' in getattr(value, 'description', '').lower():
+        return time.time()
+    return copy.deepcopy(value)
+
+
+def _is_delete_sentinel(value):
+    return type(value).__name__ == 'Sentinel' and 'delete' in getattr(value, 'description', '').lower()
+
+
+def _project(data, field_paths):
+    if field_paths is None:
+        return data
+    projected = {}
+    for field_path in field_paths:
+        value = _get_field(data, field_path)
+        if value is not _MISSING:
+            _set_field(projected, field_path, copy.deepcopy(value))
+    return projected
+
+
+def _matches(value, op, expected):
+    if value is _MISSING:
+        return False
+    try:
+        if op == '==':
+            return value == expected
+        if op == '!=':
+            return value != expected
+        if op == '<':
+            return value < expected
+        if op == '<=':
+            return value <= expected
+        if op == '>':
+            return value > expected
+        if op == '>=':
+            return value >= expected
+        if op == 'in':
+            return value in expected
+        if op == 'not-in':
+            return value not in expected
+        if op == 'array-contains':
+            return isinstance(value, list) and expected in value
+        if op == 'array-contains-any':
+            return isinstance(value, list) and any(item in value for item in expected)
+    except TypeError:
+        return False
+    raise ValueError(f"Unsupported operator: {op}")
+
+
+class FakeDocumentSnapshot:
+    def __init__(self, reference, data):
+        self.reference = reference
+        self._data = data
+
+    @property
+    def id(self):
+        return self.reference.id
+
+    @property
+    def exists(self):
+        return self._data is not None
+
+    def to_dict(self):
+        return copy.deepcopy(self._data) if self._data is not None else None
+
+    def get(self, field_path):
+        if self._data is None:
+            return None
+        value = _get_field(self._data, field_path)
+        if value is _MISSING:
+            raise KeyError(field_path)
+        return copy.deepcopy(value)
+
+
+class FakeDocumentReference:
+    def __init__(self, client, collection_path, document_id):
+        self._client = client
+        self._collection_path = collection_path
+        self.id = document_id
+
+    def __deepcopy__(self, memo):
+        # Stored references share the client, as the real DocumentReference's copies do
+        return self
+
+    @property
+    def path(self):
+        return f"{self._collection_path}/{self.id}"
+
+    def collection(self, name):
+        return FakeCollectionReference(self._client, f"{self.path}/{name}")
+
+    def get(self, field_paths=None):
+        self._client._simulate_latency()
+        with self._client._lock:
+            data = self._client._documents(self._collection_path).get(self.id)
+            data = copy.deepcopy(_project(data, field_paths)) if data is not None else None
+        self._client.stats.record(reads=1, documents=1)
+        return FakeDocumentSnapshot(self, data)
+
+    def set(self, document_data, merge=False):
+        self._client._commit([('set', self, document_data, merge)])
+
+    def create(self, document_data):
+        self._client._commit([('create', self, document_data, False)])
+
+    def update(self, field_updates):
+        self._client._commit([('update', self, field_updates, False)])
+
+    def delete(self):
+        self._client._commit([('delete', self, None, False)])
+
+
+class FakeQuery:
+    def __init__(self, client, collection_path, filters=None, orders=None, limit=None,
+                 start=None, end=None, projection=None):
+        self._client = client
+        self._collection_path = collection_path
+        self._filters = filters or []
+        self._orders = orders or []
+        self._limit = limit
+        self._start = start
+        self._end = end
+        self._projection = projection
+
+    def _copy(self, **changes):
+        state = {
+            'filters': self._filters,
+            'orders': self._orders,
+            'limit': self._limit,
+            'start': self._start,
+            'end': self._end,
+            'projection': self._projection,
+        }
+        state.update(changes)
+        return FakeQuery(self._client, self._collection_path, **state)
+
+    def where(self, field_path, op_string, value):
+        return self._copy(filters=self._filters + [(field_path, op_string, value)])
+
+    def order_by(self, field_path, direction=ASCENDING):
+        return self._copy(orders=self._orders + [(field_path, direction)])
+
+    def limit(self, count):
+        return self._copy(limit=count)
+
+    def select(self, field_paths):
+        return self._copy(projection=list(field_paths))
+
+    def start_after(self, document_fields_or_snapshot):
+        return self._copy(start=(document_fields_or_snapshot, False))
+
+    def start_at(self, document_fields_or_snapshot):
+        return self._copy(start=(document_fields_or_snapshot, True))
+
+    def end_before(self, document_fields_or_snapshot):
+        return self._copy(end=(document_fields_or_snapshot, False))
+
+    def end_at(self, document_fields_or_snapshot):
+        return self._copy(end=(document_fields_or_snapshot, True))
+
+    def _effective_orders(self):
+        orders = list(self._orders)
+        ordered_fields = {field for field, _ in orders}
+        # Firestore implicitly orders by the first inequality field, then by name
+        for field, op, _ in self._filters:
+            if op in ('<', '<=', '>', '>=', '!=', 'not-in') and field not in ordered_fields:
+                orders.insert(0, (field, ASCENDING))
+                ordered_fields.add(field)
+                break
+        if '__name__' not in ordered_fields:
+            direction = orders[-1][1] if orders else ASCENDING
+            orders.append(('__name__', direction))
+        return orders
+
+    @staticmethod
+    def _value(doc_id, data, field_path):
+        return doc_id if field_path == '__name__' else _get_field(data, field_path)
+
+    def _cursor_values(self, cursor, orders):
+        if isinstance(cursor, FakeDocumentSnapshot):
+            data = cursor._data or {}
+            return [self._value(cursor.id, data, field) for field, _ in orders]
+        if isinstance(cursor, dict):
+            return [cursor.get(field, _MISSING) for field, _ in orders]
+        return list(cursor)
+
+    @staticmethod
+    def _compare(left, right, orders):
+        for (_, direction), a, b in zip(orders, left, right):
+            if a is _MISSING or b is _MISSING or a == b:
+                continue
+            try:
+                result = -1 if a < b else 1
+            except TypeError:
+                result = -1 if str(a) < str(b) else 1
+            return -result if direction == DESCENDING else result
+        return 0
+
+    def _run(self, record=True):
+        self._client._simulate_latency()
+        orders = self._effective_orders()
+        with self._client._lock:
+            rows = []
+            for doc_id, data in self._client._documents(self._collection_path).items():
+                if not all(_matches(_get_field(data, f), op, v) for f, op, v in self._filters):
+                    continue
+                key = [self._value(doc_id, data, field) for field, _ in orders]
+                if any(value is _MISSING for value in key):
+                    continue
+                rows.append((key, doc_id, data))
+
+            rows.sort(key=cmp_to_key(lambda a, b: self._compare(a[0], b[0], orders)))
+
+            if self._start is not None:
+                cursor, inclusive = self._start
+                bound = self._cursor_values(cursor, orders)
+                rows = [row for row in rows
+                        if self._compare(row[0], bound, orders) > 0
+                        or (inclusive and self._compare(row[0], bound, orders) == 0)]
+            if self._end is not None:
+                cursor, inclusive = self._end
+                bound = self._cursor_values(cursor, orders)
+                rows = [row for row in rows
+                        if self._compare(row[0], bound, orders) < 0
+                        or (inclusive and self._compare(row[0], bound, orders) == 0)]
+            if self._limit is not None:
+                rows = rows[:self._limit]
+
+            snapshots = [
+                FakeDocumentSnapshot(
+                    FakeDocumentReference(self._client, self._collection_path, doc_id),
+                    copy.deepcopy(_project(data, self._projection))
+                )
+                for _, doc_id, data in rows
+            ]
+        # Firestore bills at least one read for a query, even when it returns nothing
+        if record:
+            self._client.stats.record(reads=1, documents=max(len(snapshots), 1))
+        return snapshots
+
+    def stream(self):
+        return iter(self._run())
+
+    def get(self):
+        return self._run()
+
+    def count(self, alias=None):
+        return FakeAggregationQuery(self, alias or 'count')
+
+
+class FakeAggregationResult:
+    def __init__(self, alias, value):
+        self.alias = alias
+        self.value = value
+
+
+class FakeAggregationQuery:
+    """count() over a query; evaluated without returning documents"""
+
+    def __init__(self, query, alias):
+        self._query = query
+        self._alias = alias
+
+    def get(self):
+        client = self._query._client
+        matched = len(self._query._copy(projection=[])._run(record=False))
+        # Count queries bill one read per batch of up to 1000 index entries
+        client.stats.record(reads=1, documents=max(math.ceil(matched / 1000), 1))
+        return [[FakeAggregationResult(self._alias, matched)]]
+
+    def stream(self):
+        return iter(self.get())
+
+
+class FakeCollectionReference(FakeQuery):
+    def __init__(self, client, collection_path):
+        super().__init__(client, collection_path)
+        self.id = collection_path.rsplit('/', 1)[-1]
+
+    def document(self, document_id=None):
+        return FakeDocumentReference(self._client, self._collection_path, document_id or uuid.uuid4().hex[:20])
+
+    def add(self, document_data, document_id=None):
+        ref = self.document(document_id)
+        ref.set(document_data)
+        return time.time(), ref
+
+    def list_documents(self, page_size=None):
+        self._client._simulate_latency()
+        with self._client._lock:
+            ids = list(self._client._documents(self._collection_path))
+        self._client.stats.record(reads=1, documents=max(len(ids), 1))
+        return [FakeDocumentReference(self._client, self._collection_path, doc_id) for doc_id in ids]
+
+
+class FakeWriteBatch:
+    def __init__(self, client):
+        self._client = client
+        self._writes = []
+
+    def set(self, reference, document_data, merge=False):
+        self._writes.append(('set', reference, document_data, merge))
+
+    def create(self, reference, document_data):
+        self._writes.append(('create', reference, document_data, False))
+
+    def update(self, reference, field_updates):
+        self._writes.append(('update', reference, field_updates, False))
+
+    def delete(self, reference):
+        self._writes.append(('delete', reference, None, False))
+
+    def commit(self):
+        writes, self._writes = self._writes, []
+        if len(writes) > MAX_BATCH_WRITES:
+            raise InvalidArgument(f"maximum {MAX_BATCH_WRITES} writes allowed per request")
+        self._client._commit(writes)
+        return writes
+
+
+class AlreadyExists(Exception):
+    pass
+
+
+class NotFound(Exception):
+    pass
+
+
+class InvalidArgument(Exception):
+    pass
+
+
+try:
+    # Raise the same exception types as the real client when it is installed
+    from google.api_core.exceptions import AlreadyExists, InvalidArgument, NotFound  # noqa: F811
+except ImportError:
+    pass
+
+
+class FakeFirestore:
+    """In-memory Firestore client; `latency` simulates a network round trip in seconds"""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.stats = OperationStats()
+        self._lock = threading.RLock()
+        self._store: Dict[str, Dict[str, Dict]] = defaultdict(dict)
+
+    def _simulate_latency(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _documents(self, collection_path):
+        return self._store[collection_path]
+
+    def collection(self, name):
+        return FakeCollectionReference(self, name)
+
+    def batch(self):
+        return FakeWriteBatch(self)
+
+    def get_all(self, references, field_paths=None):
+        """Fetch several documents in one round trip"""
+        self._simulate_latency()
+        references = list(references)
+        snapshots = []
+        with self._lock:
+            for ref in references:
+                data = self._documents(ref._collection_path).get(ref.id)
+                data = copy.deepcopy(_project(data, field_paths)) if data is not None else None
+                snapshots.append(FakeDocumentSnapshot(ref, data))
+        self.stats.record(reads=1, documents=len(snapshots))
+        return iter(snapshots)
+
+    def load(self, collection_path: str, documents: Dict[str, Dict]):
+        """Seed a collection without counting the writes"""
+        with self._lock:
+            for doc_id, data in documents.items():
+                self._documents(collection_path)[doc_id] = copy.deepcopy(data)
+
+    def dump(self, collection_path: str) -> Dict[str, Dict]:
+        with self._lock:
+            return copy.deepcopy(dict(self._documents(collection_path)))
+
+    def _commit(self, writes: List):
+        """Apply a list of writes atomically"""
+        self._simulate_latency()
+        with self._lock:
+            staged = {}
+
+            def current(ref):
+                key = (ref._collection_path, ref.id)
+                if key not in staged:
+                    staged[key] = copy.deepcopy(self._documents(ref._collection_path).get(ref.id))
+                return key, staged[key]
+
+            for kind, ref, payload, merge in writes:
+                key, existing = current(ref)
+                if kind == 'create':
+                    if existing is not None:
+                        raise AlreadyExists(f"Document already exists: {ref.path}")
+                    staged[key] = self._transformed({}, payload)
+                elif kind == 'set':
+                    base = existing if merge and existing is not None else {}
+                    staged[key] = self._transformed(base, payload, merge=merge)
+                elif kind == 'update':
+                    if existing is None:
+                        raise NotFound(f"No document to update: {ref.path}")
+                    staged[key] = self._transformed(existing, payload, dotted=True)
+                elif kind == 'delete':
+                    staged[key] = None
+
+            for (collection_path, doc_id), data in staged.items():
+                if data is None:
+                    self._documents(collection_path).pop(doc_id, None)
+                else:
+                    self._documents(collection_path)[doc_id] = data
+        self.stats.record(writes=len(writes))
+
+    @staticmethod
+    def _transformed(base, payload, dotted=False, merge=False):
+        result = copy.deepcopy(base)
+
+        def apply(target, updates, prefix=''):
+            for key, value in updates.items():
+                path = f"{prefix}{key}"
+                if merge and isinstance(value, dict) and not dotted:
+                    apply(target, value, f"{path}.")
+                    continue
+                if _is_delete_sentinel(value):
+                    _delete_field(target, path)
+                    continue
+                existing = _get_field(target, path)
+                _set_field(target, path, _apply_transform(None if existing is _MISSING else existing, value))
+
+        if dotted or merge:
+            apply(result, payload)
+        else:
+            result = {}
+            for key, value in payload.items():
+                result[key] = _apply_transform(None, value)
+        return result
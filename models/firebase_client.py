@@ -0,0 +1,45 @@
+# firebase_client.py
+"""
+One lazily created Firestore client per process.
+
+Scripts, the CLI and the matcher all get their client from `get_client`, so
+Firebase is initialised once, on first use, from one credentials setting: an
+explicit path, else $FOUNDERMATCHA_CREDENTIALS, else firebase-credentials.json in
+the working directory. firebase_admin is only imported when the first client is
+created.
+"""
+
+import os
+import threading
+
+CREDENTIALS_ENV = 'FOUNDERMATCHA_CREDENTIALS'
+DEFAULT_CREDENTIALS_PATH = 'firebase-credentials.json'
+
+_lock = threading.Lock()
+_client = None
+
+
+def credentials_path(cred_path=None):
+    return cred_path or os.environ.get(CREDENTIALS_ENV) or DEFAULT_CREDENTIALS_PATH
+
+
+def get_client(cred_path=None):
+    """The process-wide Firestore client, initialising Firebase on the first call"""
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                import firebase_admin
+                from firebase_admin import credentials, firestore
+
+                if not firebase_admin._apps:
+                    firebase_admin.initialize_app(credentials.Certificate(credentials_path(cred_path)))
+                _client = firestore.client()
+    return _client
+
+
+def set_client(client):
+    """Use `client` (e.g. the in-memory fake) from now on; None goes back to lazy initialisation"""
+    global _client
+    with _lock:
+        _client = client
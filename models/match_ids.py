@@ -0,0 +1,12 @@
+# match_ids.py
+"""
+Match document IDs.
+
+Kept free of Firestore imports so the web app can derive match IDs without
+loading the SDK at import time.
+"""
+
+
+def match_id_for(founder_id, developer_id):
+    """Deterministic match document ID, so each founder/developer pair maps to exactly one document"""
+    return f"{founder_id}:{developer_id}"
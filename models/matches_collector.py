@@ -1,23 +1,78 @@
 # matches_collector.py
 
-from firebase_admin import firestore
+from google.api_core.exceptions import AlreadyExists, NotFound
+import base64
 import datetime
-import uuid
+import heapq
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from models.batch_writer import BatchWriter, WriteOp
+from models.bulk_update import BulkUpdater
+from models.match_ids import match_id_for
+from models.collection_scan import scan_collection
+from models.snapshot_store import SnapshotStore, snapshot_hash
+from models.status_events import (STATUS_EVENTS_COLLECTION, get_status_timeline, record_status_event,
+                                  status_event)
+
+logger = logging.getLogger(__name__)
+
+# firestore.Query.DESCENDING, without importing the Firestore SDK
+DESCENDING = 'DESCENDING'
+
+# Fields returned by get_match_history(lightweight=True)
+HISTORY_FIELDS = ['match_id', 'timestamp', 'founder_id', 'developer_id', 'status.current', 'scores.total_score']
+
+
+def _created_at(match):
+    """When a match was stored, for picking the oldest of several; None if unknown"""
+    created = match.get('timestamp') or match.get('created_at')
+    if isinstance(created, str):
+        try:
+            created = datetime.datetime.fromisoformat(created)
+        except ValueError:
+            return None
+    return created if isinstance(created, datetime.datetime) else None
 
 
 class MatchCollector:
     def __init__(self, db):
         self.db = db
         self.matches_ref = self.db.collection('matches')
+        self.events_ref = self.db.collection(STATUS_EVENTS_COLLECTION)
+        self.snapshots = SnapshotStore(db)
 
-    def create_match(self, founder_data, developer_data, match_scores, initiated_by):
-        """Create a new match record in the matches collection"""
-
-        match_id = str(uuid.uuid4())
-        timestamp = datetime.datetime.utcnow()
+    def _build_snapshots(self, founder_data, developer_data):
+        """Founder and developer snapshots, stored by content hash in the snapshot store"""
+        founder_snapshot = {
+            'name': founder_data.get('name'),
+            'industries': founder_data.get('industries', []),
+            'personality_results': founder_data.get('personalityResults', {}),
+            'work_styles': founder_data.get('workStyles', []),
+            'about': founder_data.get('about', ''),
+            'long_description': founder_data.get('longDescription', ''),
+            'skills_needed': self._extract_skills_needed(
+                founder_data.get('about', ''),
+                founder_data.get('longDescription', '')
+            )
+        }
+        developer_snapshot = {
+            'name': developer_data.get('name'),
+            'skills': developer_data.get('skills', []),
+            'personality_results': developer_data.get('personalityResults', {}),
+            'work_styles': developer_data.get('workStyles', []),
+            'industries': developer_data.get('industries', []),
+            'degrees': developer_data.get('degrees', []),
+            'companies': developer_data.get('companies', [])
+        }
+        return founder_snapshot, developer_snapshot
 
-        # Construct match document
-        match_data = {
+    def _build_match_data(self, founder_data, developer_data, match_scores, initiated_by, timestamp,
+                          snapshot_refs):
+        """Construct the match document for a founder/developer pair"""
+        match_id = match_id_for(founder_data.get('id'), developer_data.get('id'))
+        return {
             'match_id': match_id,
             'timestamp': timestamp,
             'founder_id': founder_data.get('id'),
@@ -35,38 +90,13 @@ class MatchCollector:
                 }
             },
 
-            # Founder snapshot
-            'founder_snapshot': {
-                'name': founder_data.get('name'),
-                'industries': founder_data.get('industries', []),
-                'personality_results': founder_data.get('personalityResults', {}),
-                'work_styles': founder_data.get('workStyles', []),
-                'about': founder_data.get('about', ''),
-                'long_description': founder_data.get('longDescription', ''),
-                'skills_needed': self._extract_skills_needed(
-                    founder_data.get('about', ''),
-                    founder_data.get('longDescription', '')
-                )
-            },
+            # Content hashes of the founder and developer snapshots
+            'snapshot_refs': snapshot_refs,
 
-            # Developer snapshot
-            'developer_snapshot': {
-                'name': developer_data.get('name'),
-                'skills': developer_data.get('skills', []),
-                'personality_results': developer_data.get('personalityResults', {}),
-                'work_styles': developer_data.get('workStyles', []),
-                'industries': developer_data.get('industries', []),
-                'degrees': developer_data.get('degrees', []),
-                'companies': developer_data.get('companies', [])
-            },
-
-            # Match status tracking
+            # Current status only; transitions are logged in match_status_events
             'status': {
                 'current': 'pending',
-                'history': [{
-                    'status': 'pending',
-                    'timestamp': timestamp
-                }]
+                'updated_at': timestamp
             },
 
             # Success metrics (to be updated later)
@@ -77,20 +107,97 @@ class MatchCollector:
             }
         }
 
-        # Store in Firestore
+    def create_match(self, founder_data, developer_data, match_scores, initiated_by):
+        """Create a new match record in the matches collection"""
+        founder_snapshot, developer_snapshot = self._build_snapshots(founder_data, developer_data)
+        batch = self.db.batch()
+        snapshot_refs = {
+            'founder': self.snapshots.put(founder_snapshot, batch),
+            'developer': self.snapshots.put(developer_snapshot, batch)
+        }
+        match_data = self._build_match_data(founder_data, developer_data, match_scores, initiated_by,
+                                            datetime.datetime.utcnow(), snapshot_refs)
+        match_id = match_data['match_id']
+
+        # Store in Firestore; create() fails atomically if the pair is already matched
         try:
-            self.matches_ref.document(match_id).set(match_data)
+            batch.create(self.matches_ref.document(match_id), match_data)
+            record_status_event(self.db, batch, match_id, 'pending', match_data['timestamp'], initiated_by)
+            batch.commit()
+            self.snapshots.committed(founder_snapshot, developer_snapshot)
             return {
                 'success': True,
                 'match_id': match_id,
                 'message': 'Match created successfully'
             }
+        except AlreadyExists:
+            return {
+                'success': False,
+                'match_id': match_id,
+                'error': 'Match already exists'
+            }
         except Exception as e:
             return {
                 'success': False,
                 'error': str(e)
             }
 
+    def create_matches(self, pairs, initiated_by, batch_size=500, max_concurrency=4):
+        """
+        Create many matches in batched commits.
+
+        `pairs` is an iterable of (founder_data, developer_data, match_scores). Returns one
+        result per pair, in order; pairs that are already matched fail individually with
+        'Match already exists' without affecting the rest.
+        """
+        timestamp = datetime.datetime.utcnow()
+
+        results, operations, snapshots = [], [], {}
+        for founder_data, developer_data, match_scores in pairs:
+            match_id = match_id_for(founder_data.get('id'), developer_data.get('id'))
+            try:
+                snapshot_refs = {}
+                for role, snapshot in zip(('founder', 'developer'),
+                                          self._build_snapshots(founder_data, developer_data)):
+                    snapshot_refs[role] = snapshot_hash(snapshot)
+                    snapshots[snapshot_refs[role]] = snapshot
+                match_data = self._build_match_data(founder_data, developer_data, match_scores,
+                                                    initiated_by, timestamp, snapshot_refs)
+            except Exception as e:
+                results.append({'success': False, 'match_id': match_id, 'error': str(e)})
+                continue
+            operations.append(WriteOp(len(results), 'create', self.matches_ref.document(match_id), match_data))
+            results.append({'success': True, 'match_id': match_id})
+
+        writer = BatchWriter(self.db, batch_size=batch_size, max_concurrency=max_concurrency)
+
+        # Each distinct snapshot is written once, before any match that references it
+        snapshot_ops = [WriteOp(digest, 'set', self.snapshots.collection.document(digest), snapshot)
+                        for digest, snapshot in snapshots.items()]
+        stored = {result['key'] for result in writer.write(snapshot_ops) if result['success']}
+        self.snapshots.committed(*(snapshots[digest] for digest in stored))
+
+        pending = []
+        for op in operations:
+            if all(digest in stored for digest in op.data['snapshot_refs'].values()):
+                pending.append(op)
+            else:
+                results[op.key].update(success=False, error='Failed to store profile snapshots')
+
+        event_ops = []
+        for op, result in zip(pending, writer.write(pending)):
+            if result['success']:
+                event_ops.append(WriteOp(op.key, 'set', self.events_ref.document(),
+                                         status_event(op.data['match_id'], 'pending', timestamp, initiated_by)))
+            else:
+                error = 'Match already exists' if result['error'] == 'Document already exists' else result['error']
+                results[result['key']].update(success=False, error=error)
+
+        for result in writer.write(event_ops):
+            if not result['success']:
+                results[result['key']]['event_error'] = result['error']
+        return results
+
     def _extract_skills_needed(self, about, long_description):
         """Extract skills needed from founder's descriptions using basic keyword matching"""
         # This is a basic implementation - could be enhanced with NLP
@@ -110,47 +217,247 @@ class MatchCollector:
 
         return found_skills
 
-    def update_match_status(self, match_id, new_status):
-        """Update the status of a match"""
-        try:
-            match_ref = self.matches_ref.document(match_id)
-            match_doc = match_ref.get()
-
-            if not match_doc.exists:
-                return {'success': False, 'error': 'Match not found'}
+    def _status_update(self, new_status, timestamp):
+        return {
+            'status.current': new_status,
+            'status.updated_at': timestamp
+        }
 
+    def update_match_status(self, match_id, new_status, updated_by=None):
+        """Update the status of a match and log the transition"""
+        try:
             timestamp = datetime.datetime.utcnow()
-
-            # Update status
-            match_ref.update({
-                'status.current': new_status,
-                'status.history': firestore.ArrayUnion([{
-                    'status': new_status,
-                    'timestamp': timestamp
-                }])
-            })
-
+            batch = self.db.batch()
+            # The update fails with NotFound for a missing match, so no read is needed first
+            batch.update(self.matches_ref.document(match_id), self._status_update(new_status, timestamp))
+            record_status_event(self.db, batch, match_id, new_status, timestamp, updated_by)
+            batch.commit()
             return {'success': True, 'message': f'Status updated to {new_status}'}
+        except NotFound:
+            return {'success': False, 'error': 'Match not found'}
         except Exception as e:
             return {'success': False, 'error': str(e)}
 
-    def get_match_history(self, user_id, role='any'):
-        """Get match history for a user"""
+    def update_statuses(self, updates, updated_by=None, batch_size=500, max_concurrency=4):
+        """
+        Apply many status transitions in batched commits.
+
+        `updates` is an iterable of (match_id, new_status). Returns one result per
+        update, in order; missing matches fail individually with 'Match not found'.
+        Events are logged for the transitions that were applied.
+        """
+        timestamp = datetime.datetime.utcnow()
+        updates = list(updates)
+        operations = [
+            WriteOp(index, 'update', self.matches_ref.document(match_id),
+                    self._status_update(new_status, timestamp))
+            for index, (match_id, new_status) in enumerate(updates)
+        ]
+
+        writer = BatchWriter(self.db, batch_size=batch_size, max_concurrency=max_concurrency)
+        results, event_ops = [], []
+        for result in writer.write(operations):
+            match_id, new_status = updates[result['key']]
+            if result['success']:
+                results.append({'success': True, 'match_id': match_id})
+                event_ops.append(WriteOp(result['key'], 'set', self.events_ref.document(),
+                                         status_event(match_id, new_status, timestamp, updated_by)))
+            else:
+                error = 'Match not found' if result['error'] == 'Document not found' else result['error']
+                results.append({'success': False, 'match_id': match_id, 'error': error})
+
+        for result in writer.write(event_ops):
+            if not result['success']:
+                results[result['key']]['event_error'] = result['error']
+        return results
+
+    def get_status_timeline(self, match_id):
+        """Status transitions for a match, oldest first"""
+        return get_status_timeline(self.db, match_id)
+
+    @staticmethod
+    def _encode_cursor(match):
+        timestamp = match.get('timestamp')
+        if isinstance(timestamp, datetime.datetime):
+            timestamp = timestamp.isoformat()
+        payload = json.dumps({'timestamp': timestamp, 'match_id': match.get('match_id')})
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+
+    @staticmethod
+    def _decode_cursor(cursor):
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+        return {'timestamp': datetime.datetime.fromisoformat(payload['timestamp']),
+                'match_id': payload['match_id']}
+
+    def _history_page(self, field, user_id, page_size, cursor, fields):
+        """One role's page, newest first; match_id breaks timestamp ties so cursors are exact"""
+        query = (self.matches_ref.where(field, '==', user_id)
+                 .order_by('timestamp', direction=DESCENDING)
+                 .order_by('match_id', direction=DESCENDING))
+        if fields:
+            query = query.select(fields)
+        if cursor:
+            query = query.start_after(cursor)
+        # One extra document tells us whether another page exists
+        return [doc.to_dict() for doc in query.limit(page_size + 1).stream()]
+
+    @staticmethod
+    def _history_fields_update(match_id, match):
+        """The match_id/timestamp fields a match is missing, or None if it has both or no time to use"""
+        update = {}
+        if 'match_id' not in match:
+            update['match_id'] = match_id
+        if 'timestamp' not in match:
+            created_at = match.get('created_at')
+            if isinstance(created_at, str):
+                try:
+                    created_at = datetime.datetime.fromisoformat(created_at)
+                except ValueError:
+                    return None
+            if not isinstance(created_at, datetime.datetime):
+                return None
+            update['timestamp'] = created_at
+        return update or None
+
+    def backfill_history_fields(self, batch_size=500, max_concurrency=4, checkpoint_path=None):
+        """
+        Give matches stored without `match_id` or `timestamp` (those written by app.py
+        before it stored them) the fields get_match_history orders by, since Firestore
+        leaves documents without an order-by field out of the results. `timestamp` is
+        taken from `created_at`. Returns the BulkUpdater summary plus 'skipped', the
+        matches with no usable created_at.
+        """
+        operations, skipped = [], 0
+        for doc in scan_collection(self.db, 'matches', select=['match_id', 'timestamp', 'created_at']):
+            match = doc.to_dict()
+            if 'match_id' in match and 'timestamp' in match:
+                continue
+            update = self._history_fields_update(doc.id, match)
+            if update is None:
+                skipped += 1
+                continue
+            operations.append(WriteOp(doc.id, 'update', self.matches_ref.document(doc.id), update))
+
+        summary = BulkUpdater(self.db, batch_size=batch_size, max_concurrency=max_concurrency,
+                              checkpoint_path=checkpoint_path).run(operations)
+        summary['skipped'] = skipped
+        return summary
+
+    def rekey_legacy_matches(self, batch_size=500, max_concurrency=4):
+        """
+        Move matches stored under random IDs, from before match IDs were derived from
+        the pair, to their pair ID so every pair is found with one document get.
+
+        Each match is copied to its pair ID with `legacy_match_id` naming the old
+        document, its status events are pointed at the new ID, and the old document is
+        deleted. A rerun finishes matches that an interrupted run copied but did not
+        delete. When a pair already has another document under its pair ID, or several
+        old documents (the oldest is moved), the rest are left in place and counted in
+        'conflicts'. Returns {'moved', 'conflicts', 'failed'}.
+        """
+        pair_docs, legacy = {}, {}
+        for doc in scan_collection(self.db, 'matches'):
+            match = doc.to_dict()
+            if match.get('founder_id') is None or match.get('developer_id') is None:
+                continue
+            pair_id = match_id_for(match['founder_id'], match['developer_id'])
+            if doc.id == pair_id:
+                pair_docs[pair_id] = match.get('legacy_match_id')
+            else:
+                legacy.setdefault(pair_id, []).append((doc.id, match))
+
+        copies, targets, moved, conflicts = [], {}, {}, []
+        for pair_id, candidates in legacy.items():
+            candidates.sort(key=lambda candidate: (_created_at(candidate[1]) is None,
+                                                   _created_at(candidate[1]) or datetime.datetime.min,
+                                                   candidate[0]))
+            for old_id, match in candidates:
+                if pair_id in pair_docs:
+                    if pair_docs[pair_id] == old_id:
+                        # Copied by an earlier run that stopped before deleting it
+                        moved[old_id] = pair_id
+                    else:
+                        conflicts.append(old_id)
+                    continue
+                pair_docs[pair_id] = old_id
+                targets[old_id] = pair_id
+                copies.append(WriteOp(old_id, 'create', self.matches_ref.document(pair_id),
+                                      dict(match, match_id=pair_id, legacy_match_id=old_id)))
+
+        writer = BatchWriter(self.db, batch_size=batch_size, max_concurrency=max_concurrency)
+        failed = 0
+        for result in writer.write(copies):
+            if result['success']:
+                moved[result['key']] = targets[result['key']]
+            else:
+                failed += 1
+                logger.error(f"Failed to copy match {result['key']}: {result['error']}")
+
+        # Events first, so an interrupted run still finds the old document and retries them
+        # Events are keyed by their old match ID, so a failure keeps that match from being deleted
+        event_ops = [WriteOp(doc.to_dict()['match_id'], 'update', self.events_ref.document(doc.id),
+                             {'match_id': moved[doc.to_dict()['match_id']]})
+                     for doc in scan_collection(self.db, STATUS_EVENTS_COLLECTION, select=['match_id'])
+                     if doc.to_dict().get('match_id') in moved]
+        unfinished = set()
+        for result in writer.write(event_ops):
+            if not result['success']:
+                unfinished.add(result['key'])
+                logger.error(f"Failed to update a status event of match {result['key']}: {result['error']}")
+
+        delete_ops = [WriteOp(old_id, 'delete', self.matches_ref.document(old_id), None)
+                      for old_id in moved if old_id not in unfinished]
+        deleted = 0
+        for result in writer.write(delete_ops):
+            if result['success']:
+                deleted += 1
+            else:
+                logger.error(f"Failed to delete match {result['key']}: {result['error']}")
+        failed += len(moved) - deleted
+        if conflicts:
+            logger.warning(f"{len(conflicts)} matches were left under their old IDs because their pair "
+                           f"already has a match: {', '.join(sorted(conflicts)[:20])}")
+        return {'moved': deleted, 'conflicts': len(conflicts), 'failed': failed}
+
+    def get_match_history(self, user_id, role='any', page_size=50, cursor=None, lightweight=False,
+                          with_snapshots=False):
+        """
+        Get one page of match history for a user, newest first.
+
+        Pass the returned `next_cursor` back as `cursor` to fetch the following page; it
+        is None on the last page. With role='any' the founder and developer queries run
+        concurrently and are merged by timestamp. `lightweight` returns only IDs, status
+        and total score instead of full documents; `with_snapshots` resolves each match's
+        `snapshot_refs` into `snapshots` with one batched read for the page.
+        """
         try:
+            fields = HISTORY_FIELDS if lightweight else None
+            start_after = self._decode_cursor(cursor) if cursor else None
             if role == 'founder':
-                query = self.matches_ref.where('founder_id', '==', user_id)
+                matches = self._history_page('founder_id', user_id, page_size, start_after, fields)
             elif role == 'developer':
-                query = self.matches_ref.where('developer_id', '==', user_id)
+                matches = self._history_page('developer_id', user_id, page_size, start_after, fields)
             else:
                 # Get matches for either role
-                founder_matches = self.matches_ref.where('founder_id', '==', user_id).stream()
-                developer_matches = self.matches_ref.where('developer_id', '==', user_id).stream()
-                return {
-                    'success': True,
-                    'matches': list(founder_matches) + list(developer_matches)
-                }
+                with ThreadPoolExecutor(max_workers=2) as executor:
+                    founder_page = executor.submit(self._history_page, 'founder_id', user_id,
+                                                   page_size, start_after, fields)
+                    developer_page = executor.submit(self._history_page, 'developer_id', user_id,
+                                                     page_size, start_after, fields)
+                    matches = list(heapq.merge(
+                        founder_page.result(), developer_page.result(),
+                        key=lambda match: (match.get('timestamp'), match.get('match_id')),
+                        reverse=True
+                    ))
 
-            matches = list(query.stream())
-            return {'success': True, 'matches': matches}
+            has_more = len(matches) > page_size
+            matches = matches[:page_size]
+            if with_snapshots and not lightweight:
+                self.snapshots.resolve_matches(matches, target='snapshots')
+            return {
+                'success': True,
+                'matches': matches,
+                'next_cursor': self._encode_cursor(matches[-1]) if has_more else None
+            }
         except Exception as e:
-            return {'success': False, 'error': str(e)}
\ No newline at end of file
+            return {'success': False, 'error': str(e)}
@@ -0,0 +1,438 @@
+# metrics.py
+"""
+Per-route request metrics exported in Prometheus text format.
+
+Every Flask request gets a RequestMetrics context that accumulates wall time,
+time spent waiting on Firestore, time spent inside EnhancedMatcher and the
+number of document reads and writes. The Firestore client and the matcher are
+wrapped in thin proxies that feed the current context, so route handlers do
+not need to change.
+
+The current request is kept in a context variable rather than a thread-local,
+so reads made by worker threads that run in a copy of the request's context
+(collection_scan does this) are still charged to the request.
+"""
+
+import contextvars
+import threading
+import time
+from collections import defaultdict
+from functools import wraps
+
+from models.tracing import tracer
+
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100, 250, 1000)
+
+BACKGROUND_ROUTE = '(background)'
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.sum += value
+        self.count += 1
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+    def render(self, name, labels):
+        lines = []
+        for bound, count in zip(self.buckets, self.counts):
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {self.count}')
+        lines.append(f'{name}_sum{{{labels}}} {self.sum}')
+        lines.append(f'{name}_count{{{labels}}} {self.count}')
+        return lines
+
+
+class RequestMetrics:
+    """Mutable per-request accumulator"""
+
+    def __init__(self, route, method):
+        self.route = route
+        self.method = method
+        self.start = time.perf_counter()
+        self.firestore_seconds = 0.0
+        self.matcher_seconds = 0.0
+        self.reads = 0
+        self.documents = 0
+        self.writes = 0
+        # Set once the response is built; the request is then finished when the body is closed
+        self.closing = False
+
+
+class MetricsRegistry:
+    HISTOGRAMS = {
+        'request_duration_seconds': ('Request wall time', DURATION_BUCKETS),
+        'firestore_duration_seconds': ('Time spent waiting on Firestore per request', DURATION_BUCKETS),
+        'matcher_duration_seconds': ('Time spent in EnhancedMatcher per request', DURATION_BUCKETS),
+        'firestore_reads_per_request': ('Firestore read operations per request', COUNT_BUCKETS),
+        'firestore_writes_per_request': ('Firestore write operations per request', COUNT_BUCKETS),
+    }
+    COUNTERS = {
+        'requests_total': 'Requests served',
+        'firestore_reads_total': 'Firestore read operations (document gets and queries)',
+        'firestore_documents_read_total': 'Firestore documents returned by reads',
+        'firestore_writes_total': 'Firestore document writes',
+        'enrichment_jobs_total': 'ML-feature enrichment jobs by outcome',
+    }
+
+    def __init__(self, prefix='foundermatcha'):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._request = contextvars.ContextVar(f'{prefix}_request', default=None)
+        self._histograms = {name: {} for name in self.HISTOGRAMS}
+        self._counters = {name: defaultdict(float) for name in self.COUNTERS}
+        self._gauges = {}
+
+    # Request lifecycle
+
+    def current(self):
+        return self._request.get()
+
+    def start_request(self, route, method):
+        ctx = RequestMetrics(route, method)
+        self._request.set(ctx)
+        return ctx
+
+    def finish_request(self, status_code, ctx=None):
+        ctx = ctx or self.current()
+        if ctx is None:
+            return
+        if self.current() is ctx:
+            self._request.set(None)
+        elapsed = time.perf_counter() - ctx.start
+        labels = (('route', ctx.route), ('method', ctx.method))
+        with self._lock:
+            self._observe('request_duration_seconds', labels, elapsed)
+            self._observe('firestore_duration_seconds', labels, ctx.firestore_seconds)
+            self._observe('matcher_duration_seconds', labels, ctx.matcher_seconds)
+            self._observe('firestore_reads_per_request', labels, ctx.reads)
+            self._observe('firestore_writes_per_request', labels, ctx.writes)
+            self._counters['requests_total'][labels + (('status', str(status_code)),)] += 1
+            self._counters['firestore_reads_total'][labels] += ctx.reads
+            self._counters['firestore_documents_read_total'][labels] += ctx.documents
+            self._counters['firestore_writes_total'][labels] += ctx.writes
+
+    def _observe(self, name, labels, value):
+        histograms = self._histograms[name]
+        if labels not in histograms:
+            histograms[labels] = Histogram(self.HISTOGRAMS[name][1])
+        histograms[labels].observe(value)
+
+    # Recording hooks used by the proxies
+
+    def record_firestore(self, seconds, reads=0, documents=0, writes=0):
+        ctx = self.current()
+        with self._lock:
+            if ctx is not None:
+                # Scan workers share the request's context, so updates can race
+                ctx.firestore_seconds += seconds
+                ctx.reads += reads
+                ctx.documents += documents
+                ctx.writes += writes
+                return
+            labels = (('route', BACKGROUND_ROUTE), ('method', ''))
+            self._counters['firestore_reads_total'][labels] += reads
+            self._counters['firestore_documents_read_total'][labels] += documents
+            self._counters['firestore_writes_total'][labels] += writes
+
+    def record_matcher(self, seconds):
+        ctx = self.current()
+        if ctx is not None:
+            with self._lock:
+                ctx.matcher_seconds += seconds
+
+    def increment(self, name, value=1, **labels):
+        with self._lock:
+            self._counters[name][tuple(sorted(labels.items()))] += value
+
+    def register_gauge(self, name, help_text, callback):
+        """Expose a value that is read when metrics are scraped, e.g. a queue backlog"""
+        with self._lock:
+            self._gauges[name] = (help_text, callback)
+
+    # Exposition
+
+    @staticmethod
+    def _format_labels(labels):
+        return ','.join(f'{key}="{value}"' for key, value in labels)
+
+    def render(self):
+        """Render all metrics in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            for name, help_text in self.COUNTERS.items():
+                full_name = f'{self.prefix}_{name}'
+                lines.append(f'# HELP {full_name} {help_text}')
+                lines.append(f'# TYPE {full_name} counter')
+                for labels, value in sorted(self._counters[name].items()):
+                    lines.append(f'{full_name}{{{self._format_labels(labels)}}} {value:g}')
+            for name, (help_text, _) in self.HISTOGRAMS.items():
+                full_name = f'{self.prefix}_{name}'
+                lines.append(f'# HELP {full_name} {help_text}')
+                lines.append(f'# TYPE {full_name} histogram')
+                for labels, histogram in sorted(self._histograms[name].items()):
+                    lines.extend(histogram.render(full_name, self._format_labels(labels)))
+            gauges = list(self._gauges.items())
+        for name, (help_text, callback) in gauges:
+            full_name = f'{self.prefix}_{name}'
+            lines.append(f'# HELP {full_name} {help_text}')
+            lines.append(f'# TYPE {full_name} gauge')
+            lines.append(f'{full_name} {callback():g}')
+        return '\n'.join(lines) + '\n'
+
+    def reset(self):
+        with self._lock:
+            self._histograms = {name: {} for name in self.HISTOGRAMS}
+            self._counters = {name: defaultdict(float) for name in self.COUNTERS}
+
+    def init_app(self, app):
+        """Attach request hooks to a Flask app"""
+        from flask import request
+
+        @app.before_request
+        def _start_request_metrics():
+            route = request.url_rule.rule if request.url_rule else 'unmatched'
+            self.start_request(route, request.method)
+
+        @app.after_request
+        def _finish_request_metrics(response):
+            # A streamed body keeps reading Firestore after this hook, so the request is
+            # only finished when the server closes the response
+            ctx = self.current()
+            if ctx is not None:
+                ctx.closing = True
+                status_code = response.status_code
+                response.call_on_close(lambda: self.finish_request(status_code, ctx))
+            return response
+
+        @app.teardown_request
+        def _abandon_request_metrics(error=None):
+            # after_request is skipped when a handler raises
+            ctx = self.current()
+            if ctx is not None and not ctx.closing:
+                self.finish_request(500)
+
+
+registry = MetricsRegistry()
+
+
+def _unwrap(value):
+    if isinstance(value, InstrumentedFirestore):
+        return value.wrapped
+    if isinstance(value, (list, tuple)):
+        return type(value)(_unwrap(item) for item in value)
+    return value
+
+
+def _unwrapped(method):
+    """Call `method` with any proxied references in its arguments replaced by the real objects"""
+    @wraps(method)
+    def wrapper(*args, **kwargs):
+        return method(*[_unwrap(arg) for arg in args], **{k: _unwrap(v) for k, v in kwargs.items()})
+    return wrapper
+
+
+class InstrumentedFirestore:
+    """Proxy around a Firestore client (or any object it hands out) that times, counts and traces calls"""
+
+    # list_documents and get_partitions are one round trip each, like a query
+    _READ_METHODS = ('get', 'stream', 'get_all', 'list_documents', 'get_partitions')
+    _WRITE_METHODS = ('set', 'create', 'update', 'delete')
+    _CHAIN_METHODS = ('collection', 'document', 'where', 'order_by', 'limit', 'limit_to_last', 'offset',
+                      'select', 'start_at', 'start_after', 'end_at', 'end_before', 'batch',
+                      'collection_group', 'count', 'query')
+
+    def __init__(self, target, metrics=None, label=''):
+        self._target = target
+        self._metrics = metrics or registry
+        self._label = label
+
+    @property
+    def wrapped(self):
+        return self._target
+
+    def __getattr__(self, name):
+        attr = getattr(self._target, name)
+        if not callable(attr):
+            return attr
+        attr = _unwrapped(attr)
+        if name in self._CHAIN_METHODS:
+            return self._chain(name, attr)
+        if name in self._READ_METHODS:
+            return self._read(name, attr)
+        if name in self._WRITE_METHODS:
+            return self._write(name, attr)
+        if name == 'commit':
+            return self._commit(attr)
+        return attr
+
+    def _chain(self, name, method):
+        @wraps(method)
+        def wrapper(*args, **kwargs):
+            if name in ('collection', 'document', 'collection_group'):
+                label = f"{self._label}/{args[0] if args else ''}".lstrip('/')
+            elif name in ('where', 'limit', 'order_by'):
+                label = f"{self._label} {name}({', '.join(str(arg) for arg in args)})"
+            else:
+                label = f"{self._label} {name}"
+            return InstrumentedFirestore(method(*args, **kwargs), self._metrics, label)
+        return wrapper
+
+    def _read(self, name, method):
+        metrics = self._metrics
+
+        @wraps(method)
+        def wrapper(*args, **kwargs):
+            span = tracer.start_span(f'firestore.{name}', activate=False, target=self._label)
+            start = time.perf_counter()
+            try:
+                result = method(*args, **kwargs)
+            except Exception:
+                tracer.end_span(span)
+                raise
+            if hasattr(result, 'exists'):
+                # DocumentReference.get returns a single snapshot
+                metrics.record_firestore(time.perf_counter() - start, reads=1, documents=1)
+                tracer.end_span(span)
+                return result
+            if isinstance(result, list):
+                documents = len(result)
+                if result and isinstance(result[0], list):
+                    # Aggregation queries return [[AggregationResult, ...]]
+                    documents = 1
+                metrics.record_firestore(time.perf_counter() - start, reads=1, documents=max(documents, 1))
+                if span is not None:
+                    span.set(documents=documents)
+                tracer.end_span(span)
+                return result
+            if name == 'get_partitions':
+                # Wrap each QueryPartition so the range queries it builds are counted too
+                result = (InstrumentedFirestore(partition, metrics, f'{self._label} partition')
+                          for partition in result)
+            return _TimedIterator(result, metrics, start, span)
+        return wrapper
+
+    def _write(self, name, method):
+        metrics = self._metrics
+
+        @wraps(method)
+        def wrapper(*args, **kwargs):
+            if hasattr(self._target, 'commit'):
+                # WriteBatch.set/update/delete only stage writes; commit does the round trip
+                return method(*args, **kwargs)
+            start = time.perf_counter()
+            with tracer.span(f'firestore.{name}', target=self._label):
+                try:
+                    return method(*args, **kwargs)
+                finally:
+                    metrics.record_firestore(time.perf_counter() - start, writes=1)
+        return wrapper
+
+    def _commit(self, method):
+        metrics = self._metrics
+        staged = len(getattr(self._target, '_write_pbs', None) or getattr(self._target, '_writes', None) or [])
+
+        @wraps(method)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            with tracer.span('firestore.commit', writes=staged):
+                try:
+                    return method(*args, **kwargs)
+                finally:
+                    metrics.record_firestore(time.perf_counter() - start, writes=staged)
+        return wrapper
+
+
+class _TimedIterator:
+    """Counts documents and time spent pulling them from a streaming read"""
+
+    def __init__(self, iterator, metrics, start, span=None):
+        self._iterator = iter(iterator)
+        self._metrics = metrics
+        self._span = span
+        self._elapsed = time.perf_counter() - start
+        self._documents = 0
+        self._done = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        start = time.perf_counter()
+        try:
+            item = next(self._iterator)
+        except StopIteration:
+            self._elapsed += time.perf_counter() - start
+            self._finish()
+            raise
+        self._elapsed += time.perf_counter() - start
+        self._documents += 1
+        return item
+
+    def _finish(self):
+        if not self._done:
+            self._done = True
+            self._metrics.record_firestore(self._elapsed, reads=1, documents=max(self._documents, 1))
+            if self._span is not None:
+                self._span.set(documents=self._documents, waiting_ms=round(self._elapsed * 1000, 3))
+                tracer.end_span(self._span)
+
+
+class InstrumentedMatcher:
+    """
+    Proxy that attributes time spent in EnhancedMatcher to the current request.
+
+    Public methods are re-bound to the proxy, so the component calls made inside
+    calculate_match_score (skill, personality, ...) get their own trace spans
+    while only the outermost call counts towards matcher time.
+    """
+
+    def __init__(self, matcher, metrics=None):
+        self._matcher = matcher
+        self._metrics = metrics or registry
+        self._depth = contextvars.ContextVar('matcher_depth', default=0)
+
+    @property
+    def wrapped(self):
+        return self._matcher
+
+    def __getattr__(self, name):
+        attr = getattr(self._matcher, name)
+        if not callable(attr) or name.startswith('_'):
+            return attr
+        function = getattr(type(self._matcher), name, None)
+        if callable(function) and not isinstance(function, type):
+            # Bind the class function to the proxy so nested self.* calls are traced too
+            attr = function.__get__(self)
+        metrics = self._metrics
+        depth_var = self._depth
+
+        @wraps(attr)
+        def wrapper(*args, **kwargs):
+            depth = depth_var.get()
+            depth_var.set(depth + 1)
+            start = time.perf_counter()
+            try:
+                with tracer.span(f'matcher.{name}'):
+                    return attr(*args, **kwargs)
+            finally:
+                depth_var.set(depth)
+                if depth == 0:
+                    metrics.record_matcher(time.perf_counter() - start)
+        return wrapper
+
+
+def instrument_firestore(client, metrics=None):
+    return InstrumentedFirestore(client, metrics) if client is not None else None
+
+
+def instrument_matcher(matcher, metrics=None):
+    return InstrumentedMatcher(matcher, metrics) if matcher is not None else None
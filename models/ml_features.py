@@ -0,0 +1,174 @@
+# ml_features.py
+"""
+Features stored with each match for later model training.
+
+The profile features are pure functions of the founder and developer profiles.
+Prior-match features are counted over matches created before the match being
+enriched, so they describe the users' history at the time of the match no matter
+when enrichment runs.
+"""
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+TRAITS = ['openness', 'conscientiousness', 'extraversion', 'agreeableness', 'neuroticism']
+
+
+def calculate_skill_coverage(founder, developer):
+    founder_industries = set(founder.get('industries', []))
+    developer_skills = set(developer.get('skills', []))
+    return len(developer_skills) / max(len(founder_industries), 1)
+
+
+def calculate_personality_compatibility(founder, developer):
+    f_personality = founder.get('personalityResults', {})
+    d_personality = developer.get('personalityResults', {})
+
+    if not f_personality or not d_personality:
+        return 0
+
+    differences = []
+
+    for trait in TRAITS:
+        f_score = f_personality.get(trait, 0)
+        d_score = d_personality.get(trait, 0)
+        differences.append(abs(f_score - d_score))
+
+    return 1 - (sum(differences) / (len(TRAITS) * 100)) if differences else 0
+
+
+def calculate_experience_match(founder, developer):
+    f_companies = len(founder.get('companies', []))
+    d_companies = len(developer.get('companies', []))
+    return 1 - abs(f_companies - d_companies) / max(f_companies + d_companies, 1)
+
+
+# Location matching
+def get_location_match(founder, developer):
+    """Returns 1 if locations match, 0 otherwise"""
+    try:
+        return 1 if founder.get('city') == developer.get('city') else 0
+    except Exception as e:
+        logger.error(f"Error in location matching: {e}")
+        return 0
+
+
+# Industry overlap calculation
+def get_industry_overlap(founder, developer):
+    """Calculate percentage of overlapping industries"""
+    try:
+        founder_industries = set(founder.get('industries', []))
+        developer_industries = set(developer.get('industries', []))
+
+        if not founder_industries or not developer_industries:
+            return 0
+
+        overlap = founder_industries.intersection(developer_industries)
+        total = founder_industries.union(developer_industries)
+
+        return len(overlap) / len(total)
+    except Exception as e:
+        logger.error(f"Error in industry overlap: {e}")
+        return 0
+
+
+def profile_features(founder, developer):
+    """Features that only depend on the two profiles"""
+    return {
+        'location_match': get_location_match(founder, developer),
+        'industry_overlap': get_industry_overlap(founder, developer),
+        'skill_coverage': calculate_skill_coverage(founder, developer),
+        'personality_compatibility': calculate_personality_compatibility(founder, developer),
+        'experience_level_match': calculate_experience_match(founder, developer),
+    }
+
+
+# Match history tracking
+def _count(query):
+    return query.count().get()[0][0].value
+
+
+def get_prior_match_stats(db, user_id, before):
+    """
+    Matches a user took part in (either role) that were created before `before`,
+    and the success rate of those they were the founder in. Uses count aggregations,
+    so no match documents are downloaded.
+    """
+    matches = db.collection('matches').where('created_at', '<', before)
+    as_founder = _count(matches.where('founder_id', '==', user_id))
+    as_developer = _count(matches.where('developer_id', '==', user_id))
+    successful = _count(matches.where('founder_id', '==', user_id).where('status', '==', 'successful'))
+    return {
+        'count': as_founder + as_developer,
+        'success_rate': successful / as_founder if as_founder > 0 else 0
+    }
+
+
+def compute_ml_features(db, founder_id, developer_id, founder, developer, created_at):
+    """Full ml_features for one match"""
+    founder_stats = get_prior_match_stats(db, founder_id, created_at)
+    developer_stats = get_prior_match_stats(db, developer_id, created_at)
+    return dict(profile_features(founder, developer), prior_matches={
+        'founder': founder_stats['count'],
+        'developer': developer_stats['count'],
+        'success_rate_founder': founder_stats['success_rate'],
+        'success_rate_developer': developer_stats['success_rate']
+    })
+
+
+# Column-at-a-time versions for bulk recomputation (backfill_ml_features.py). Profiles
+# are prepared once per distinct profile, and each column function takes per-match
+# lists of prepared profiles; they must agree with the row functions above.
+
+def prepare_profile(profile):
+    """Derive the values the feature columns need from a profile or snapshot-shaped dict"""
+    personality = profile.get('personalityResults') or {}
+    return {
+        'city': profile.get('city'),
+        'industries': frozenset(profile.get('industries') or []),
+        'skills': frozenset(profile.get('skills') or []),
+        'company_count': len(profile.get('companies') or []),
+        'traits': tuple(personality.get(trait, 0) for trait in TRAITS) if personality else None,
+    }
+
+
+def location_match_column(founders, developers):
+    return [1 if f['city'] == d['city'] else 0 for f, d in zip(founders, developers)]
+
+
+def industry_overlap_column(founders, developers):
+    return [
+        len(f['industries'] & d['industries']) / len(f['industries'] | d['industries'])
+        if f['industries'] and d['industries'] else 0
+        for f, d in zip(founders, developers)
+    ]
+
+
+def skill_coverage_column(founders, developers):
+    return [len(d['skills']) / max(len(f['industries']), 1) for f, d in zip(founders, developers)]
+
+
+def personality_compatibility_column(founders, developers):
+    scale = len(TRAITS) * 100
+    return [
+        1 - sum(abs(a - b) for a, b in zip(f['traits'], d['traits'])) / scale
+        if f['traits'] is not None and d['traits'] is not None else 0
+        for f, d in zip(founders, developers)
+    ]
+
+
+def experience_match_column(founders, developers):
+    return [
+        1 - abs(f['company_count'] - d['company_count']) / max(f['company_count'] + d['company_count'], 1)
+        for f, d in zip(founders, developers)
+    ]
+
+
+PROFILE_FEATURE_COLUMNS = {
+    'location_match': location_match_column,
+    'industry_overlap': industry_overlap_column,
+    'skill_coverage': skill_coverage_column,
+    'personality_compatibility': personality_compatibility_column,
+    'experience_level_match': experience_match_column,
+}
@@ -0,0 +1,91 @@
+# personality_stats.py
+"""
+Streaming personality-trait statistics shared by analyzepersonalitytraits.py and
+the analytics pipeline.
+"""
+
+from models.ml_features import TRAITS
+from models.sketches import KLLSketch, RunningStats
+
+ROLES = ['founder', 'developer']
+
+
+def user_role(data):
+    return 'founder' if data.get('role') == 'founder / entrepreneur' else 'developer'
+
+
+class StreamingPersonalityStats:
+    """
+    One-pass, constant-memory version of analyze_personality_distributions in
+    analyzepersonalitytraits.py: Welford moments and a KLL sketch per trait, overall
+    and by role. Partial results from different shards of the user base can be
+    merged, and the state round-trips through JSON so it can be saved and extended.
+    """
+
+    SCOPES = ['overall'] + ROLES
+
+    def __init__(self, k=200):
+        self.k = k
+        self.moments = {scope: {trait: RunningStats() for trait in TRAITS} for scope in self.SCOPES}
+        self.sketches = {scope: {trait: KLLSketch(k) for trait in TRAITS} for scope in self.SCOPES}
+
+    def add(self, role, personality):
+        for trait in TRAITS:
+            if trait in personality:
+                value = personality[trait]
+                for scope in ('overall', role):
+                    self.moments[scope][trait].add(value)
+                    self.sketches[scope][trait].add(value)
+
+    def consume(self, records):
+        for role, personality in records:
+            self.add(role, personality)
+        return self
+
+    def merge(self, other):
+        for scope in self.SCOPES:
+            for trait in TRAITS:
+                self.moments[scope][trait].merge(other.moments[scope][trait])
+                self.sketches[scope][trait].merge(other.sketches[scope][trait])
+        return self
+
+    def _trait_stats(self, scope, trait):
+        moments = self.moments[scope][trait]
+        if moments.count == 0:
+            return None
+        sketch = self.sketches[scope][trait]
+        q1, q2, q3 = sketch.quartiles()
+        return {
+            'min': moments.min,
+            'max': moments.max,
+            'mean': moments.mean,
+            'median': sketch.median(),
+            'stdev': moments.stdev,
+            'count': moments.count,
+            'quartiles': {'q1': q1, 'q2': q2, 'q3': q3}
+        }
+
+    def results(self):
+        """Summary in the same shape analyze_personality_distributions produces"""
+        return {
+            'overall': {trait: self._trait_stats('overall', trait) for trait in TRAITS},
+            'by_role': {role: {trait: self._trait_stats(role, trait) for trait in TRAITS} for role in ROLES}
+        }
+
+    def to_state(self):
+        return {
+            'k': self.k,
+            'moments': {scope: {trait: stats.to_dict() for trait, stats in traits.items()}
+                        for scope, traits in self.moments.items()},
+            'sketches': {scope: {trait: sketch.to_dict() for trait, sketch in traits.items()}
+                         for scope, traits in self.sketches.items()}
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        stats = cls(k=state['k'])
+        stats.moments = {scope: {trait: RunningStats.from_dict(s) for trait, s in traits.items()}
+                         for scope, traits in state['moments'].items()}
+        stats.sketches = {scope: {trait: KLLSketch.from_dict(s) for trait, s in traits.items()}
+                          for scope, traits in state['sketches'].items()}
+        return stats
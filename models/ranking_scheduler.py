@@ -0,0 +1,263 @@
+# ranking_scheduler.py
+"""
+Background precomputation of founder -> developer rankings.
+
+RankingScheduler reads `hackathonusers` once per refresh, scores every developer
+against every founder on its own worker pool and stores the top-N per founder in
+`founder_rankings/{founder_id}` together with a `computed_at` timestamp. Rankings
+are refreshed on a timer and whenever a profile changes (through a Firestore
+listener where the client supports it, or `notify_profile_changed`).
+
+Request handlers only read the stored documents via `get_precomputed_ranking`,
+so the scoring cost moves off the request path.
+
+    python -m models.ranking_scheduler --once    # precompute at deploy time
+"""
+
+import argparse
+import heapq
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+RANKINGS_COLLECTION = 'founder_rankings'
+FOUNDER_ROLE = 'founder / entrepreneur'
+DEVELOPER_ROLE = 'softwareEngineer'
+
+# Developer fields copied into each ranking entry so a ranking can be served without
+# re-reading the developer documents
+CARD_FIELDS = ['name', 'role', 'skills', 'workStyles', 'city', 'profileImageUrl', 'personalityResults',
+               'degrees', 'industries', 'companies', 'admiringpersonalities', 'hobbies']
+
+# Ranking documents can be ~100KB each, so keep commits well under the request size limit
+WRITE_BATCH_SIZE = 20
+
+
+def rank_developers(matcher, founder_data, developers, top_n):
+    """Return the top_n (developer_id, developer_data, match_results) for one founder"""
+    scores = matcher.calculate_match_scores(founder_data, [dev_data for _, dev_data in developers])
+    scored = (
+        (dev_id, dev_data, match_results)
+        for (dev_id, dev_data), match_results in zip(developers, scores)
+    )
+    return heapq.nlargest(top_n, scored, key=lambda item: item[2]['total_score'])
+
+
+def get_precomputed_ranking(db, founder_id, max_age=None):
+    """
+    Read a stored ranking. Returns None when there is none or it is older than
+    `max_age` seconds, so callers can fall back to scoring live.
+    """
+    doc = db.collection(RANKINGS_COLLECTION).document(str(founder_id)).get()
+    if not doc.exists:
+        return None
+    ranking = doc.to_dict()
+    if max_age is not None:
+        computed_at = datetime.fromisoformat(ranking['computed_at'])
+        if datetime.utcnow() - computed_at > timedelta(seconds=max_age):
+            return None
+    return ranking
+
+
+class RankingScheduler:
+    def __init__(self, db, matcher, top_n=100, interval=900, max_workers=4, debounce=30):
+        self.db = db
+        self.matcher = matcher
+        self.top_n = top_n
+        self.interval = interval
+        self.debounce = debounce
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='ranking-worker')
+
+        self.last_full_refresh = None
+        self._developers = None
+        self._founders = {}
+        self._dirty_founders = set()
+        self._full_refresh_due = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._watch = None
+
+    # Scheduling
+
+    def start(self, refresh_now=True):
+        """Start the timer thread and, where supported, a listener on hackathonusers"""
+        with self._lock:
+            self._full_refresh_due = time.monotonic() if refresh_now else time.monotonic() + self.interval
+        self._thread = threading.Thread(target=self._run, name='ranking-scheduler', daemon=True)
+        self._thread.start()
+        self._start_watch()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._watch is not None:
+            self._watch.unsubscribe()
+        if self._thread is not None:
+            self._thread.join()
+        self.executor.shutdown(wait=True)
+
+    def notify_profile_changed(self, user_id, role=None):
+        """
+        A founder change only invalidates that founder's ranking; a developer change
+        can move them in or out of anyone's top-N, so it schedules a debounced full refresh.
+        """
+        with self._lock:
+            if role == FOUNDER_ROLE or user_id in self._founders:
+                self._dirty_founders.add(user_id)
+            else:
+                due = time.monotonic() + self.debounce
+                if self._full_refresh_due is None or self._full_refresh_due > due:
+                    self._full_refresh_due = due
+        self._wake.set()
+
+    def _start_watch(self):
+        users_ref = self.db.collection('hackathonusers')
+        if not hasattr(users_ref, 'on_snapshot'):
+            return
+        first_snapshot = threading.Event()
+
+        def on_change(_, changes, __):
+            # The first callback replays the whole collection; the initial refresh covers it
+            if not first_snapshot.is_set():
+                first_snapshot.set()
+                return
+            for change in changes:
+                data = change.document.to_dict() or {}
+                self.notify_profile_changed(change.document.id, data.get('role'))
+
+        try:
+            self._watch = users_ref.on_snapshot(on_change)
+        except Exception as e:
+            logger.warning(f"Profile change listener unavailable, relying on the timer: {e}")
+
+    def _run(self):
+        while not self._stop.is_set():
+            now = time.monotonic()
+            with self._lock:
+                full_due = self._full_refresh_due is not None and now >= self._full_refresh_due
+                dirty = set() if full_due else set(self._dirty_founders)
+                self._dirty_founders -= dirty
+            try:
+                if full_due:
+                    self.refresh_all()
+                elif dirty:
+                    self.refresh_founders(dirty)
+            except Exception as e:
+                logger.error(f"Ranking refresh failed: {e}", exc_info=True)
+                with self._lock:
+                    self._full_refresh_due = time.monotonic() + self.debounce
+
+            with self._lock:
+                due = self._full_refresh_due
+            timeout = max(due - time.monotonic(), 0.1) if due is not None else self.interval
+            self._wake.wait(timeout)
+            self._wake.clear()
+
+    # Refreshing
+
+    def _load_users(self):
+        founders, developers = {}, []
+        for doc in self.db.collection('hackathonusers').stream():
+            data = doc.to_dict()
+            if data.get('role') == FOUNDER_ROLE:
+                founders[doc.id] = data
+            elif data.get('role') == DEVELOPER_ROLE:
+                developers.append((doc.id, data))
+        return founders, developers
+
+    def refresh_all(self):
+        """Re-read every user and recompute every founder's ranking"""
+        start = time.perf_counter()
+        founders, developers = self._load_users()
+        with self._lock:
+            self._founders, self._developers = founders, developers
+            self._dirty_founders.clear()
+            self._full_refresh_due = time.monotonic() + self.interval
+        self._compute_and_store(founders, developers)
+        self.last_full_refresh = datetime.utcnow()
+        logger.info(f"Precomputed rankings for {len(founders)} founders against {len(developers)} developers "
+                    f"in {time.perf_counter() - start:.1f}s")
+
+    def refresh_founders(self, founder_ids):
+        """Recompute rankings for specific founders against the cached developer pool"""
+        if self._developers is None:
+            return self.refresh_all()
+        refs = [self.db.collection('hackathonusers').document(fid) for fid in founder_ids]
+        founders = {}
+        for doc in self.db.get_all(refs):
+            if doc.exists and doc.to_dict().get('role') == FOUNDER_ROLE:
+                founders[doc.id] = doc.to_dict()
+        with self._lock:
+            self._founders.update(founders)
+        self._compute_and_store(founders, self._developers)
+
+    def _compute_and_store(self, founders, developers):
+        computed_at = datetime.utcnow().isoformat()
+        founder_ids = list(founders)
+        rankings = self.executor.map(
+            lambda fid: rank_developers(self.matcher, founders[fid], developers, self.top_n),
+            founder_ids
+        )
+
+        batch = self.db.batch()
+        pending = 0
+        for founder_id, ranking in zip(founder_ids, rankings):
+            batch.set(self.db.collection(RANKINGS_COLLECTION).document(founder_id), {
+                'founder_id': founder_id,
+                'computed_at': computed_at,
+                'pool_size': len(developers),
+                'developers': [
+                    {'id': dev_id,
+                     'data': {field: dev_data.get(field) for field in CARD_FIELDS if field in dev_data},
+                     'match_score': match_results}
+                    for dev_id, dev_data, match_results in ranking
+                ],
+            })
+            pending += 1
+            if pending == WRITE_BATCH_SIZE:
+                batch.commit()
+                batch, pending = self.db.batch(), 0
+        if pending:
+            batch.commit()
+
+
+def main():
+    from models.calculate_matches import EnhancedMatcher, ProfileStore
+    from models.firebase_client import get_client
+
+    parser = argparse.ArgumentParser(description='Precompute founder -> developer rankings')
+    parser.add_argument('--cred-path', type=str,
+                        help='Path to Firebase credentials JSON file (default: $FOUNDERMATCHA_CREDENTIALS)')
+    parser.add_argument('--top-n', type=int, default=100, help='Developers stored per founder')
+    parser.add_argument('--workers', type=int, default=4, help='Scoring worker threads')
+    parser.add_argument('--interval', type=int, default=900, help='Seconds between full refreshes')
+    parser.add_argument('--once', action='store_true', help='Run a single full refresh and exit')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    db = get_client(args.cred_path)
+
+    matcher = EnhancedMatcher(taxonomy=ProfileStore(db=db).load_taxonomy())
+    scheduler = RankingScheduler(db, matcher, top_n=args.top_n,
+                                 interval=args.interval, max_workers=args.workers)
+    if args.once:
+        scheduler.refresh_all()
+        scheduler.executor.shutdown()
+        return
+
+    scheduler.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        scheduler.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+# read_budget.py
+"""
+Firestore read/write budgets for tests.
+
+`read_budget` wraps a block of code running against the in-memory fake and fails
+with ReadBudgetExceeded when it performs more operations than allowed:
+
+    with read_budget(db, reads=2):
+        client.post('/api/match', json={...})
+
+ROUTE_BUDGETS records the agreed upper bound for each route, and
+`check_route_budgets` replays one request per route against a seeded fake and
+returns every violation, so repeated profile fetches and similar regressions
+fail loudly instead of showing up on the bill.
+"""
+
+import uuid
+from contextlib import contextmanager
+
+
+class ReadBudgetExceeded(AssertionError):
+    pass
+
+
+def _stats_for(db):
+    """Find the fake's OperationStats, looking through metric/tracing proxies"""
+    while not hasattr(db, 'stats') and hasattr(db, 'wrapped'):
+        db = db.wrapped
+    if not hasattr(db, 'stats'):
+        raise TypeError('read_budget needs the in-memory FakeFirestore client')
+    return db.stats
+
+
+@contextmanager
+def read_budget(db, reads=None, writes=None, documents=None, label='block'):
+    """
+    Count Firestore operations made inside the block (including by scan workers) and raise
+    ReadBudgetExceeded if any limit is exceeded. `reads` counts round trips
+    (document gets, queries and batched gets); `documents` counts documents returned.
+    """
+    stats = _stats_for(db)
+    scope = f'{label}#{uuid.uuid4().hex}'
+    try:
+        with stats.track(scope) as counts:
+            yield counts
+    finally:
+        stats.by_scope.pop(scope, None)
+
+    limits = {'reads': reads, 'writes': writes, 'documents': documents}
+    exceeded = [f"{key}={counts[key]} (budget {limit})"
+                for key, limit in limits.items()
+                if limit is not None and counts[key] > limit]
+    if exceeded:
+        raise ReadBudgetExceeded(f"{label} exceeded its Firestore budget: {', '.join(exceeded)}")
+
+
+# (method, url template, json body template, budget). Templates are filled from
+# the ids in `check_route_budgets`.
+ROUTE_BUDGETS = [
+    ('GET', '/', None, {'reads': 2}),
+    ('GET', '/api/founders/{founder_id}', None, {'reads': 1}),
+    ('GET', '/api/founders', None, {'reads': 1}),
+    ('GET', '/api/developers/{developer_id}', None, {'reads': 1}),
+    ('GET', '/api/developers?current_id={developer_id}', None, {'reads': 2}),
+    ('POST', '/api/match', {'founder_id': '{founder_id}', 'developer_id': '{developer_id}'}, {'reads': 2}),
+    ('POST', '/api/match/batch',
+     {'pairs': [{'founder_id': '{founder_id}', 'developer_id': '{developer_id}'}] * 3}, {'reads': 1}),
+    ('GET', '/api/profiles/next?current_id={developer_id}', None, {'reads': 3}),
+    ('GET', '/api/profiles/previous?current_id={developer_id}', None, {'reads': 3}),
+    ('GET', '/api/profiles/all?founder_id={founder_id}', None, {'reads': 2}),
+    ('GET', '/api/search/developers?q=dev', None, {'reads': 1}),
+    ('GET', '/api/search/founders?q=founder', None, {'reads': 1}),
+    ('GET', '/api/matches/check?founder_id={founder_id}&developer_id={developer_id}', None, {'reads': 1}),
+    ('POST', '/api/matches/store',
+     {'founder_id': '{founder_id}', 'developer_id': '{developer_id}',
+      'match_scores': {'total_score': 50.0,
+                       'components': {'skill_score': 50.0, 'personality_score': 50.0,
+                                      'background_score': 50.0, 'cultural_score': 50.0}}},
+     {'reads': 2, 'writes': 4}),
+    ('GET', '/api/matches', None, {'reads': 6}),
+    ('PUT', '/api/matches/{match_id}/status', {'status': 'successful', 'updater_id': '{founder_id}'},
+     {'reads': 0, 'writes': 2}),
+    ('GET', '/api/matches/{match_id}/timeline', None, {'reads': 1}),
+    # Full scans: the name listing (get_partitions against Firestore) plus one query per range. The single
+    # stored match fits in one range; the users split into FOUNDERMATCHA_SCAN_PARTITIONS=8
+    ('GET', '/api/insights/metrics', None, {'reads': 2}),
+    ('GET', '/api/insights/trends', None, {'reads': 2}),
+    ('GET', '/api/all_users', None, {'reads': 9}),
+    # The match plus its two status events (store and status update above)
+    ('DELETE', '/api/matches/{match_id}', None, {'reads': 2, 'writes': 3}),
+    # The readiness probe only checks that the clients exist
+    ('GET', '/readyz', None, {'reads': 0}),
+]
+
+
+def _fill(template, ids):
+    if isinstance(template, str):
+        return template.format(**ids)
+    if isinstance(template, dict):
+        return {key: _fill(value, ids) for key, value in template.items()}
+    if isinstance(template, list):
+        return [_fill(item, ids) for item in template]
+    return template
+
+
+def check_route_budgets(flask_app, db, founder_id, developer_id, budgets=None):
+    """
+    Replay one request per budgeted route and return a list of violation messages.
+    The match created by /api/matches/store is reused for the status and delete routes.
+    """
+    client = flask_app.test_client()
+    ids = {'founder_id': founder_id, 'developer_id': developer_id, 'match_id': ''}
+    violations = []
+
+    for method, url, body, budget in budgets or ROUTE_BUDGETS:
+        label = f'{method} {url.split("?")[0]}'
+        try:
+            with read_budget(db, label=label, **budget):
+                response = client.open(_fill(url, ids), method=method, json=_fill(body, ids))
+        except ReadBudgetExceeded as e:
+            violations.append(str(e))
+            continue
+        if response.status_code >= 400:
+            violations.append(f"{label} returned HTTP {response.status_code}")
+        elif url == '/api/matches/store':
+            ids['match_id'] = response.get_json().get('match_id', '')
+    return violations
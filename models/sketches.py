@@ -0,0 +1,170 @@
+# sketches.py
+"""
+Constant-memory, mergeable summaries for streaming statistics.
+
+RunningStats keeps count, mean and variance with Welford's update (and Chan's
+formula for merging partial results), plus min and max. KLLSketch is a KLL
+quantile sketch: a stack of compactors where each level holds items of weight
+2**level, so memory stays around a few times `k` items however many values are
+added, with rank error roughly proportional to 1/k. Both serialize to plain dicts
+so partial results can be saved and merged across shards or runs.
+"""
+
+import math
+import random
+import statistics
+
+
+class RunningStats:
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other):
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            self.min, self.max = other.min, other.max
+            return self
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.count = total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    @property
+    def variance(self):
+        """Sample variance, matching statistics.variance"""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0
+
+    @property
+    def stdev(self):
+        return math.sqrt(self.variance)
+
+    def to_dict(self):
+        return {'count': self.count, 'mean': self.mean, 'm2': self.m2, 'min': self.min, 'max': self.max}
+
+    @classmethod
+    def from_dict(cls, state):
+        stats = cls()
+        stats.count, stats.mean, stats.m2 = state['count'], state['mean'], state['m2']
+        stats.min, stats.max = state['min'], state['max']
+        return stats
+
+
+class KLLSketch:
+    def __init__(self, k=200, c=2 / 3, seed=None):
+        self.k = k
+        self.c = c
+        self.compactors = [[]]
+        self._random = random.Random(seed)
+
+    def _capacity(self, level):
+        # Lower levels get geometrically smaller capacities; the top level holds k
+        depth = len(self.compactors) - level - 1
+        return int(math.ceil(self.c ** depth * self.k)) + 1
+
+    @property
+    def size(self):
+        return sum(len(compactor) for compactor in self.compactors)
+
+    @property
+    def max_size(self):
+        return sum(self._capacity(level) for level in range(len(self.compactors)))
+
+    @property
+    def count(self):
+        """Number of values summarized (total weight)"""
+        return sum(len(compactor) << level for level, compactor in enumerate(self.compactors))
+
+    @property
+    def is_exact(self):
+        """True while nothing has been compacted, so every value is still held"""
+        return len(self.compactors) == 1
+
+    def add(self, value):
+        self.compactors[0].append(value)
+        if self.size >= self.max_size:
+            self._compress()
+
+    def _compress(self):
+        while self.size >= self.max_size:
+            for level, compactor in enumerate(self.compactors):
+                if len(compactor) >= self._capacity(level):
+                    if level + 1 == len(self.compactors):
+                        self.compactors.append([])
+                    self.compactors[level + 1].extend(self._compact(compactor))
+                    break
+
+    def _compact(self, compactor):
+        """Keep every other item of the sorted compactor (random offset) at twice the weight"""
+        compactor.sort()
+        offset = self._random.randint(0, 1)
+        # An odd item out stays behind at this level
+        keep_back = compactor.pop() if len(compactor) % 2 else None
+        promoted = compactor[offset::2]
+        compactor.clear()
+        if keep_back is not None:
+            compactor.append(keep_back)
+        return promoted
+
+    def merge(self, other):
+        while len(self.compactors) < len(other.compactors):
+            self.compactors.append([])
+        for level, compactor in enumerate(other.compactors):
+            self.compactors[level].extend(compactor)
+        self._compress()
+        return self
+
+    def _weighted_items(self):
+        items = [(value, 1 << level) for level, compactor in enumerate(self.compactors) for value in compactor]
+        items.sort(key=lambda item: item[0])
+        return items
+
+    def quantile(self, q):
+        """Value at normalized rank q (0..1)"""
+        items = self._weighted_items()
+        if not items:
+            return None
+        target = q * sum(weight for _, weight in items)
+        cumulative = 0
+        for value, weight in items:
+            cumulative += weight
+            if cumulative >= target:
+                return value
+        return items[-1][0]
+
+    def quartiles(self):
+        """(q1, median, q3); identical to statistics.quantiles(n=4) while the sketch is exact"""
+        if self.is_exact and len(self.compactors[0]) > 1:
+            return tuple(statistics.quantiles(self.compactors[0], n=4))
+        return tuple(self.quantile(q) for q in (0.25, 0.5, 0.75))
+
+    def median(self):
+        if self.is_exact and self.compactors[0]:
+            return statistics.median(self.compactors[0])
+        return self.quantile(0.5)
+
+    def to_dict(self):
+        return {'k': self.k, 'c': self.c, 'compactors': [list(compactor) for compactor in self.compactors]}
+
+    @classmethod
+    def from_dict(cls, state, seed=None):
+        sketch = cls(k=state['k'], c=state['c'], seed=seed)
+        sketch.compactors = [list(compactor) for compactor in state['compactors']]
+        return sketch
@@ -0,0 +1,129 @@
+# skill_taxonomy.py
+"""
+Skills as bits, for skill matching.
+
+SkillTaxonomy gives every skill an integer ID: first the skills industries.json
+lists, then any observed on profiles, then any new skill the first time a
+developer lists it. Each industry's primary and secondary skills are stored as
+bitmasks, and a developer's skill list becomes one mask (cached per distinct
+list), so the coverage and extra-skill counts of skill scoring are an AND and a
+popcount instead of set intersections, unions and differences.
+
+EnhancedMatcher.calculate_match_scores looks up a founder's IndustryMasks once
+and then calls `score_skill_mask` for each developer in a plain loop.
+"""
+
+import threading
+from collections import namedtuple
+
+# Distinct skill lists whose masks are kept. This is not an LRU: when the cache is
+# full it is cleared completely and refilled from the next lookups
+MAX_CACHED_MASKS = 65536
+
+# Constants for scoring
+MIN_PRIMARY_COVERAGE = 0.70  # Must have 70% of primary skills
+MAX_TECH_BONUS = 0.15  # Cap the bonus for extra skills
+TECH_BONUS_PER_SKILL = 0.01  # Reduced bonus per additional skill
+MIN_SCORE = 0.30  # Minimum score if any relevant skills present
+MAX_SCORE = 0.95  # Cap to make perfect scores rare
+
+IndustryMasks = namedtuple('IndustryMasks', ['primary', 'secondary', 'required', 'primary_count',
+                                             'secondary_count'])
+
+
+class SkillTaxonomy:
+    def __init__(self, mappings, default_skills, skills=()):
+        """
+        `mappings` is {industry: {'primary': [...], 'secondary': [...]}} as in
+        industries.json, `default_skills` the primary and secondary skills used for
+        founders outside those industries, and `skills` any further known skills.
+        """
+        self._lock = threading.Lock()
+        self._masks = {}
+        self.skill_ids = {}
+        self.names = []
+
+        for industry_skills in list(mappings.values()) + [default_skills]:
+            for skill in list(industry_skills['primary']) + list(industry_skills['secondary']):
+                self.skill_id(skill)
+        for skill in skills:
+            self.skill_id(skill)
+
+        self.industries = {industry: self._industry_masks(industry_skills)
+                           for industry, industry_skills in mappings.items()}
+        self.default = self._industry_masks(default_skills)
+
+    def __getstate__(self):
+        return {'skill_ids': self.skill_ids, 'names': self.names, 'industries': self.industries,
+                'default': self.default}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        self._masks = {}
+
+    def skill_id(self, skill):
+        """The skill's ID, assigning the next one if it has none yet"""
+        skill_id = self.skill_ids.get(skill)
+        if skill_id is None:
+            with self._lock:
+                skill_id = self.skill_ids.get(skill)
+                if skill_id is None:
+                    skill_id = len(self.names)
+                    self.names.append(skill)
+                    self.skill_ids[skill] = skill_id
+        return skill_id
+
+    def mask(self, skills):
+        """Bitmask of a skill list, cached per distinct list"""
+        key = tuple(skills)
+        mask = self._masks.get(key)
+        if mask is None:
+            mask = 0
+            for skill in key:
+                mask |= 1 << self.skill_id(skill)
+            if len(self._masks) >= MAX_CACHED_MASKS:
+                self._masks.clear()
+            self._masks[key] = mask
+        return mask
+
+    def industry_masks(self, industry):
+        """IndustryMasks for an industry, or the defaults for an unknown one"""
+        return self.industries.get(industry, self.default)
+
+    def _industry_masks(self, industry_skills):
+        primary = self.mask(industry_skills['primary'])
+        secondary = self.mask(industry_skills['secondary'])
+        return IndustryMasks(primary, secondary, primary | secondary, primary.bit_count(), secondary.bit_count())
+
+
+def score_skill_mask(dev_mask, industry, skill_weights):
+    """
+    Skill match in [0, 0.95] of a developer's skill mask against IndustryMasks,
+    with `skill_weights` {'primary', 'secondary'} weighting the two coverages
+    """
+    if not dev_mask:
+        return 0.0
+
+    primary_matches = (dev_mask & industry.primary).bit_count()
+    secondary_matches = (dev_mask & industry.secondary).bit_count()
+
+    primary_coverage = primary_matches / industry.primary_count if industry.primary_count else 0
+    secondary_coverage = secondary_matches / industry.secondary_count if industry.secondary_count else 0
+
+    # Calculate base score with weighted coverage
+    base_score = primary_coverage * skill_weights['primary'] + secondary_coverage * skill_weights['secondary']
+
+    # Apply minimum threshold penalty for primary skills
+    if primary_coverage < MIN_PRIMARY_COVERAGE:
+        base_score *= 0.5
+
+    # Calculate tech bonus with diminishing returns: skills outside both lists
+    tech_skills = (dev_mask & ~industry.required).bit_count()
+    final_score = base_score + min(tech_skills * TECH_BONUS_PER_SKILL, MAX_TECH_BONUS)
+
+    # Apply minimum score if there's any relevant skill match
+    if primary_matches or secondary_matches:
+        final_score = max(MIN_SCORE, final_score)
+
+    return min(MAX_SCORE, final_score)
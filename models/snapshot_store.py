@@ -0,0 +1,112 @@
+# snapshot_store.py
+"""
+Content-addressed store for the profile snapshots attached to matches.
+
+A snapshot is written once to `profile_snapshots/{sha256}`, where the hash is taken
+over its canonical JSON, and match documents keep only the hash under
+`snapshot_refs`. An unchanged profile therefore costs one document no matter how
+many matches it takes part in. Snapshots are immutable, so resolved ones are
+cached in-process and readers resolve many hashes with a single get_all.
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+SNAPSHOTS_COLLECTION = 'profile_snapshots'
+
+# Firestore caps the number of documents in one batched get
+GET_ALL_CHUNK_SIZE = 300
+
+
+def snapshot_hash(snapshot):
+    """sha256 of the snapshot's canonical JSON (sorted keys, no whitespace)"""
+    canonical = json.dumps(snapshot, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class SnapshotStore:
+    def __init__(self, db, cache_size=4096):
+        self.db = db
+        self.collection = db.collection(SNAPSHOTS_COLLECTION)
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _remember(self, digest, snapshot):
+        with self._lock:
+            self._cache[digest] = snapshot
+            self._cache.move_to_end(digest)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _cached(self, digest):
+        with self._lock:
+            snapshot = self._cache.get(digest)
+            if snapshot is not None:
+                self._cache.move_to_end(digest)
+            return snapshot
+
+    def put(self, snapshot, batch=None):
+        """
+        Store a snapshot and return its hash. Writing the same content again is a no-op
+        for the data, and is skipped entirely when this process has already stored it.
+
+        Pass `batch` to stage the write with the match that references it; call
+        `committed` once the batch has been committed so later puts can skip it.
+        """
+        digest = snapshot_hash(snapshot)
+        if self._cached(digest) is None:
+            ref = self.collection.document(digest)
+            if batch is not None:
+                batch.set(ref, snapshot)
+            else:
+                ref.set(snapshot)
+                self._remember(digest, snapshot)
+        return digest
+
+    def committed(self, *snapshots):
+        for snapshot in snapshots:
+            self._remember(snapshot_hash(snapshot), snapshot)
+
+    def get_many(self, digests):
+        """Resolve hashes to snapshots with batched reads; unknown hashes are left out"""
+        resolved, missing = {}, []
+        for digest in dict.fromkeys(d for d in digests if d):
+            snapshot = self._cached(digest)
+            if snapshot is not None:
+                resolved[digest] = snapshot
+            else:
+                missing.append(digest)
+
+        for start in range(0, len(missing), GET_ALL_CHUNK_SIZE):
+            refs = [self.collection.document(digest) for digest in missing[start:start + GET_ALL_CHUNK_SIZE]]
+            for doc in self.db.get_all(refs):
+                if doc.exists:
+                    snapshot = doc.to_dict()
+                    self._remember(doc.id, snapshot)
+                    resolved[doc.id] = snapshot
+        return resolved
+
+    def resolve_matches(self, matches, target='profile_snapshots', fields=None):
+        """
+        Rehydrate match dicts in place: `snapshot_refs` hashes become full snapshots under
+        `target`, optionally trimmed to `fields`. Matches that still embed their
+        snapshots are left as they are.
+        """
+        refs = [match.get('snapshot_refs') or {} for match in matches]
+        snapshots = self.get_many(digest for match_refs in refs for digest in match_refs.values())
+        for match, match_refs in zip(matches, refs):
+            if not match_refs:
+                continue
+            rehydrated = {}
+            for role, digest in match_refs.items():
+                snapshot = snapshots.get(digest, {})
+                if fields is not None:
+                    rehydrated[role] = {field: snapshot.get(field) for field in fields}
+                else:
+                    # Copy so callers cannot modify the cached snapshot
+                    rehydrated[role] = dict(snapshot)
+            match[target] = rehydrated
+        return matches
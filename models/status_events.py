@@ -0,0 +1,165 @@
+# status_events.py
+"""
+Append-only log of match status transitions.
+
+Each transition is its own document in `match_status_events`, written in the same
+batch as the match update, so match documents only carry the current status and
+when it last changed instead of an ever-growing history array. Timeline queries
+(dashboards, ML labelling) read the log directly.
+
+Every writer stores `timestamp` as a datetime: Firestore orders strings and
+timestamps as different types, so mixing them breaks ordering and the
+since/until bounds of timeline queries.
+"""
+
+import datetime
+
+from models.batch_writer import MAX_BATCH_SIZE, BatchWriter, WriteOp
+from models.bulk_update import BulkUpdater
+from models.collection_scan import scan_collection
+
+STATUS_EVENTS_COLLECTION = 'match_status_events'
+
+
+def status_event(match_id, status, timestamp, updated_by=None):
+    if not isinstance(timestamp, datetime.datetime):
+        raise TypeError(f"Status event timestamps must be datetimes, not {type(timestamp).__name__}")
+    return {
+        'match_id': match_id,
+        'status': status,
+        'timestamp': timestamp,
+        'updated_by': updated_by
+    }
+
+
+def record_status_event(db, batch, match_id, status, timestamp, updated_by=None):
+    """Stage a status event in `batch` and return its document reference"""
+    event_ref = db.collection(STATUS_EVENTS_COLLECTION).document()
+    batch.set(event_ref, status_event(match_id, status, timestamp, updated_by))
+    return event_ref
+
+
+def backfill_event_timestamps(db, batch_size=500, max_concurrency=4, checkpoint_path=None):
+    """
+    Convert events whose timestamp was stored as an ISO string (by older versions of
+    app.py) to datetimes. Returns the BulkUpdater summary plus 'skipped', the events
+    whose string could not be parsed.
+    """
+    events_ref = db.collection(STATUS_EVENTS_COLLECTION)
+    operations, skipped = [], 0
+    for doc in scan_collection(db, STATUS_EVENTS_COLLECTION, select=['timestamp']):
+        timestamp = doc.to_dict().get('timestamp')
+        if not isinstance(timestamp, str):
+            continue
+        try:
+            parsed = datetime.datetime.fromisoformat(timestamp)
+        except ValueError:
+            skipped += 1
+            continue
+        operations.append(WriteOp(doc.id, 'update', events_ref.document(doc.id), {'timestamp': parsed}))
+
+    summary = BulkUpdater(db, batch_size=batch_size, max_concurrency=max_concurrency,
+                          checkpoint_path=checkpoint_path).run(operations)
+    summary['skipped'] = skipped
+    return summary
+
+
+def _history_timestamp(value):
+    if isinstance(value, str):
+        try:
+            return datetime.datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    return value if isinstance(value, datetime.datetime) else None
+
+
+def backfill_status_history(db, batch_size=500, max_concurrency=4, checkpoint_path=None):
+    """
+    Copy the status history arrays that matches carried before this log existed
+    (`status_history` from app.py, `status.history` from MatchCollector) into
+    match_status_events, one event per entry, then remove the arrays. Events get
+    IDs derived from the match and the entry's position, so a rerun overwrites
+    rather than duplicates them, and an array is only removed once all of its
+    events are written. Matches with an entry whose timestamp cannot be parsed are
+    left unchanged. Returns the BulkUpdater summary of the array removals plus
+    'events' (events written) and 'skipped'.
+    """
+    from google.cloud.firestore import DELETE_FIELD
+
+    events_ref = db.collection(STATUS_EVENTS_COLLECTION)
+    matches_ref = db.collection('matches')
+    event_ops, removals, skipped = [], {}, 0
+    for doc in scan_collection(db, 'matches', select=['status_history', 'status.history']):
+        match = doc.to_dict()
+        status = match.get('status')
+        for field, history in (('status_history', match.get('status_history')),
+                               ('status.history', status.get('history') if isinstance(status, dict) else None)):
+            if history is None:
+                continue
+            timestamps = [_history_timestamp(entry.get('timestamp')) for entry in history]
+            if None in timestamps:
+                skipped += 1
+                continue
+            for index, (entry, timestamp) in enumerate(zip(history, timestamps)):
+                event_id = f"{doc.id}-{field.replace('.', '-')}-{index}"
+                event_ops.append(WriteOp(doc.id, 'set', events_ref.document(event_id),
+                                         status_event(doc.id, entry.get('status'), timestamp,
+                                                      entry.get('updated_by'))))
+            removals.setdefault(doc.id, {})[field] = DELETE_FIELD
+
+    writer = BatchWriter(db, batch_size=batch_size, max_concurrency=max_concurrency)
+    failed = set()
+    for result in writer.write(event_ops):
+        if not result['success']:
+            failed.add(result['key'])
+    operations = [WriteOp(match_id, 'update', matches_ref.document(match_id), update)
+                  for match_id, update in removals.items() if match_id not in failed]
+
+    summary = BulkUpdater(db, batch_size=batch_size, max_concurrency=max_concurrency,
+                          checkpoint_path=checkpoint_path).run(operations)
+    summary['events'] = len(event_ops) - sum(1 for op in event_ops if op.key in failed)
+    summary['failed'] += len(failed)
+    summary['skipped'] = skipped
+    return summary
+
+
+def delete_status_events(db, batch, match_id, batch_size=MAX_BATCH_SIZE):
+    """
+    Delete a match's events, so a later match for the same pair, which gets the same
+    ID, starts with an empty timeline. Up to `batch_size - 1` events are staged in
+    `batch` next to the match delete, so most matches go in one commit; any others
+    are deleted first through BatchWriter, keeping `batch` within Firestore's
+    500-write limit. Raises RuntimeError, before anything is staged, if one of those
+    deletes fails. Returns how many events there were.
+    """
+    events = db.collection(STATUS_EVENTS_COLLECTION).where('match_id', '==', match_id).select(['match_id'])
+    refs = [event.reference for event in events.stream()]
+    staged, earlier = refs[:batch_size - 1], refs[batch_size - 1:]
+    if earlier:
+        results = BatchWriter(db, batch_size=batch_size).write(WriteOp(ref.id, 'delete', ref, None)
+                                                                for ref in earlier)
+        failed = [result for result in results if not result['success']]
+        if failed:
+            raise RuntimeError(f"Failed to delete {len(failed)} status events of match {match_id}: "
+                               f"{failed[0]['error']}")
+    for ref in staged:
+        batch.delete(ref)
+    return len(refs)
+
+
+def get_status_timeline(db, match_id=None, since=None, until=None, limit=None):
+    """
+    Status events in chronological order, for one match or (without match_id)
+    across all matches, optionally bounded by timestamp [since, until).
+    """
+    query = db.collection(STATUS_EVENTS_COLLECTION)
+    if match_id is not None:
+        query = query.where('match_id', '==', match_id)
+    if since is not None:
+        query = query.where('timestamp', '>=', since)
+    if until is not None:
+        query = query.where('timestamp', '<', until)
+    query = query.order_by('timestamp')
+    if limit is not None:
+        query = query.limit(limit)
+    return [dict(doc.to_dict(), id=doc.id) for doc in query.stream()]
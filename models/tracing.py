@@ -0,0 +1,217 @@
+# tracing.py
+"""
+Lightweight request tracing with nested spans and a slow-request log.
+
+Each Flask request opens a root span; Firestore reads and writes, EnhancedMatcher
+components and JSON serialization open child spans underneath it. Finished
+request traces go to an exporter (in-memory ring buffer by default, or a JSON
+lines file), and any request slower than the threshold has its span tree
+written to the slow-request log.
+
+Configuration via environment variables:
+    FOUNDERMATCHA_TRACE_FILE       write traces as JSON lines to this file
+    FOUNDERMATCHA_SLOW_REQUEST_MS  slow-request threshold in milliseconds (default 500)
+    FOUNDERMATCHA_SLOW_LOG         slow-request log file (default slow_requests.log)
+"""
+
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+
+logger = logging.getLogger(__name__)
+
+
+class Span:
+    def __init__(self, name, parent=None, attributes=None):
+        self.name = name
+        self.parent = parent
+        self.attributes = attributes or {}
+        self.children = []
+        self.start = time.perf_counter()
+        self.start_wall = time.time()
+        self.end = None
+        # Set on a request's root span once its response is built and waiting to be closed
+        self.closing = False
+        if parent is not None:
+            parent.children.append(self)
+
+    @property
+    def duration(self):
+        end = self.end if self.end is not None else time.perf_counter()
+        return end - self.start
+
+    def finish(self):
+        if self.end is None:
+            self.end = time.perf_counter()
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'start': self.start_wall,
+            'duration_ms': round(self.duration * 1000, 3),
+            'attributes': self.attributes,
+            'children': [child.to_dict() for child in self.children],
+        }
+
+    def format_tree(self, indent=0):
+        attributes = ' '.join(f'{key}={value}' for key, value in self.attributes.items())
+        lines = [f"{'  ' * indent}{self.name} {self.duration * 1000:.2f}ms {attributes}".rstrip()]
+        for child in self.children:
+            lines.extend(child.format_tree(indent + 1))
+        return lines
+
+
+class InMemoryExporter:
+    """Keeps the most recent traces in a ring buffer"""
+
+    def __init__(self, max_traces=200):
+        self.traces = deque(maxlen=max_traces)
+        self._lock = threading.Lock()
+
+    def export(self, span):
+        with self._lock:
+            self.traces.append(span.to_dict())
+
+
+class FileExporter:
+    """Appends one JSON document per trace to a local file"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, span):
+        line = json.dumps(span.to_dict(), default=str)
+        with self._lock:
+            with open(self.path, 'a') as f:
+                f.write(line + '\n')
+
+
+class Tracer:
+    def __init__(self, exporter=None, slow_threshold=0.5, slow_logger=None):
+        self.exporter = exporter or InMemoryExporter()
+        self.slow_threshold = slow_threshold
+        self.slow_logger = slow_logger or logging.getLogger('foundermatcha.slow_requests')
+        # A context variable, so scan workers running in a copy of the request's context see its span
+        self._span = contextvars.ContextVar('span', default=None)
+
+    @classmethod
+    def from_env(cls):
+        trace_file = os.environ.get('FOUNDERMATCHA_TRACE_FILE')
+        exporter = FileExporter(trace_file) if trace_file else InMemoryExporter()
+        slow_threshold = float(os.environ.get('FOUNDERMATCHA_SLOW_REQUEST_MS', '500')) / 1000.0
+
+        slow_logger = logging.getLogger('foundermatcha.slow_requests')
+        if not slow_logger.handlers:
+            handler = logging.FileHandler(os.environ.get('FOUNDERMATCHA_SLOW_LOG', 'slow_requests.log'), delay=True)
+            handler.setFormatter(logging.Formatter('%(asctime)s - %(message)s'))
+            slow_logger.addHandler(handler)
+            slow_logger.setLevel(logging.WARNING)
+        return cls(exporter, slow_threshold, slow_logger)
+
+    def current(self):
+        return self._span.get()
+
+    def start_span(self, name, activate=True, **attributes):
+        """
+        Open a span under the current one. Inactive spans are recorded in the tree
+        but do not become the parent of spans opened later (used for lazy streams).
+        """
+        parent = self.current()
+        if parent is None and name != 'request':
+            # Outside a traced request there is no tree to attach to
+            return None
+        span = Span(name, parent, attributes)
+        if activate:
+            self._span.set(span)
+        return span
+
+    def end_span(self, span):
+        if span is None:
+            return
+        span.finish()
+        if self.current() is span:
+            self._span.set(span.parent)
+
+    @contextmanager
+    def span(self, name, **attributes):
+        span = self.start_span(name, **attributes)
+        try:
+            yield span
+        finally:
+            self.end_span(span)
+
+    def traced(self, name):
+        """Decorator form of span()"""
+        def decorator(f):
+            @wraps(f)
+            def wrapper(*args, **kwargs):
+                with self.span(name):
+                    return f(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def _root(self):
+        root = self.current()
+        while root is not None and root.parent is not None:
+            root = root.parent
+        return root
+
+    def finish_request(self, status_code, root=None):
+        root = root or self._root()
+        if root is None:
+            return
+        root.set(status=status_code)
+        root.finish()
+        if self._root() is root:
+            self._span.set(None)
+        try:
+            self.exporter.export(root)
+        except Exception as e:
+            logger.error(f"Failed to export trace: {e}")
+        if root.duration >= self.slow_threshold:
+            self.slow_logger.warning("Slow request (%.1fms)\n%s", root.duration * 1000,
+                                     '\n'.join(root.format_tree()))
+
+    def init_app(self, app):
+        """Open a root span per request and trace JSON serialization"""
+        from flask import request
+
+        @app.before_request
+        def _start_request_span():
+            route = request.url_rule.rule if request.url_rule else 'unmatched'
+            self._span.set(None)
+            self.start_span('request', route=route, method=request.method, path=request.path)
+
+        @app.after_request
+        def _finish_request_span(response):
+            # Finished when the response is closed, so streamed bodies stay in the trace
+            root = self._root()
+            if root is not None:
+                root.closing = True
+                status_code = response.status_code
+                response.call_on_close(lambda: self.finish_request(status_code, root))
+            return response
+
+        @app.teardown_request
+        def _abandon_request_span(error=None):
+            root = self._root()
+            if root is not None and not root.closing:
+                self.finish_request(500)
+
+        # Flask >= 2.2 routes jsonify through app.json
+        json_provider = getattr(app, 'json', None)
+        if json_provider is not None and hasattr(json_provider, 'response'):
+            json_provider.response = self.traced('json.serialize')(json_provider.response)
+
+
+tracer = Tracer.from_env()
@@ -0,0 +1,109 @@
+# user_snapshot.py
+"""
+On-disk snapshot of `hackathonusers` for admin tools.
+
+`snapshot_client` serves read-only commands from a JSON copy of the collection
+while it is younger than `max_age` seconds, loaded into the in-memory
+FakeFirestore so the usual query code runs unchanged. When the file is missing or
+stale the collection is scanned once and the snapshot rewritten. Timestamps,
+bytes, geopoints and document references are stored tagged so they come back as
+the same types (references point into the snapshot's client); any other value
+JSON cannot hold raises TypeError rather than coming back as a string.
+"""
+
+import base64
+import json
+import logging
+import os
+import time
+from collections import namedtuple
+from datetime import datetime
+
+from models.collection_scan import scan_collection
+from models.fake_firestore import FakeDocumentReference, FakeFirestore
+
+try:
+    from google.cloud.firestore_v1 import DocumentReference, GeoPoint
+except ImportError:
+    DocumentReference = FakeDocumentReference
+    GeoPoint = namedtuple('GeoPoint', ['latitude', 'longitude'])
+
+logger = logging.getLogger(__name__)
+
+USERS_COLLECTION = 'hackathonusers'
+DEFAULT_MAX_AGE = 3600
+
+
+def _encode(value):
+    if isinstance(value, datetime):
+        return {'__datetime__': value.isoformat()}
+    if isinstance(value, bytes):
+        return {'__bytes__': base64.b64encode(value).decode('ascii')}
+    if isinstance(value, GeoPoint):
+        return {'__geopoint__': [value.latitude, value.longitude]}
+    if isinstance(value, (DocumentReference, FakeDocumentReference)):
+        return {'__reference__': value.path}
+    raise TypeError(f"Cannot store a {type(value).__name__} in a user snapshot")
+
+
+def _decoder(db):
+    def decode(obj):
+        if len(obj) != 1:
+            return obj
+        if '__datetime__' in obj:
+            return datetime.fromisoformat(obj['__datetime__'])
+        if '__bytes__' in obj:
+            return base64.b64decode(obj['__bytes__'])
+        if '__geopoint__' in obj:
+            return GeoPoint(*obj['__geopoint__'])
+        if '__reference__' in obj:
+            collection_path, document_id = obj['__reference__'].rsplit('/', 1)
+            return FakeDocumentReference(db, collection_path, document_id)
+        return obj
+    return decode
+
+
+def save_snapshot(path, documents):
+    tmp_path = f'{path}.tmp'
+    try:
+        with open(tmp_path, 'w') as f:
+            json.dump({'saved_at': time.time(), 'collection': USERS_COLLECTION, 'documents': documents}, f,
+                      default=_encode)
+    except TypeError:
+        os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, path)
+
+
+def load_snapshot(path, max_age=DEFAULT_MAX_AGE, db=None):
+    """
+    Documents from the snapshot at `path`, or None if it is missing or older than
+    max_age seconds. Document references are bound to `db`.
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        snapshot = json.load(f, object_hook=_decoder(db))
+    age = time.time() - snapshot['saved_at']
+    if age > max_age:
+        logger.info(f"User snapshot {path} is {age:.0f}s old (max {max_age}s), refreshing")
+        return None
+    logger.info(f"Using user snapshot {path} ({len(snapshot['documents'])} users, {age:.0f}s old)")
+    return snapshot['documents']
+
+
+def snapshot_client(get_db, path, max_age=DEFAULT_MAX_AGE, refresh=False):
+    """
+    A FakeFirestore holding `hackathonusers` from the snapshot at `path`. `get_db` is
+    only called (and the collection only read) when the snapshot has to be rebuilt.
+    """
+    db = FakeFirestore()
+    documents = None if refresh else load_snapshot(path, max_age, db)
+    if documents is None:
+        documents = {doc.id: doc.to_dict() for doc in scan_collection(get_db(), USERS_COLLECTION, ordered=True)}
+        save_snapshot(path, documents)
+        logger.info(f"Saved {len(documents)} users to {path}")
+        # Read it back so the values match what later runs get from the file
+        documents = load_snapshot(path, float('inf'), db)
+    db.load(USERS_COLLECTION, documents)
+    return db
@@ -435,6 +435,13 @@ async function handleMatchClick() {
             })
         });
 
+        if (matchResponse.status === 409) {
+            // Another request matched this pair first
+            showErrorNotification('This founder and developer are already matched');
+            resetMatchButton();
+            return;
+        }
+
         if (!matchResponse.ok) {
             throw new Error(`HTTP error! status: ${matchResponse.status}`);
         }
@@ -966,6 +973,7 @@ function generateMatchRow(match, index) {
                     </div>
                     <div>
                         <h3 class="text-lg font-semibold mb-2">ML Features</h3>
+                        ${match.ml_features ? `
                         <div class="space-y-2">
                             <div>
                                 <p class="text-sm font-medium text-gray-500">Location Match</p>
@@ -980,6 +988,7 @@ function generateMatchRow(match, index) {
                                 <p class="mt-1">${(match.ml_features.experience_level_match * 100).toFixed(1)}%</p>
                             </div>
                         </div>
+                        ` : '<p class="text-sm text-gray-500">Features are still being computed</p>'}
                     </div>
                 </div>
             </td>
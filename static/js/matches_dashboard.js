@@ -52,19 +52,69 @@ window.toggleMatchDetails = function(index) {
     expandBtn.style.transform = detailsRow.classList.contains('hidden') ? '' : 'rotate(90deg)';
 };
 
-async function loadMatchesDashboard() {
+// Cursor for the next (older) page of matches, or null when everything is loaded
+let nextMatchesCursor = null;
+
+function buildMatchesQuery(cursor) {
+    const params = new URLSearchParams();
+    const status = document.getElementById('status-filter')?.value || 'all';
+    const dateRange = document.getElementById('date-filter')?.value || 'all';
+    const scoreRange = document.getElementById('score-filter')?.value || 'all';
+
+    if (status !== 'all') params.set('status', status);
+
+    // created_at is stored as a UTC ISO string without a timezone suffix
+    const since = new Date();
+    switch (dateRange) {
+        case 'today':
+            since.setHours(0, 0, 0, 0);
+            break;
+        case 'week':
+            since.setDate(since.getDate() - 7);
+            break;
+        case 'month':
+            since.setMonth(since.getMonth() - 1);
+            break;
+        case 'quarter':
+            since.setMonth(since.getMonth() - 3);
+            break;
+    }
+    if (dateRange !== 'all') params.set('created_after', since.toISOString().replace('Z', ''));
+
+    switch (scoreRange) {
+        case 'high':
+            params.set('min_score', 80);
+            break;
+        case 'medium':
+            params.set('min_score', 50);
+            params.set('max_score', 80);
+            break;
+        case 'low':
+            params.set('max_score', 50);
+            break;
+    }
+
+    if (cursor) params.set('cursor', cursor);
+    return params.toString();
+}
+
+async function loadMatchesDashboard(cursor = null) {
     console.log('Loading matches dashboard...');
     try {
-        const response = await fetch('/api/matches');
+        const response = await fetch(`/api/matches?${buildMatchesQuery(cursor)}`);
         if (!response.ok) {
             throw new Error(`HTTP error! status: ${response.status}`);
         }
         const matchData = await response.json();
 
-        // Update stats
-        updateDashboardStats(matchData.stats);
-        // Update table
-        updateDashboardTable(matchData.matches);
+        // Stats are only returned with the first page
+        if (matchData.stats) updateDashboardStats(matchData.stats);
+        // Update table, appending older pages below the rows already shown
+        updateDashboardTable(matchData.matches, Boolean(cursor));
+
+        nextMatchesCursor = matchData.next_cursor;
+        const loadMoreButton = document.getElementById('load-more-matches');
+        if (loadMoreButton) loadMoreButton.classList.toggle('hidden', !nextMatchesCursor);
 
         console.log('Dashboard loaded successfully');
     } catch (error) {
@@ -73,6 +123,10 @@ async function loadMatchesDashboard() {
     }
 }
 
+function loadMoreMatches() {
+    if (nextMatchesCursor) loadMatchesDashboard(nextMatchesCursor);
+}
+
 function updateDashboardStats(stats) {
     const statsElements = {
         'total-matches': stats.total,
@@ -87,11 +141,15 @@ function updateDashboardStats(stats) {
     });
 }
 
-function updateDashboardTable(matches) {
+function updateDashboardTable(matches, append = false) {
     const tableBody = document.getElementById('matches-table-body');
     if (!tableBody) return;
 
-    tableBody.innerHTML = matches.map((match, index) => `
+    // Keep row indices unique across appended pages
+    const offset = append ? tableBody.querySelectorAll('tr[id^="row-"]').length : 0;
+    const rows = matches.map((match, i) => {
+        const index = offset + i;
+        return `
         <tr id="row-${index}" class="hover:bg-gray-50">
             <td class="px-4 py-4">
                 <button class="transform transition-transform duration-200 w-6 h-6 flex items-center justify-center text-gray-500" 
@@ -143,7 +201,14 @@ function updateDashboardTable(matches) {
             </td>
         </tr>
         ${generateDetailsRow(match, index)}
-    `).join('');
+    `;
+    }).join('');
+
+    if (append) {
+        tableBody.insertAdjacentHTML('beforeend', rows);
+    } else {
+        tableBody.innerHTML = rows;
+    }
 }
 
 function handleDashboardError(error) {
@@ -347,6 +412,7 @@ function generateDetailsRow(match, index) {
                 <!-- ML Features Section -->
                 <div class="mt-6">
                     <h3 class="text-lg font-semibold mb-3 text-gray-800">ML Features</h3>
+                    ${match.ml_features ? `
                     <div class="grid grid-cols-4 gap-4">
                         <div class="bg-white rounded-lg p-4 shadow-sm">
                             <p class="text-sm font-medium text-gray-500">Location Match</p>
@@ -379,6 +445,11 @@ function generateDetailsRow(match, index) {
                             </div>
                         </div>
                     </div>
+                    ` : `
+                    <p class="text-sm text-gray-500">
+                        ${match.ml_features_status === 'failed' ? 'Features could not be computed' : 'Features are still being computed'}
+                    </p>
+                    `}
                 </div>
             </td>
         </tr>
@@ -426,17 +497,14 @@ document.addEventListener('DOMContentLoaded', function() {
     const dateFilter = document.getElementById('date-filter');
     const scoreFilter = document.getElementById('score-filter');
 
-    // Add event listeners
+    // Status, date and score are filtered server-side; name search filters the loaded rows
     searchInput.addEventListener('input', debounce(filterMatches, 300));
-    statusFilter.addEventListener('change', filterMatches);
-    dateFilter.addEventListener('change', filterMatches);
-    scoreFilter.addEventListener('change', filterMatches);
+    statusFilter.addEventListener('change', () => loadMatchesDashboard());
+    dateFilter.addEventListener('change', () => loadMatchesDashboard());
+    scoreFilter.addEventListener('change', () => loadMatchesDashboard());
 
     function filterMatches() {
         const searchTerm = searchInput.value.toLowerCase();
-        const status = statusFilter.value;
-        const dateRange = dateFilter.value;
-        const scoreRange = scoreFilter.value;
 
         // Get all main rows (excluding detail rows)
         const mainRows = document.querySelectorAll('#matches-table-body tr[id^="row-"]');
@@ -453,58 +521,6 @@ document.addEventListener('DOMContentLoaded', function() {
                 showRow = false;
             }
 
-            // Status filter
-            if (status !== 'all') {
-                const statusSpan = row.querySelector('td:nth-child(6) span');
-                const matchStatus = statusSpan.textContent.trim().toLowerCase();
-                if (matchStatus !== status) {
-                    showRow = false;
-                }
-            }
-
-            // Date filter
-            if (dateRange !== 'all') {
-                const dateCell = row.querySelector('td:nth-child(2)').textContent;
-                const matchDate = new Date(dateCell);
-                const today = new Date();
-
-                switch(dateRange) {
-                    case 'today':
-                        if (matchDate.toDateString() !== today.toDateString()) showRow = false;
-                        break;
-                    case 'week':
-                        const weekAgo = new Date(today.setDate(today.getDate() - 7));
-                        if (matchDate < weekAgo) showRow = false;
-                        break;
-                    case 'month':
-                        const monthAgo = new Date(today.setMonth(today.getMonth() - 1));
-                        if (matchDate < monthAgo) showRow = false;
-                        break;
-                    case 'quarter':
-                        const quarterAgo = new Date(today.setMonth(today.getMonth() - 3));
-                        if (matchDate < quarterAgo) showRow = false;
-                        break;
-                }
-            }
-
-            // Score filter
-            if (scoreRange !== 'all') {
-                const scoreText = row.querySelector('td:nth-child(5) span').textContent;
-                const score = parseFloat(scoreText);
-
-                switch(scoreRange) {
-                    case 'high':
-                        if (score < 80) showRow = false;
-                        break;
-                    case 'medium':
-                        if (score < 50 || score >= 80) showRow = false;
-                        break;
-                    case 'low':
-                        if (score >= 50) showRow = false;
-                        break;
-                }
-            }
-
             // Show/hide main row
             if (showRow) {
                 row.classList.remove('hidden');
@@ -604,5 +620,5 @@ document.head.appendChild(style);
 
 // Initialize only on matches dashboard page
 if (window.location.pathname === '/matches_dashboard') {
-    document.addEventListener('DOMContentLoaded', loadMatchesDashboard);
+    document.addEventListener('DOMContentLoaded', () => loadMatchesDashboard());
 }
\ No newline at end of file
@@ -0,0 +1,19 @@
+# test_app_import.py
+"""Importing the app factory must not load the Firebase SDK"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+pytest.importorskip('flask')
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_import_app_does_not_load_firebase():
+    code = ("import sys, app; "
+            "print(sorted(m for m in sys.modules if m.startswith(('firebase_admin', 'google.cloud.firestore'))))")
+    output = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert output.stdout.strip() == '[]'
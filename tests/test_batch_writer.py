@@ -0,0 +1,49 @@
+# test_batch_writer.py
+"""Batched writes against FakeFirestore, including the per-item fallback when a batch is rejected"""
+
+import pytest
+
+pytest.importorskip('google.api_core')
+
+from models.batch_writer import BatchWriter, WriteOp  # noqa: E402
+from models.fake_firestore import FakeFirestore  # noqa: E402
+
+
+@pytest.fixture
+def db():
+    db = FakeFirestore()
+    db.load('users', {'existing': {'name': 'Existing'}})
+    return db
+
+
+def test_clean_batches_write_every_chunk(db):
+    users = db.collection('users')
+    ops = [WriteOp(f'user{i}', 'set', users.document(f'user{i}'), {'n': i}) for i in range(7)]
+
+    db.stats.reset()
+    results = BatchWriter(db, batch_size=3).write(ops)
+
+    assert [result['key'] for result in results] == [op.key for op in ops]
+    assert all(result['success'] for result in results)
+    assert db.stats.totals()['writes'] == 7
+    assert db.dump('users')['user6'] == {'n': 6}
+
+
+def test_rejected_batch_falls_back_to_single_writes(db):
+    users = db.collection('users')
+    ops = [
+        WriteOp('new', 'create', users.document('new'), {'name': 'New'}),
+        WriteOp('duplicate', 'create', users.document('existing'), {'name': 'Duplicate'}),
+        WriteOp('missing', 'update', users.document('missing'), {'name': 'Missing'}),
+        WriteOp('renamed', 'update', users.document('existing'), {'name': 'Renamed'}),
+    ]
+
+    results = BatchWriter(db).write(ops)
+
+    assert results == [
+        {'key': 'new', 'success': True},
+        {'key': 'duplicate', 'success': False, 'error': 'Document already exists'},
+        {'key': 'missing', 'success': False, 'error': 'Document not found'},
+        {'key': 'renamed', 'success': True},
+    ]
+    assert db.dump('users') == {'existing': {'name': 'Renamed'}, 'new': {'name': 'New'}}
@@ -0,0 +1,54 @@
+# test_bulk_update.py
+"""Resumable bulk updates: checkpointed IDs are skipped on rerun and the checkpoint is cleared on success"""
+
+import pytest
+
+pytest.importorskip('google.api_core')
+
+from models.batch_writer import WriteOp  # noqa: E402
+from models.bulk_update import BulkUpdater  # noqa: E402
+from models.fake_firestore import FakeFirestore  # noqa: E402
+
+USER_IDS = [f'user{i:02d}' for i in range(25)]
+
+
+def update_ops(db):
+    users = db.collection('hackathonusers')
+    return (WriteOp(user_id, 'update', users.document(user_id), {'migrated': True}) for user_id in USER_IDS)
+
+
+@pytest.fixture
+def db():
+    db = FakeFirestore()
+    db.load('hackathonusers', {user_id: {'name': user_id} for user_id in USER_IDS if user_id != 'user07'})
+    return db
+
+
+def test_failed_run_keeps_checkpoint_and_rerun_resumes(db, tmp_path):
+    checkpoint = tmp_path / 'users.checkpoint'
+    summary = BulkUpdater(db, batch_size=4, max_concurrency=2, checkpoint_path=str(checkpoint)).run(update_ops(db))
+
+    assert (summary['total'], summary['written'], summary['resumed'], summary['failed']) == (25, 24, 0, 1)
+    assert summary['failures'] == [('user07', 'Document not found')]
+    assert set(checkpoint.read_text().split()) == set(USER_IDS) - {'user07'}
+
+    # Fix the missing document and rerun: only it is written, and the checkpoint goes away
+    db.load('hackathonusers', {'user07': {'name': 'user07'}})
+    db.stats.reset()
+    summary = BulkUpdater(db, batch_size=4, max_concurrency=2, checkpoint_path=str(checkpoint)).run(update_ops(db))
+
+    assert (summary['total'], summary['written'], summary['resumed'], summary['failed']) == (25, 1, 24, 0)
+    assert db.stats.totals()['writes'] == 1
+    assert not checkpoint.exists()
+    assert all(doc['migrated'] for doc in db.dump('hackathonusers').values())
+
+
+def test_preexisting_checkpoint_skips_listed_ids(db, tmp_path):
+    checkpoint = tmp_path / 'users.checkpoint'
+    checkpoint.write_text('user00\nuser01\n\n')
+    summary = BulkUpdater(db, checkpoint_path=str(checkpoint)).run(
+        op for op in update_ops(db) if op.key != 'user07')
+
+    assert (summary['written'], summary['resumed']) == (22, 2)
+    assert 'migrated' not in db.dump('hackathonusers')['user00']
+    assert not checkpoint.exists()
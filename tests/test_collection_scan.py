@@ -0,0 +1,46 @@
+# test_collection_scan.py
+"""Partitioned collection scans against FakeFirestore (document-name range fallback)"""
+
+from models.collection_scan import partition_queries, scan_collection
+from models.fake_firestore import FakeFirestore
+
+DOCS = {f'user{i:03d}': {'name': f'User {i}', 'skills': ['Python'] * (i % 3)} for i in range(103)}
+
+
+def make_db():
+    db = FakeFirestore()
+    db.load('hackathonusers', DOCS)
+    return db
+
+
+def test_ranges_cover_the_collection_without_overlap():
+    queries = partition_queries(make_db(), 'hackathonusers', partitions=8)
+    assert len(queries) == 8
+
+    ranges = [[doc.id for doc in query.stream()] for query in queries]
+    assert [doc_id for ids in ranges for doc_id in ids] == sorted(DOCS)
+    assert all(ids for ids in ranges)
+
+
+def test_scan_reads_each_document_once_from_worker_threads():
+    db = make_db()
+    with db.stats.track('scan') as counts:
+        docs = list(scan_collection(db, 'hackathonusers', select=['name'], partitions=8, max_workers=4))
+
+    assert sorted(doc.id for doc in docs) == sorted(DOCS)
+    assert all(doc.to_dict() == {'name': DOCS[doc.id]['name']} for doc in docs)
+    # One name listing plus one query per range, all attributed to the caller's scope
+    assert counts['reads'] == 1 + 8
+    assert counts['documents'] == 2 * len(DOCS)
+
+
+def test_ordered_scan_yields_name_order():
+    docs = scan_collection(make_db(), 'hackathonusers', partitions=8, max_workers=3, ordered=True)
+    assert [doc.id for doc in docs] == sorted(DOCS)
+
+
+def test_small_collection_is_one_query():
+    db = FakeFirestore()
+    db.load('hackathonusers', {'a': {}, 'b': {}})
+    assert len(partition_queries(db, 'hackathonusers', partitions=8)) == 1
+    assert [doc.id for doc in scan_collection(db, 'hackathonusers', partitions=8)] == ['a', 'b']
@@ -0,0 +1,70 @@
+# test_enrichment_queue.py
+"""Background ML-feature enrichment: retries, giving up, and the outcome counters"""
+
+import datetime
+
+import pytest
+
+pytest.importorskip('google.api_core')
+
+import models.enrichment_queue as enrichment_queue  # noqa: E402
+from models.enrichment_queue import EnrichmentJob, EnrichmentQueue  # noqa: E402
+from models.fake_firestore import FakeFirestore  # noqa: E402
+from models.metrics import MetricsRegistry  # noqa: E402
+
+MATCH_IDS = ['flaky', 'broken', 'deleted']
+
+
+def job(match_id):
+    return EnrichmentJob(match_id, 'founder1', f'dev-{match_id}', {}, {}, datetime.datetime(2024, 1, 1))
+
+
+def outcomes(metrics):
+    prefix = 'foundermatcha_enrichment_jobs_total{outcome="'
+    return {line[len(prefix):].split('"')[0]: float(line.split()[-1])
+            for line in metrics.render().splitlines() if line.startswith(prefix)}
+
+
+@pytest.fixture
+def db():
+    db = FakeFirestore()
+    db.load('matches', {match_id: {'ml_features': None, 'ml_features_status': 'pending'}
+                        for match_id in MATCH_IDS if match_id != 'deleted'})
+    return db
+
+
+def test_jobs_are_retried_then_completed_or_failed(db, monkeypatch):
+    calls = {match_id: 0 for match_id in MATCH_IDS}
+
+    def compute(db, founder_id, developer_id, founder, developer, created_at):
+        match_id = developer_id[len('dev-'):]
+        calls[match_id] += 1
+        if match_id == 'broken' or (match_id == 'flaky' and calls[match_id] == 1):
+            raise RuntimeError('feature source unavailable')
+        return {'score': 1}
+
+    monkeypatch.setattr(enrichment_queue, 'compute_ml_features', compute)
+    metrics = MetricsRegistry()
+    worker = EnrichmentQueue(db, max_wait=0.01, max_attempts=3, retry_delay=0, metrics=metrics)
+    worker.start()
+    for match_id in MATCH_IDS:
+        assert worker.submit(job(match_id))
+    worker.stop()
+
+    matches = db.dump('matches')
+    assert matches['flaky'] == {'ml_features': {'score': 1}, 'ml_features_status': 'complete'}
+    assert matches['broken'] == {'ml_features': None, 'ml_features_status': 'failed'}
+    assert 'deleted' not in matches
+    assert calls == {'flaky': 2, 'broken': 3, 'deleted': 1}
+    # flaky retried once, broken twice before giving up
+    assert outcomes(metrics) == {'complete': 1, 'discarded': 1, 'failed': 1, 'retried': 3}
+    assert worker.backlog == 0
+
+
+def test_full_queue_drops_jobs(db):
+    metrics = MetricsRegistry()
+    worker = EnrichmentQueue(db, maxsize=1, metrics=metrics)
+    assert worker.submit(job('flaky'))
+    assert not worker.submit(job('broken'))
+    assert outcomes(metrics) == {'dropped': 1}
+    assert worker.backlog == 1
@@ -0,0 +1,83 @@
+# test_match_history.py
+"""Match history over matches written by both app.py and MatchCollector"""
+
+import datetime
+
+import pytest
+
+pytest.importorskip('flask')
+pytest.importorskip('firebase_admin')
+
+import app as app_module  # noqa: E402
+from models.fake_firestore import FakeFirestore  # noqa: E402
+from models.matches_collector import MatchCollector  # noqa: E402
+
+FOUNDER_ID = 'founder1'
+SCORES = {'total_score': 60.0, 'components': {'skill_score': 50.0, 'personality_score': 70.0,
+                                              'background_score': 50.0, 'cultural_score': 40.0}}
+
+
+@pytest.fixture
+def db():
+    db = FakeFirestore()
+    users = {FOUNDER_ID: {'name': 'Founder', 'role': 'founder / entrepreneur'}}
+    users.update({f'dev{i}': {'name': f'Dev {i}', 'role': 'softwareEngineer', 'skills': []} for i in range(10)})
+    db.load('hackathonusers', users)
+    return db
+
+
+def store_through_app(db, developer_ids):
+    client = app_module.create_app(db=db).test_client()
+    for developer_id in developer_ids:
+        response = client.post('/api/matches/store', json={'founder_id': FOUNDER_ID, 'developer_id': developer_id,
+                                                           'match_scores': SCORES})
+        assert response.status_code == 200, response.get_json()
+
+
+def store_through_collector(db, developer_ids):
+    collector = MatchCollector(db)
+    for developer_id in developer_ids:
+        result = collector.create_match({'id': FOUNDER_ID}, {'id': developer_id}, SCORES, FOUNDER_ID)
+        assert result['success'], result
+
+
+def full_history(collector, role, page_size):
+    matches, cursor = [], None
+    while True:
+        page = collector.get_match_history(FOUNDER_ID, role=role, page_size=page_size, cursor=cursor)
+        assert page['success'], page
+        matches.extend(page['matches'])
+        cursor = page['next_cursor']
+        if cursor is None:
+            return matches
+
+
+@pytest.mark.parametrize('role', ['founder', 'any'])
+def test_history_includes_matches_from_both_write_paths(db, role):
+    store_through_app(db, [f'dev{i}' for i in range(0, 10, 2)])
+    store_through_collector(db, [f'dev{i}' for i in range(1, 10, 2)])
+
+    matches = full_history(MatchCollector(db), role, page_size=3)
+
+    assert sorted(match['developer_id'] for match in matches) == [f'dev{i}' for i in range(10)]
+    keys = [(match['timestamp'], match['match_id']) for match in matches]
+    assert keys == sorted(keys, reverse=True)
+
+
+def test_backfill_adds_history_fields_to_older_app_matches(db):
+    store_through_collector(db, ['dev0'])
+    # Shape of matches stored by app.py before it wrote match_id and timestamp
+    db.collection('matches').document('legacy').set({
+        'founder_id': FOUNDER_ID, 'developer_id': 'dev1', 'status': 'pending',
+        'created_at': datetime.datetime(2024, 1, 1).isoformat(),
+    })
+    db.collection('matches').document('undated').set({'founder_id': FOUNDER_ID, 'developer_id': 'dev2'})
+    collector = MatchCollector(db)
+    assert len(full_history(collector, 'founder', page_size=10)) == 1
+
+    summary = collector.backfill_history_fields()
+
+    assert (summary['written'], summary['skipped']) == (1, 1)
+    matches = full_history(collector, 'founder', page_size=10)
+    assert [match['match_id'] for match in matches] == [f'{FOUNDER_ID}:dev0', 'legacy']
+    assert matches[1]['timestamp'] == datetime.datetime(2024, 1, 1)
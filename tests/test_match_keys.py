@@ -0,0 +1,73 @@
+# test_match_keys.py
+"""Pair-keyed matches: moving old random-ID matches and the single-read existence check"""
+
+import datetime
+
+import pytest
+
+pytest.importorskip('flask')
+
+import app as app_module  # noqa: E402
+from models.fake_firestore import FakeFirestore  # noqa: E402
+from models.matches_collector import MatchCollector  # noqa: E402
+from models.read_budget import read_budget  # noqa: E402
+from models.status_events import STATUS_EVENTS_COLLECTION  # noqa: E402
+
+FOUNDER_ID = 'founder1'
+
+
+def legacy_match(developer_id, day):
+    return {'founder_id': FOUNDER_ID, 'developer_id': developer_id, 'status': 'pending',
+            'created_at': datetime.datetime(2024, 1, day).isoformat()}
+
+
+@pytest.fixture
+def db():
+    db = FakeFirestore()
+    db.load('hackathonusers', {FOUNDER_ID: {'name': 'Founder', 'role': 'founder / entrepreneur'},
+                               'dev0': {'name': 'Dev 0', 'role': 'softwareEngineer'}})
+    db.load('matches', {
+        # Two old matches for the same pair; the older one is moved
+        'random-old': legacy_match('dev0', 1),
+        'random-new': legacy_match('dev0', 2),
+        # The pair already has a pair-keyed match
+        'random-dup': legacy_match('dev1', 1),
+        f'{FOUNDER_ID}:dev1': dict(legacy_match('dev1', 3), match_id=f'{FOUNDER_ID}:dev1'),
+        # Copied by an interrupted run that did not delete the old document
+        'random-half': legacy_match('dev2', 1),
+        f'{FOUNDER_ID}:dev2': dict(legacy_match('dev2', 1), match_id=f'{FOUNDER_ID}:dev2',
+                                   legacy_match_id='random-half'),
+    })
+    db.load(STATUS_EVENTS_COLLECTION, {
+        'event-old': {'match_id': 'random-old', 'status': 'pending', 'timestamp': datetime.datetime(2024, 1, 1)},
+        'event-half': {'match_id': 'random-half', 'status': 'pending', 'timestamp': datetime.datetime(2024, 1, 1)},
+    })
+    return db
+
+
+def test_rekey_moves_legacy_matches_to_pair_ids(db):
+    summary = MatchCollector(db).rekey_legacy_matches()
+    assert summary == {'moved': 2, 'conflicts': 2, 'failed': 0}
+
+    matches = db.dump('matches')
+    assert set(matches) == {f'{FOUNDER_ID}:dev0', 'random-new', 'random-dup', f'{FOUNDER_ID}:dev1',
+                            f'{FOUNDER_ID}:dev2'}
+    moved = matches[f'{FOUNDER_ID}:dev0']
+    assert moved['legacy_match_id'] == 'random-old'
+    assert moved['match_id'] == f'{FOUNDER_ID}:dev0'
+
+    events = db.dump(STATUS_EVENTS_COLLECTION)
+    assert events['event-old']['match_id'] == f'{FOUNDER_ID}:dev0'
+    assert events['event-half']['match_id'] == f'{FOUNDER_ID}:dev2'
+
+    # A second run has nothing left to move
+    assert MatchCollector(db).rekey_legacy_matches() == {'moved': 0, 'conflicts': 2, 'failed': 0}
+
+
+def test_check_is_one_document_read(db):
+    MatchCollector(db).rekey_legacy_matches()
+    client = app_module.create_app(db=db).test_client()
+    for developer_id, exists in (('dev0', True), ('dev9', False)):
+        with read_budget(db, reads=1):
+            response = client.get(f'/api/matches/check?founder_id={FOUNDER_ID}&developer_id={developer_id}')
+        assert response.get_json()['exists'] is exists
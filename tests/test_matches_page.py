@@ -0,0 +1,58 @@
+# test_matches_page.py
+"""Cursor pagination and first-page stats for /api/matches"""
+
+import datetime
+
+import pytest
+
+pytest.importorskip('flask')
+
+import app as app_module  # noqa: E402
+from models.fake_firestore import FakeFirestore  # noqa: E402
+
+STATUSES = ['successful', 'pending', 'failed', 'pending', 'pending']
+
+
+@pytest.fixture
+def client():
+    db = FakeFirestore()
+    db.load('matches', {
+        f'match{i:02d}': {
+            'founder_id': 'founder1' if i % 4 else 'founder2',
+            'developer_id': f'dev{i}',
+            'status': STATUSES[i % len(STATUSES)],
+            'created_at': (datetime.datetime(2024, 1, 1) + datetime.timedelta(hours=i)).isoformat(),
+            'match_scores': {'total_score': i / 10},
+        }
+        for i in range(12)
+    })
+    return app_module.create_app(db=db).test_client()
+
+
+def test_cursor_pages_cover_every_match_once(client):
+    pages = []
+    response = client.get('/api/matches?page_size=5').get_json()
+    pages.append(response)
+    while response['next_cursor']:
+        response = client.get(f"/api/matches?page_size=5&cursor={response['next_cursor']}").get_json()
+        pages.append(response)
+
+    assert [len(page['matches']) for page in pages] == [5, 5, 2]
+    ids = [match['id'] for page in pages for match in page['matches']]
+    # Newest first, and no page repeats a match from an earlier one
+    assert ids == [f'match{i:02d}' for i in reversed(range(12))]
+    assert pages[0]['next_cursor'] == 'match07'
+    assert 'stats' in pages[0]
+    assert all('stats' not in page for page in pages[1:])
+
+
+def test_stats_count_every_status_ignoring_the_status_filter(client):
+    response = client.get('/api/matches?founder_id=founder1&status=pending&page_size=2').get_json()
+
+    assert all(match['status'] == 'pending' for match in response['matches'])
+    assert response['stats'] == {'total': 9, 'successful': 2, 'pending': 5, 'failed': 2}
+
+
+def test_unknown_cursor_is_rejected(client):
+    response = client.get('/api/matches?cursor=missing')
+    assert response.status_code == 400
@@ -0,0 +1,69 @@
+# test_ml_features_backfill.py
+"""Bulk ml_features backfill over matches stored by app.py and by MatchCollector"""
+
+import datetime
+import json
+
+import pytest
+
+pytest.importorskip('firebase_admin')
+
+from backfill_ml_features import ALL_FEATURES, FeatureBackfill  # noqa: E402
+from models.fake_firestore import FakeFirestore  # noqa: E402
+from models.snapshot_store import SnapshotStore  # noqa: E402
+
+FOUNDER = {'name': 'F', 'city': 'London', 'industries': ['FinTech'], 'skills': ['Python'],
+           'companies': ['Monzo'], 'personality_results': {'openness': 60}}
+DEVELOPER = {'name': 'D', 'city': 'London', 'industries': ['FinTech'], 'skills': ['Python', 'React'],
+             'companies': ['Google'], 'personality_results': {'openness': 70}}
+
+
+@pytest.fixture
+def db():
+    db = FakeFirestore()
+    store = SnapshotStore(db)
+    refs = {'founder': store.put(FOUNDER), 'developer': store.put(DEVELOPER)}
+    db.load('matches', {
+        # app.py: ISO created_at and inline profile_snapshots
+        'a-app': {'founder_id': 'f1', 'developer_id': 'd1', 'status': 'successful',
+                  'created_at': '2024-01-01T00:00:00', 'ml_features_status': 'pending',
+                  'profile_snapshots': {'founder': FOUNDER, 'developer': DEVELOPER}},
+        # MatchCollector: datetime timestamp and content-hash snapshot_refs
+        'b-collector': {'founder_id': 'f1', 'developer_id': 'd2', 'status': {'current': 'pending'},
+                        'timestamp': datetime.datetime(2024, 1, 2), 'snapshot_refs': refs},
+        # Older MatchCollector matches embedded their snapshots
+        'c-collector-inline': {'founder_id': 'f1', 'developer_id': 'd3', 'status': {'current': 'pending'},
+                               'timestamp': datetime.datetime(2024, 1, 3),
+                               'founder_snapshot': FOUNDER, 'developer_snapshot': DEVELOPER},
+        'd-no-time': {'founder_id': 'f1', 'developer_id': 'd4', 'profile_snapshots': {
+            'founder': FOUNDER, 'developer': DEVELOPER}},
+        'e-no-snapshots': {'founder_id': 'f1', 'developer_id': 'd5', 'created_at': '2024-01-04T00:00:00'},
+    })
+    return db
+
+
+def test_backfill_covers_both_writers(db):
+    stats = FeatureBackfill(db).run()
+    assert stats['updated'] == 3
+    assert stats['skipped_by_reason'] == {'no creation time': 1, 'no profile snapshots': 1}
+
+    matches = db.dump('matches')
+    for match_id in ('a-app', 'b-collector', 'c-collector-inline'):
+        assert matches[match_id]['ml_features_status'] == 'complete'
+        assert set(matches[match_id]['ml_features']) == set(ALL_FEATURES)
+    # Prior matches are ordered across both writers' time fields
+    prior = matches['c-collector-inline']['ml_features']['prior_matches']
+    assert prior['founder'] == 2
+    assert prior['success_rate_founder'] == 0.5
+
+
+def test_checkpoint_ignores_feature_order(db, tmp_path):
+    path = tmp_path / 'checkpoint.json'
+    features = ALL_FEATURES[:2]
+    path.write_text(json.dumps({'last_match_id': 'c-collector-inline', 'features': features,
+                                'stats': {'updated': 3, 'skipped': 0, 'failed': 0}}))
+    backfill = FeatureBackfill(db, features=list(reversed(features)), checkpoint_path=str(path))
+    assert backfill.load_checkpoint()['last_match_id'] == 'c-collector-inline'
+
+    backfill = FeatureBackfill(db, features=ALL_FEATURES[:1], checkpoint_path=str(path))
+    assert backfill.load_checkpoint() is None
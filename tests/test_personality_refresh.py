@@ -0,0 +1,46 @@
+# test_personality_refresh.py
+"""Incremental personality refresh against a full recomputation"""
+
+import datetime
+
+import pytest
+
+pytest.importorskip('firebase_admin')
+
+import analyzepersonalitytraits as personality  # noqa: E402
+from models.fake_firestore import FakeFirestore  # noqa: E402
+
+DAY1 = datetime.datetime(2026, 1, 1)
+DAY2 = datetime.datetime(2026, 1, 2)
+
+
+def put(db, user_id, role, value, updated_at, traits=True):
+    data = {'role': role, 'updatedAt': updated_at}
+    if traits:
+        data['personalityResults'] = {trait: value for trait in personality.TRAITS}
+    db.collection('hackathonusers').document(user_id).set(data)
+
+
+def test_refresh_matches_a_full_run(tmp_path, capsys):
+    output = str(tmp_path / 'personality_analysis.json')
+    db = FakeFirestore()
+    for i in range(4):
+        put(db, f'user{i}', 'founder / entrepreneur' if i % 2 else 'softwareEngineer', 10 * i, DAY1)
+    personality.refresh_personality_analysis(db, output)
+
+    # Written after the refresh with the same timestamp as the watermark
+    put(db, 'user9', 'softwareEngineer', 100, DAY1)
+    # Changed, and one user whose results were cleared
+    put(db, 'user1', 'founder / entrepreneur', 50, DAY2)
+    put(db, 'user2', 'softwareEngineer', 0, DAY2, traits=False)
+
+    refreshed = personality.refresh_personality_analysis(db, output)
+    assert 'Added 1 users, updated 1 and removed 1' in capsys.readouterr().out
+    assert refreshed == personality.analyze_personality_distributions(db, str(tmp_path / 'full.json'))
+    assert refreshed['overall'][personality.TRAITS[0]]['count'] == 4
+
+    # Nothing changed since, so nothing is read again
+    reads_before = db.stats.totals()['reads']
+    personality.refresh_personality_analysis(db, output)
+    assert 'Added 0 users, updated 0 and removed 0' in capsys.readouterr().out
+    assert db.stats.totals()['reads'] - reads_before == 1
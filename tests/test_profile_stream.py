@@ -0,0 +1,52 @@
+# test_profile_stream.py
+"""/api/profiles/stream: chunked scoring with a refined top-N"""
+
+import json
+
+import pytest
+
+pytest.importorskip('flask')
+
+import app as app_module  # noqa: E402
+from loadtest import DEVELOPER_ROLE, FOUNDER_ROLE, generate_users  # noqa: E402
+from models.fake_firestore import FakeFirestore  # noqa: E402
+
+
+@pytest.fixture
+def client_and_founder():
+    db = FakeFirestore()
+    users = generate_users(3, 23)
+    db.load('hackathonusers', users)
+    founder_id = next(uid for uid, data in users.items() if data['role'] == FOUNDER_ROLE)
+    assert sum(data['role'] == DEVELOPER_ROLE for data in users.values()) == 23
+    return app_module.create_app(db=db).test_client(), founder_id
+
+
+def test_ndjson_stream_scores_every_developer_in_chunks(client_and_founder):
+    client, founder_id = client_and_founder
+    response = client.get(f'/api/profiles/stream?founder_id={founder_id}&chunk_size=10&top_n=5&format=ndjson')
+    assert response.mimetype == 'application/x-ndjson'
+    events = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+    assert [event['event'] for event in events] == ['developers', 'ranking'] * 3 + ['done']
+    chunks = [event['developers'] for event in events if event['event'] == 'developers']
+    assert [len(chunk) for chunk in chunks] == [10, 10, 3]
+    assert [event['scored'] for event in events if event['event'] == 'ranking'] == [10, 20, 23]
+
+    scored = [developer for chunk in chunks for developer in chunk]
+    assert len({developer['id'] for developer in scored}) == 23
+    best = sorted((developer['match_score']['total_score'] for developer in scored), reverse=True)[:5]
+    done = events[-1]
+    assert done['final'] is True and done['scored'] == 23
+    assert [developer['match_score']['total_score'] for developer in done['developers']] == best
+
+
+def test_sse_is_the_default_and_unknown_founders_are_404(client_and_founder):
+    client, founder_id = client_and_founder
+    response = client.get(f'/api/profiles/stream?founder_id={founder_id}&chunk_size=50')
+    assert response.mimetype == 'text/event-stream'
+    body = response.get_data(as_text=True)
+    assert body.startswith('event: developers\ndata: ')
+    assert body.rstrip().split('\n\n')[-1].startswith('event: done\n')
+
+    assert client.get('/api/profiles/stream?founder_id=nobody').status_code == 404
@@ -0,0 +1,43 @@
+# test_route_budgets.py
+"""Per-route Firestore budgets, so a read regression fails the test suite"""
+
+import pytest
+
+pytest.importorskip('flask')
+
+import app as app_module  # noqa: E402
+from loadtest import DEVELOPER_ROLE, FOUNDER_ROLE, generate_users  # noqa: E402
+from models.calculate_matches import EnhancedMatcher  # noqa: E402
+from models.fake_firestore import FakeFirestore  # noqa: E402
+from models.read_budget import ReadBudgetExceeded, check_route_budgets, read_budget  # noqa: E402
+
+
+def test_every_route_is_within_its_budget():
+    db = FakeFirestore()
+    users = generate_users(50, 50)
+    db.load('hackathonusers', users)
+    founder_id = next(uid for uid, data in users.items() if data['role'] == FOUNDER_ROLE)
+    developer_id = next(uid for uid, data in users.items() if data['role'] == DEVELOPER_ROLE)
+
+    flask_app = app_module.create_app(db=db, matcher=EnhancedMatcher())
+    assert check_route_budgets(flask_app, db, founder_id, developer_id) == []
+
+
+def test_read_budget_raises_when_exceeded():
+    db = FakeFirestore()
+    db.load('hackathonusers', {'a': {'name': 'A'}, 'b': {'name': 'B'}})
+    users = db.collection('hackathonusers')
+
+    with read_budget(db, reads=2, documents=3) as counts:
+        users.document('a').get()
+        list(users.stream())
+    assert counts['reads'] == 2
+
+    with pytest.raises(ReadBudgetExceeded, match='reads=2'):
+        with read_budget(db, reads=1, label='two gets'):
+            users.document('a').get()
+            users.document('b').get()
+
+    with pytest.raises(ReadBudgetExceeded, match='documents=2'):
+        with read_budget(db, documents=1):
+            list(users.stream())
@@ -0,0 +1,80 @@
+# test_sketches.py
+"""Running mean/variance and KLL quantiles against exact statistics"""
+
+import random
+import statistics
+
+from models.sketches import KLLSketch, RunningStats
+
+
+def values(n, seed):
+    rng = random.Random(seed)
+    return [rng.gauss(50, 15) for _ in range(n)]
+
+
+def rank_error(sketch, data, q):
+    ordered = sorted(data)
+    estimate = sketch.quantile(q)
+    rank = sum(1 for value in ordered if value <= estimate) / len(ordered)
+    return abs(rank - q)
+
+
+def test_running_stats_match_statistics_after_merge():
+    left, right = values(1000, seed=1), values(300, seed=2)
+    stats = RunningStats()
+    for value in left:
+        stats.add(value)
+    other = RunningStats()
+    for value in right:
+        other.add(value)
+    merged = RunningStats.from_dict(stats.to_dict()).merge(other)
+
+    data = left + right
+    assert merged.count == len(data)
+    assert abs(merged.mean - statistics.mean(data)) < 1e-9
+    assert abs(merged.stdev - statistics.stdev(data)) < 1e-9
+    assert (merged.min, merged.max) == (min(data), max(data))
+
+
+def test_small_sketch_is_exact():
+    data = values(100, seed=3)
+    sketch = KLLSketch(k=200)
+    for value in data:
+        sketch.add(value)
+
+    assert sketch.is_exact
+    assert sketch.median() == statistics.median(data)
+    assert sketch.quartiles() == tuple(statistics.quantiles(data, n=4))
+
+
+def test_large_sketch_stays_small_and_within_rank_error():
+    data = values(50000, seed=4)
+    sketch = KLLSketch(k=200, seed=5)
+    for value in data:
+        sketch.add(value)
+
+    assert not sketch.is_exact
+    assert sketch.count == len(data)
+    assert sketch.size < 1000
+    for q in (0.1, 0.25, 0.5, 0.75, 0.9):
+        assert rank_error(sketch, data, q) < 0.02
+
+
+def test_merged_shards_round_trip_through_dicts():
+    shards = [values(20000, seed=seed) for seed in range(6, 9)]
+    sketches = []
+    for seed, shard in enumerate(shards):
+        sketch = KLLSketch(k=200, seed=seed)
+        for value in shard:
+            sketch.add(value)
+        sketches.append(KLLSketch.from_dict(sketch.to_dict(), seed=seed))
+
+    merged = sketches[0]
+    for sketch in sketches[1:]:
+        merged.merge(sketch)
+
+    data = [value for shard in shards for value in shard]
+    assert merged.count == len(data)
+    assert merged.size <= merged.max_size
+    for q in (0.25, 0.5, 0.75):
+        assert rank_error(merged, data, q) < 0.02
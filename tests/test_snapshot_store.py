@@ -0,0 +1,51 @@
+# test_snapshot_store.py
+"""Content-addressed profile snapshots: dedup on write and batched resolution"""
+
+from models.fake_firestore import FakeFirestore
+from models.snapshot_store import SNAPSHOTS_COLLECTION, SnapshotStore, snapshot_hash
+
+FOUNDER = {'name': 'Founder', 'city': 'Berlin', 'skills': ['Sales', 'Product']}
+DEVELOPER = {'name': 'Dev', 'city': 'Paris', 'skills': ['Python']}
+
+
+def test_hash_ignores_key_order():
+    assert snapshot_hash(FOUNDER) == snapshot_hash(dict(reversed(list(FOUNDER.items()))))
+    assert snapshot_hash(FOUNDER) != snapshot_hash(dict(FOUNDER, city='Munich'))
+
+
+def test_identical_snapshots_are_written_once():
+    db = FakeFirestore()
+    store = SnapshotStore(db)
+
+    digest = store.put(FOUNDER)
+    with db.stats.track('second put') as counts:
+        assert store.put(dict(FOUNDER)) == digest
+    assert counts['writes'] == 0
+    assert db.dump(SNAPSHOTS_COLLECTION) == {digest: FOUNDER}
+
+    # Batched puts are skipped once the batch is reported committed
+    batch = db.batch()
+    developer_digest = store.put(DEVELOPER, batch=batch)
+    batch.commit()
+    store.committed(DEVELOPER)
+    with db.stats.track('after commit') as counts:
+        store.put(DEVELOPER, batch=db.batch())
+    assert counts['writes'] == 0
+    assert set(db.dump(SNAPSHOTS_COLLECTION)) == {digest, developer_digest}
+
+
+def test_resolve_matches_reads_all_snapshots_in_one_call():
+    db = FakeFirestore()
+    writer = SnapshotStore(db)
+    refs = {'founder': writer.put(FOUNDER), 'developer': writer.put(DEVELOPER)}
+    matches = [{'snapshot_refs': dict(refs)} for _ in range(3)]
+    matches.append({'profile_snapshots': {'founder': {'name': 'Embedded'}}})
+
+    # A fresh store has nothing cached, so the snapshots come from Firestore
+    with db.stats.track('resolve') as counts:
+        SnapshotStore(db).resolve_matches(matches, fields=['name', 'city'])
+
+    assert counts['reads'] == 1 and counts['documents'] == 2
+    assert matches[0]['profile_snapshots'] == {'founder': {'name': 'Founder', 'city': 'Berlin'},
+                                               'developer': {'name': 'Dev', 'city': 'Paris'}}
+    assert matches[3]['profile_snapshots'] == {'founder': {'name': 'Embedded'}}
@@ -0,0 +1,68 @@
+# test_status_events.py
+"""Status events in match_status_events: deleting them with their match and backfilling old histories"""
+
+import datetime
+
+import pytest
+
+pytest.importorskip('flask')
+
+import app as app_module  # noqa: E402
+from models.fake_firestore import FakeFirestore  # noqa: E402
+from models.status_events import STATUS_EVENTS_COLLECTION  # noqa: E402
+
+MATCH_ID = 'founder1:dev1'
+
+
+def test_delete_match_with_more_events_than_one_commit_holds():
+    db = FakeFirestore()
+    db.load('matches', {MATCH_ID: {'match_id': MATCH_ID, 'founder_id': 'founder1', 'developer_id': 'dev1'}})
+    start = datetime.datetime(2024, 1, 1)
+    db.load(STATUS_EVENTS_COLLECTION, {
+        f'event{i}': {'match_id': MATCH_ID, 'status': 'pending', 'timestamp': start + datetime.timedelta(minutes=i)}
+        for i in range(1200)
+    })
+    db.load(STATUS_EVENTS_COLLECTION, {'other': {'match_id': 'founder1:dev2', 'status': 'pending',
+                                                 'timestamp': start}})
+
+    response = app_module.create_app(db=db).test_client().delete(f'/api/matches/{MATCH_ID}')
+    assert response.status_code == 200, response.get_json()
+    assert db.dump('matches') == {}
+    assert set(db.dump(STATUS_EVENTS_COLLECTION)) == {'other'}
+
+
+def test_backfill_copies_history_arrays_to_the_timeline():
+    from models.status_events import backfill_status_history
+
+    db = FakeFirestore()
+    db.load('matches', {
+        # Written by app.py with ISO-string timestamps
+        'app-match': {'founder_id': 'founder1', 'developer_id': 'dev1', 'status': 'successful', 'status_history': [
+            {'status': 'pending', 'timestamp': '2024-01-01T10:00:00', 'updated_by': 'founder1'},
+            {'status': 'successful', 'timestamp': '2024-01-02T10:00:00', 'updated_by': 'dev1'},
+        ]},
+        # Written by MatchCollector with datetimes
+        'collector-match': {'founder_id': 'founder1', 'developer_id': 'dev2', 'status': {
+            'current': 'pending', 'history': [{'status': 'pending', 'timestamp': datetime.datetime(2024, 1, 3)}]}},
+        'bad-match': {'status_history': [{'status': 'pending', 'timestamp': 'yesterday'}]},
+    })
+
+    summary = backfill_status_history(db)
+    assert (summary['events'], summary['skipped'], summary['failed']) == (3, 1, 0)
+
+    client = app_module.create_app(db=db).test_client()
+    timeline = client.get('/api/matches/app-match/timeline').get_json()['events']
+    assert [(event['status'], event['updated_by']) for event in timeline] == [('pending', 'founder1'),
+                                                                              ('successful', 'dev1')]
+    assert timeline[0]['timestamp'] == '2024-01-01T10:00:00'
+    assert [event['status'] for event in client.get('/api/matches/collector-match/timeline')
+            .get_json()['events']] == ['pending']
+
+    matches = db.dump('matches')
+    assert 'status_history' not in matches['app-match']
+    assert matches['collector-match']['status'] == {'current': 'pending'}
+    assert 'status_history' in matches['bad-match']
+
+    # A rerun finds no arrays left and writes no duplicate events
+    assert backfill_status_history(db)['events'] == 0
+    assert len(db.dump(STATUS_EVENTS_COLLECTION)) == 3
@@ -0,0 +1,47 @@
+# test_work_style_status.py
+"""Work-style counts from aggregation queries against the scan that replaces them"""
+
+import pytest
+
+pytest.importorskip('firebase_admin')
+
+from models.analytics import WorkStyleAggregator  # noqa: E402
+from models.fake_firestore import FakeFirestore  # noqa: E402
+from updateWorkStyle import FirebaseUpdater  # noqa: E402
+
+USERS = {
+    'remote': {'role': 'softwareEngineer', 'workStyles': ['Remote']},
+    'remote_hybrid': {'role': 'softwareEngineer', 'workStyles': ['Hybrid', 'Remote']},
+    'all': {'role': 'founder / entrepreneur', 'workStyles': ['On-site', 'Remote', 'Hybrid']},
+    'empty': {'role': 'founder / entrepreneur', 'workStyles': []},
+    'missing': {'role': 'founder / entrepreneur'},
+    'null': {'role': 'softwareEngineer', 'workStyles': None},
+    'repeated': {'role': 'softwareEngineer', 'workStyles': ['Remote', 'Remote']},
+    'unknown': {'role': 'softwareEngineer', 'workStyles': ['Office']},
+    # Role values are matched exactly, so these count as neither role in every path
+    'mixed_case_developer': {'role': 'SoftwareEngineer', 'workStyles': ['Hybrid']},
+    'mixed_case_founder': {'role': 'Founder / Entrepreneur', 'workStyles': ['Hybrid']},
+}
+
+
+def test_count_and_scan_classify_the_same():
+    db = FakeFirestore()
+    db.load('hackathonusers', USERS)
+    updater = FirebaseUpdater(db=db)
+
+    counted = updater.count_current_status()
+    assert counted == updater.scan_current_status()
+    assert counted['total'] == len(USERS)
+    assert (counted['developers'], counted['founders']) == (5, 3)
+    assert counted['combinations']['Hybrid only'] == 2
+    assert counted['combinations']['Not Set'] == 3
+    assert counted['combinations']['Remote only'] == 1
+    assert counted['combinations']['Remote & Hybrid'] == 1
+    assert counted['combinations']['All styles'] == 1
+
+    aggregator = WorkStyleAggregator()
+    for user_id, data in USERS.items():
+        aggregator.add(user_id, data)
+    report = aggregator.report()
+    assert {label: entry['count'] for label, entry in report['combinations'].items()} == counted['combinations']
+    assert (report['metadata']['developers'], report['metadata']['founders']) == (5, 3)
@@ -1,8 +1,15 @@
-import firebase_admin
-from firebase_admin import credentials, firestore
 import random
 import argparse
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from itertools import permutations
+
+from models.analytics import (DEVELOPER_ROLE, FOUNDER_ROLE, WORK_STYLE_COMBINATIONS, work_style_distribution,
+                              work_style_mask)
+from models.batch_writer import WriteOp
+from models.bulk_update import BulkUpdater
+from models.collection_scan import scan_collection
+from models.firebase_client import get_client
 
 # Set up logging
 logging.basicConfig(level=logging.INFO,
@@ -11,13 +18,10 @@ logger = logging.getLogger(__name__)
 
 
 class FirebaseUpdater:
-    def __init__(self, cred_path: str):
-        """Initialize Firebase connection"""
+    def __init__(self, cred_path: str = None, db=None):
+        """Initialize Firebase connection; an explicit client (e.g. a snapshot) skips it"""
         try:
-            if not firebase_admin._apps:
-                cred = credentials.Certificate(cred_path)
-                firebase_admin.initialize_app(cred)
-            self.db = firestore.client()
+            self.db = db if db is not None else get_client(cred_path)
             logger.info("Successfully connected to Firebase")
         except Exception as e:
             logger.error(f"Failed to initialize Firebase: {e}")
@@ -26,8 +30,7 @@ class FirebaseUpdater:
     def get_all_users(self):
         """Retrieve all users from the database"""
         try:
-            users_ref = self.db.collection('hackathonusers')
-            docs = users_ref.stream()
+            docs = scan_collection(self.db, 'hackathonusers', ordered=True)
             return [(doc.id, doc.to_dict()) for doc in docs]
         except Exception as e:
             logger.error(f"Failed to retrieve users: {e}")
@@ -40,40 +43,30 @@ class FirebaseUpdater:
         num_preferences = random.randint(1, 3)
         return sorted(random.sample(styles, num_preferences))
 
-    def update_work_preferences(self, demo_mode: bool = False):
-        """Update work style preferences for all users"""
-        users = self.get_all_users()
-        updated_count = 0
-        failed_count = 0
-
-        for user_id, user_data in users:
-            try:
-                # Skip if work styles already exist and we're not in demo mode
-                if not demo_mode and 'workStyles' in user_data:
-                    logger.info(f"Skipping user {user_id}: work styles already exist")
-                    continue
-
-                # Prepare update data
-                update_data = {}
-
-                if demo_mode or 'workStyles' not in user_data:
-                    # Both founders and developers get an array of preferences
-                    update_data['workStyles'] = self.generate_random_work_styles()
-
-                # Only update if we have data to update
-                if update_data:
-                    self.db.collection('hackathonusers').document(user_id).update(update_data)
-                    logger.info(f"Updated user {user_id} with work styles: {update_data.get('workStyles')}")
-                    updated_count += 1
-
-            except Exception as e:
-                logger.error(f"Failed to update user {user_id}: {e}")
-                failed_count += 1
-
+    def update_work_preferences(self, demo_mode: bool = False, batch_size: int = 500, max_concurrency: int = 4,
+                                checkpoint_path: str = None):
+        """Update work style preferences for all users in batched commits, resuming from checkpoint_path"""
+        # Only whether workStyles is set matters here, so the rest of each profile is not downloaded
+        users = [(doc.id, doc.to_dict()) for doc in scan_collection(self.db, 'hackathonusers', select=['workStyles'])]
+        users_ref = self.db.collection('hackathonusers')
+
+        # Skip users whose work styles already exist unless we're in demo mode; both founders
+        # and developers get an array of preferences
+        operations = [
+            WriteOp(user_id, 'update', users_ref.document(user_id), {'workStyles': self.generate_random_work_styles()})
+            for user_id, user_data in users
+            if demo_mode or 'workStyles' not in user_data
+        ]
+        logger.info(f"{len(users) - len(operations)} users already have work styles, updating {len(operations)}")
+
+        summary = BulkUpdater(self.db, batch_size=batch_size, max_concurrency=max_concurrency,
+                              checkpoint_path=checkpoint_path).run(operations)
         return {
-            'updated': updated_count,
-            'failed': failed_count,
-            'total': len(users)
+            'updated': summary['written'],
+            'resumed': summary['resumed'],
+            'failed': summary['failed'],
+            'total': len(users),
+            'seconds': summary['seconds']
         }
 
     def update_single_user(self, user_id: str, work_styles: list):
@@ -85,72 +78,85 @@ class FirebaseUpdater:
                 raise ValueError("Invalid work style. Must be 'Remote', 'Hybrid', or 'On-site'")
 
             user_ref = self.db.collection('hackathonusers').document(user_id)
-            user_ref.update({'workStyles': sorted(work_styles)})
+            user_ref.update({'workStyles': sorted(set(work_styles))})
             logger.info(f"Successfully updated user {user_id} with work styles: {work_styles}")
             return True
         except Exception as e:
             logger.error(f"Failed to update user {user_id}: {e}")
             return False
 
-    def display_current_status(self):
-        """Display current work style distribution"""
-        users = self.get_all_users()
-
-        # Track combinations of work styles
-        style_combinations = {
-            'Remote only': 0,
-            'Hybrid only': 0,
-            'On-site only': 0,
-            'Remote & Hybrid': 0,
-            'Hybrid & On-site': 0,
-            'Remote & On-site': 0,
-            'All styles': 0,
-            'Not Set': 0
+    def _count(self, query):
+        return query.count().get()[0][0].value
+
+    def count_current_status(self):
+        """
+        Role and work-style counts from server-side count aggregations, without
+        downloading any user documents. workStyles arrays are matched exactly, so each
+        combination is queried with `in` over every ordering of its styles. Not Set is
+        counted directly: empty or null arrays by equality, missing ones as the total minus
+        the users an order_by on workStyles returns (it skips documents without the
+        field). Arrays with unknown or repeated styles are in no combination, as in
+        scan_current_status. Roles are matched exactly, in both paths.
+        """
+        users_ref = self.db.collection('hackathonusers')
+        queries = {
+            'total': users_ref,
+            'developers': users_ref.where('role', '==', DEVELOPER_ROLE),
+            'founders': users_ref.where('role', '==', FOUNDER_ROLE),
         }
-
-        developer_count = 0
-        founder_count = 0
-
-        for _, user_data in users:
-            role = user_data.get('role', '').lower()
-            styles = set(user_data.get('workStyles', []))
-
-            # Count by role
-            if role == 'softwareengineer':
+        for styles, label in WORK_STYLE_COMBINATIONS.items():
+            queries[label] = users_ref.where('workStyles', 'in', [list(p) for p in permutations(sorted(styles))])
+        queries['empty'] = users_ref.where('workStyles', '==', [])
+        queries['null'] = users_ref.where('workStyles', '==', None)
+        queries['with_styles'] = users_ref.order_by('workStyles')
+
+        with ThreadPoolExecutor(max_workers=len(queries)) as executor:
+            counts = dict(zip(queries, executor.map(self._count, queries.values())))
+
+        combinations = {label: counts[label] for label in WORK_STYLE_COMBINATIONS.values()}
+        combinations['Not Set'] = counts['empty'] + counts['null'] + counts['total'] - counts['with_styles']
+        return {'total': counts['total'], 'developers': counts['developers'], 'founders': counts['founders'],
+                'combinations': combinations}
+
+    def scan_current_status(self):
+        """The same counts from a scan projected to role and workStyles, tallied per 3-bit work-style mask"""
+        mask_counts = [0] * 8
+        total = developer_count = founder_count = 0
+        for doc in scan_collection(self.db, 'hackathonusers', select=['role', 'workStyles']):
+            user_data = doc.to_dict()
+            total += 1
+            role = user_data.get('role')
+            if role == DEVELOPER_ROLE:
                 developer_count += 1
-            elif role == 'founder / entrepreneur':
+            elif role == FOUNDER_ROLE:
                 founder_count += 1
+            mask = work_style_mask(user_data.get('workStyles'))
+            if mask is not None:
+                mask_counts[mask] += 1
+        return {'total': total, 'developers': developer_count, 'founders': founder_count,
+                'combinations': work_style_distribution(mask_counts)}
 
-            # Categorize work style combination
-            if not styles:
-                style_combinations['Not Set'] += 1
-            elif styles == {'Remote', 'Hybrid', 'On-site'}:
-                style_combinations['All styles'] += 1
-            elif styles == {'Remote'}:
-                style_combinations['Remote only'] += 1
-            elif styles == {'Hybrid'}:
-                style_combinations['Hybrid only'] += 1
-            elif styles == {'On-site'}:
-                style_combinations['On-site only'] += 1
-            elif styles == {'Remote', 'Hybrid'}:
-                style_combinations['Remote & Hybrid'] += 1
-            elif styles == {'Hybrid', 'On-site'}:
-                style_combinations['Hybrid & On-site'] += 1
-            elif styles == {'Remote', 'On-site'}:
-                style_combinations['Remote & On-site'] += 1
+    def display_current_status(self):
+        """Display current work style distribution"""
+        try:
+            status = self.count_current_status()
+        except Exception as e:
+            logger.warning(f"Count aggregation unavailable, scanning users instead: {e}")
+            status = self.scan_current_status()
 
         # Display results
+        total = status['total']
         logger.info("\nWork Style Distribution:")
-        logger.info(f"Total Users: {len(users)} (Developers: {developer_count}, Founders: {founder_count})")
-        for combination, count in style_combinations.items():
-            percentage = (count / len(users)) * 100 if len(users) > 0 else 0
+        logger.info(f"Total Users: {total} (Developers: {status['developers']}, Founders: {status['founders']})")
+        for combination, count in status['combinations'].items():
+            percentage = (count / total) * 100 if total > 0 else 0
             logger.info(f"{combination}: {count} users ({percentage:.1f}%)")
 
 
 def main():
     parser = argparse.ArgumentParser(description='Update Firebase database with work style preferences')
-    parser.add_argument('--cred-path', type=str, default='firebase-credentials.json',
-                        help='Path to Firebase credentials JSON file')
+    parser.add_argument('--cred-path', type=str,
+                        help='Path to Firebase credentials JSON file (default: $FOUNDERMATCHA_CREDENTIALS)')
     parser.add_argument('--demo', action='store_true',
                         help='Run in demo mode (overwrites existing data with random values)')
     parser.add_argument('--status', action='store_true',
@@ -160,6 +166,10 @@ def main():
     parser.add_argument('--work-styles', nargs='+',
                         choices=['Remote', 'Hybrid', 'On-site'],
                         help='Work styles to set for the specific user (can specify multiple)')
+    parser.add_argument('--batch-size', type=int, default=500, help='Users per write batch')
+    parser.add_argument('--workers', type=int, default=4, help='Concurrent batch commits')
+    parser.add_argument('--checkpoint', type=str, default='work_styles_update.checkpoint',
+                        help='File of completed user IDs, so an interrupted run can be resumed')
 
     args = parser.parse_args()
 
@@ -181,12 +191,15 @@ def main():
 
         # Perform the bulk update
         logger.info("Starting database update...")
-        result = updater.update_work_preferences(demo_mode=args.demo)
+        result = updater.update_work_preferences(demo_mode=args.demo, batch_size=args.batch_size,
+                                                 max_concurrency=args.workers, checkpoint_path=args.checkpoint)
 
         # Display results
         logger.info("\nUpdate Complete!")
         logger.info(f"Total users processed: {result['total']}")
         logger.info(f"Successfully updated: {result['updated']}")
+        if result['resumed']:
+            logger.info(f"Already updated by an earlier run: {result['resumed']}")
         logger.info(f"Failed updates: {result['failed']}")
 
         # Show final distribution